@@ -0,0 +1,39 @@
+#--- ChemPY backend ---
+# Importing `backend` is free of side effects and loads nothing up front: subpackages and the
+# convenience functions below are resolved on first access.
+#
+#   import backend
+#   backend.predict_single_replacement("Zn", "CuSO4")
+import importlib
+
+_SUBMODULES = ("bulk", "classifier", "core", "reactions")
+_EXPORTS = {
+    "predict_single_replacement": "backend.reactions.single_replacement",
+    "iter_predictions": "backend.reactions.single_replacement",
+    "predict_many": "backend.reactions.single_replacement",
+    "predict_double_replacement": "backend.reactions.double_replacement",
+    "balance_equation": "backend.core.balancer",
+    "balance_equations_batch": "backend.core.balancer",
+    "balance_basis": "backend.core.balancer",
+    "molar_masses": "backend.core.stoichiometry",
+    "mass_tables": "backend.core.stoichiometry",
+    "limiting_reagents": "backend.core.stoichiometry",
+    "parse_formula": "backend.core.parser",
+    "canonicalize": "backend.core.parser",
+    "split_cation_anion": "backend.core.parser",
+    "classify_batch": "backend.classifier",
+    "Species": "backend.core.species",
+    "RuleSet": "backend.core.ruleset",
+    "PredictionResult": "backend.reactions.result",
+}
+__all__ = list(_SUBMODULES) + list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
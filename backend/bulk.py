@@ -0,0 +1,179 @@
+#--- bulk prediction CLI ---
+# Reads reactant pairs from CSV or JSONL and predicts them across a process pool.
+#
+#   python -m backend.bulk pairs.csv -o predictions.jsonl --workers 8 --chunk-size 512 [--rules lab-a.json]
+#
+# Input:
+#   CSV   - two columns (reactant, compound); a header row naming them is optional
+#   JSONL - {"reactant": "Zn", "compound": "CuSO4"} or ["Zn", "CuSO4"] per line
+#   Malformed rows (a missing column, bad JSON, non-string values) are reported on stderr and skipped.
+# Output: one JSON object per line, {"reactant", "compound", **prediction}.
+# Pairs covered by the precomputed outcome table (backend.reactions.outcomes) are looked up in the
+# shared mmap; the rest are predicted live. Inputs are canonicalized first (parser.canonicalize), so
+# '2 NaBr(aq)' and 'NaBr' share one prediction, and each worker keeps its caches warm for its lifetime.
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from backend.core.parser import canonicalize
+from backend.reactions import outcomes
+
+
+def _skip(path, line, why):
+    print(f"{path}:{line}: skipping malformed row ({why})", file=sys.stderr)
+
+
+def read_pairs(path, fmt=None):
+    """
+    Lazily yield (reactant, compound) pairs from a CSV or JSONL file ('-' = stdin).
+    Malformed rows are reported on stderr and skipped, so one bad line does not end the run.
+    """
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "jsonl":
+            for n, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                    pair = (rec["reactant"], rec["compound"]) if isinstance(rec, dict) else tuple(rec[:2])
+                except (ValueError, KeyError, TypeError) as e:
+                    _skip(path, n, f"{type(e).__name__}: {e}")
+                    continue
+                if len(pair) != 2 or not all(isinstance(s, str) for s in pair):
+                    _skip(path, n, "expected a reactant and a compound string")
+                    continue
+                yield pair
+        elif fmt == "csv":
+            rows = csv.reader(f)
+            for i, row in enumerate(rows):
+                if not row:
+                    continue
+                if i == 0 and [c.strip().lower() for c in row[:2]] == ["reactant", "compound"]:
+                    continue
+                if len(row) < 2:
+                    _skip(path, rows.line_num, "one column, expected reactant and compound")
+                    continue
+                yield row[0].strip(), row[1].strip()
+        else:
+            raise ValueError(f"Unknown input format '{fmt}' (expected csv or jsonl)")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def chunked(iterable, size):
+    """Yield lists of up to `size` items without materialising the iterable."""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+_RULES = None   # RuleTables a worker process predicts under (None: tables.TABLES), see _init_worker
+
+
+def predict_chunk(chunk, rules=None):
+    """Worker entry point: predict a list of pairs, returning output records in order."""
+    rules = _RULES if rules is None else rules
+    out, results = [], {}
+    for pair in chunk:
+        key = (canonicalize(pair[0], rules), canonicalize(pair[1], rules))
+        result = results.get(key)
+        if result is None:
+            result = results[key] = outcomes.predict(*key, rules=rules)
+        rec = {"reactant": pair[0], "compound": pair[1]}
+        rec.update(result)
+        out.append(rec)
+    return out
+
+
+def _init_worker(rule_set=None):
+    # pay module imports, table compilation and the outcome-table mmap once per process, not per chunk
+    global _RULES
+    if rule_set is not None:
+        _RULES = rule_set.compile()
+    outcomes.predict("H2", "H2O", rules=_RULES)
+
+
+def run(pairs, workers=None, chunk_size=256, ordered=True, rule_set=None):
+    """
+    Yield output records for `pairs`, predicted under rule_set (a ruleset.RuleSet, default the
+    built-in rules). At most 2 * workers chunks are in flight, so memory stays bounded for
+    arbitrarily long inputs. workers=1 runs in-process.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = chunked(pairs, chunk_size)
+    if workers == 1:
+        rules = rule_set.compile() if rule_set is not None else None
+        for chunk in chunks:
+            yield from predict_chunk(chunk, rules)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rule_set,)) as pool:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(predict_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = set()
+            for chunk in chunks:
+                pending.add(pool.submit(predict_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        yield from fut.result()
+            for fut in pending:
+                yield from fut.result()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m backend.bulk",
+                                 description="Bulk single-replacement prediction over CSV/JSONL input.")
+    ap.add_argument("input", help="CSV or JSONL file of reactant pairs ('-' for stdin)")
+    ap.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    ap.add_argument("--format", choices=("csv", "jsonl"), help="input format (default: by extension)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--chunk-size", type=int, default=256, help="pairs per worker task")
+    ap.add_argument("--unordered", action="store_true", help="write results as they finish")
+    ap.add_argument("--rules", metavar="PATH", help="JSON/TOML rule set to predict with (default: built-in rules)")
+    args = ap.parse_args(argv)
+    rule_set = None
+    if args.rules:
+        from backend.core.ruleset import RuleSet
+        rule_set = RuleSet.load(args.rules)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    count = 0
+    try:
+        for rec in run(read_pairs(args.input, args.format), args.workers, args.chunk_size,
+                       ordered=not args.unordered, rule_set=rule_set):
+            out.write(json.dumps(rec) + "\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    print(f"{count} reactions in {elapsed:.2f}s ({rate:,.0f} reactions/sec, "
+          f"workers={args.workers or os.cpu_count()}, chunk={args.chunk_size})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
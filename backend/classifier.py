@@ -1,9 +1,197 @@
+from backend.core import parser, solubility, tables
+from backend.core.cache import LRUCache
+from backend.core.species import Species
 
 def classify_species(parsed):
     """
-    parsed: dict of element counts OR raw string
-    Heuristic: if parsed dict has length 1, treat as element; otherwise compound.
+    parsed: dict of element counts, Species OR raw string
+    Heuristic: if parsed dict (or Species composition) has length 1, treat as element; otherwise compound.
     """
+    if isinstance(parsed, Species):
+        return "element" if parsed.is_element else "compound"
     if isinstance(parsed, dict) and len(parsed)==1:
         return "element"
     return "compound"
+
+
+#--- batch reaction classifier ---
+# Every distinct species is reduced once to a feature bitmask (cached across batches, per rules
+# version) and a reaction's type is a memoised function of its reactants' masks. Within a batch
+# each distinct reactant tuple is decided once; the rest of the batch is one dict lookup per
+# reaction.
+
+ELEMENT = 1 << 0        # single element (Zn, Cl2, O2)
+METAL = 1 << 1          # element in the activity series
+HALOGEN = 1 << 2        # element in the halogen order
+HYDROGEN = 1 << 3       # elemental hydrogen
+OXYGEN = 1 << 4         # elemental oxygen
+WATER = 1 << 5          # H2O
+ACID = 1 << 6           # splits into the H cation (HCl, H2SO4; not HgCl2)
+IONIC = 1 << 7          # splits into a known cation and anion (salts, acids, bases)
+HYDROCARBON = 1 << 8    # only C, H (and O), with both C and H
+OXIDE = 1 << 9          # binary compound of oxygen
+BASE = 1 << 10          # splits into the OH or O anion (with H it forms water)
+H_LEADING = 1 << 11     # formula starts with H (the acid test of can_perform_single_replacement)
+RANKED_CATION = 1 << 12 # salt whose cation is in the activity series (metal can displace it)
+
+SINGLE_REPLACEMENT = "single_replacement"
+DOUBLE_REPLACEMENT = "double_replacement"
+SYNTHESIS = "synthesis"
+DECOMPOSITION = "decomposition"
+COMBUSTION = "combustion"
+UNKNOWN = "unknown"
+
+_FEATURES = LRUCache(maxsize=65536)
+_DECISIONS = LRUCache(maxsize=4096)   # (rules version, reactant masks) -> (type, subtype, swap)
+
+
+def species_features(formula: str, rules=None) -> int:
+    """
+    Feature bitmask of one species (see the flag constants above); cached per (rules version, formula).
+    rules: tables.RuleTables snapshot to classify with (default: tables.TABLES).
+    """
+    t = tables.TABLES if rules is None else rules
+    key = (t.version, formula)
+    mask = _FEATURES.get(key)
+    if mask is not None:
+        return mask
+    raw = formula.replace(" ", "")
+    try:
+        counts = parser.parse_composition(raw).counts
+    except ValueError:
+        counts = {}
+    mask = 0
+    if len(counts) == 1:
+        sym = next(iter(counts))
+        mask |= ELEMENT
+        if sym in t.halogens:
+            mask |= HALOGEN
+        elif sym == "H":
+            mask |= HYDROGEN
+        elif sym == "O":
+            mask |= OXYGEN
+        elif sym in t.activity:
+            mask |= METAL
+    elif counts:
+        if raw == "H2O":
+            mask |= WATER
+        else:
+            if raw.startswith("H"):
+                mask |= H_LEADING
+            cation, anion = parser.split_cation_anion(raw, t)
+            if anion and cation in t.activity_rank:
+                mask |= RANKED_CATION
+            cation, anion = solubility.table_for(t).ions(raw)
+            if cation and anion:
+                mask |= IONIC
+                if cation == "H":
+                    mask |= ACID
+                if anion == "OH" or anion == "O":
+                    mask |= BASE
+        if "C" in counts and "H" in counts and counts.keys() <= {"C", "H", "O"}:
+            mask |= HYDROCARBON
+        if len(counts) == 2 and "O" in counts:
+            mask |= OXIDE
+    return _FEATURES.put(key, mask)
+
+
+def _single_replacement_subtype(element, compound):
+    # mirrors the branch order of can_perform_single_replacement
+    if element & HALOGEN:
+        return "halogen"
+    if element & HYDROGEN:
+        return None
+    if not element & METAL:
+        return "metal"
+    if compound & H_LEADING:
+        return "metal_displaces_hydrogen"
+    if compound & WATER:
+        return "metal_displaces_water"
+    if not compound & RANKED_CATION:
+        return "metal"
+    return "metal_displaces_metal"
+
+
+def _decide(masks):
+    """(reaction type, subtype or None, swap) for a tuple of reactant masks."""
+    if len(masks) == 1:
+        return (UNKNOWN if masks[0] & ELEMENT or not masks[0] else DECOMPOSITION), None, False
+    if len(masks) == 2:
+        a, b = masks
+        for x, y, swap in ((a, b, False), (b, a, True)):
+            if x & OXYGEN and y & HYDROCARBON:
+                return COMBUSTION, None, swap
+        if a & ELEMENT and b & ELEMENT:
+            return SYNTHESIS, None, False
+        for x, y, swap in ((a, b, False), (b, a, True)):
+            if x & ELEMENT and y & (IONIC | WATER):
+                if x & OXYGEN:
+                    return UNKNOWN, None, False
+                return SINGLE_REPLACEMENT, _single_replacement_subtype(x, y), swap
+        if a & IONIC and b & IONIC:
+            # the engine calls it neutralization when the exchange forms water (H + OH)
+            water = (a & ACID and b & BASE) or (b & ACID and a & BASE)
+            return DOUBLE_REPLACEMENT, ("neutralization" if water else "precipitation"), False
+        for x, y in ((a, b), (b, a)):
+            if x & WATER and y & OXIDE:
+                return SYNTHESIS, None, False
+        return UNKNOWN, None, False
+    if masks and all(m & ELEMENT for m in masks):
+        return SYNTHESIS, None, False
+    return UNKNOWN, None, False
+
+
+def classify_batch(reactions, rules=None):
+    """
+    Reaction type for every reactant tuple, e.g. [("Zn", "CuSO4"), ("CH4", "O2"), ("CaCO3",)].
+    Returns a list of (type, subtype) in input order; type is one of single_replacement,
+    double_replacement, synthesis, decomposition, combustion or unknown. Single-replacement
+    subtypes follow can_perform_single_replacement; double replacement is split like
+    can_perform_double_replacement into neutralization (an acid and a hydroxide or oxide,
+    so the exchange forms water) and precipitation.
+    rules: tables.RuleTables snapshot to classify with (default: tables.TABLES).
+    """
+    return [decision[:2] for decision in _decisions(reactions, rules)]
+
+
+def _decisions(reactions, rules=None):
+    t = tables.TABLES if rules is None else rules
+    reactions = [r if isinstance(r, tuple) else tuple(r) for r in reactions]
+    by_reaction = {}   # distinct reactant tuples in this batch -> decision
+    for reactants in dict.fromkeys(reactions):
+        masks = tuple(species_features(r, t) for r in reactants)
+        key = (t.version, masks)
+        # read the module attribute each time: enable_thread_safe_caches() may have replaced it
+        decision = _DECISIONS.get(key)
+        if decision is None:
+            decision = _DECISIONS.put(key, _decide(masks))
+        by_reaction[reactants] = decision
+    return list(map(by_reaction.__getitem__, reactions))
+
+
+def predict_batch(reactions, rules=None):
+    """
+    Classify a batch and route each reaction to its engine in one group per type.
+    Returns one result dict per input (the engine's prediction plus `type`); reactions with no
+    prediction engine yet (synthesis, decomposition, combustion, unknown) get possible False.
+    rules: tables.RuleTables snapshot used for classifying and predicting (default: tables.TABLES).
+    """
+    from backend.reactions import double_replacement, single_replacement
+    t = tables.TABLES if rules is None else rules
+    reactions = [r if isinstance(r, tuple) else tuple(r) for r in reactions]   # generators too
+    decisions = _decisions(reactions, t)
+    results = [None] * len(reactions)
+    groups = {}
+    for i, (kind, _, _) in enumerate(decisions):
+        groups.setdefault(kind, []).append(i)
+
+    sr = groups.pop(SINGLE_REPLACEMENT, [])
+    pairs = [tuple(reactions[i][::-1]) if decisions[i][2] else tuple(reactions[i]) for i in sr]
+    for i, result in zip(sr, single_replacement.iter_predictions(pairs, rules=t)):
+        results[i] = dict(result, type=SINGLE_REPLACEMENT)
+    for i in groups.pop(DOUBLE_REPLACEMENT, []):
+        results[i] = dict(double_replacement.predict_double_replacement(*reactions[i], rules=t), type=DOUBLE_REPLACEMENT)
+    for kind, indices in groups.items():
+        for i in indices:
+            results[i] = {"possible": False, "type": kind, "reason": f"No prediction engine for {kind} reactions."}
+    return results
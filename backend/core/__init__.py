@@ -0,0 +1,10 @@
+#--- core library: submodules are imported on first attribute access ---
+import importlib
+
+__all__ = ["balancer", "cache", "charges", "concurrency", "elements", "instrument", "nullspace", "parser", "rules", "ruleset", "solubility", "species", "stoichiometry", "tables", "trie", "utils"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
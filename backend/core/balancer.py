@@ -1,36 +1,189 @@
 #--- balancer (homogeneous linear system solver) ---
-from backend.core import parser
-from fractions import Fraction
+from backend.core import nullspace, parser
+from backend.core.cache import LRUCache
 from math import gcd
 from functools import reduce
 
-def balance_equation(left_species, right_species):
+ENGINES = ("fraction", "bareiss", "modular")
+
+# canonical conservation matrix -> coefficient vector (see _template_key)
+_TEMPLATE_CACHE = LRUCache(maxsize=1024)
+
+
+def balance_equation(left_species, right_species, engine="fraction", unique=False):
     """
-    Given lists of species formula strings on left and right, return integer coefficient lists.
+    Given lists of species formula strings (or species.Species) on left and right, return integer coefficient lists.
     Example: left_species=['Zn','CuSO4'], right_species=['ZnSO4','Cu'] -> returns ([1,1],[1,1])
     Implementation: build element conservation matrix and find smallest integer nullspace vector.
+    engine: "fraction" (Gauss-Jordan on Fractions), "bareiss" (fraction-free integer
+    elimination) or "modular" (multi-modular sparse elimination, for large networks);
+    all return identical coefficients.
+    When the nullspace has several dimensions the vector for the last free species is returned;
+    unique=True raises ValueError instead (see balance_basis for the whole solution space).
     """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown balancing engine '{engine}' (expected one of {ENGINES})")
     species = left_species + right_species
-    parsed = [parser.parse_formula(sp)[1] for sp in species]
+    matrix = _conservation_matrix(species, len(left_species))
+    if unique:
+        _, free, _ = nullspace.rref_nullspace(matrix, len(species))
+        if len(free) != 1:
+            raise ValueError(f"Equation has {len(free)} independent solutions; coefficients are not unique")
+    int_sol = list(_solve_cached(matrix, len(species), engine))
+    left_coeffs = int_sol[:len(left_species)]
+    right_coeffs = int_sol[len(left_species):]
+    return left_coeffs, right_coeffs
+
+
+def balance_equations_batch(equations, engine="bareiss"):
+    """
+    Balance many (left_species, right_species) equations at once.
+    Returns a list in input order whose entries are (left_coeffs, right_coeffs), identical to
+    calling balance_equation on each, or the exception the scalar call would have raised
+    (e.g. ValueError for a malformed formula); one bad equation does not discard the batch.
+
+    Duplicate equations are built once and equations whose conservation matrices share a
+    template (see _template_key) are solved once. With the bareiss engine the templates not yet
+    in the template cache are grouped by matrix shape and each group is eliminated as one stack
+    of integer matrices (_solve_bareiss_stack); the other engines solve template by template.
+    Without NumPy the stack is plain lists, so bench_balancer measures the stacked elimination
+    at 1.0x (a few templates per shape) to 1.5x (thousands) the scalar one per distinct
+    template; most of the batch gain comes from the sharing (about 6x on coursework equations,
+    1.0x on non-repeating random ones, where parsing dominates).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown balancing engine '{engine}' (expected one of {ENGINES})")
+    by_equation = {}   # (left, right) -> input indices
+    for i, (left, right) in enumerate(equations):
+        by_equation.setdefault((tuple(left), tuple(right)), []).append(i)
+    results = [None] * len(equations)
+    by_template = {}   # template key -> [(matrix, n_left, input indices)]
+    for (left, right), indices in by_equation.items():
+        try:
+            matrix = _conservation_matrix(left + right, len(left))
+        except Exception as e:
+            for i in indices:
+                results[i] = e
+            continue
+        key = _template_key(matrix, len(left) + len(right))
+        by_template.setdefault(key, []).append((matrix, len(left), indices))
+
+    solved = {}   # template key -> coefficients from the stacked elimination
+    if engine == "bareiss":
+        by_shape = {}   # (species, rows) -> uncached template keys
+        for key in by_template:
+            if key[0] and key not in _TEMPLATE_CACHE:
+                by_shape.setdefault((key[0], len(key[1])), []).append(key)
+        for (n, _), keys in by_shape.items():
+            for key, int_sol in zip(keys, _solve_bareiss_stack([key[1] for key in keys], n)):
+                solved[key] = _TEMPLATE_CACHE.put(key, tuple(int_sol))
+
+    for key, members in by_template.items():
+        try:
+            int_sol = solved.get(key) or _solve_cached(members[0][0], key[0], engine, key)
+        except Exception as e:
+            for _, _, indices in members:
+                for i in indices:
+                    results[i] = e
+            continue
+        for _, n_left, indices in members:
+            for i in indices:
+                results[i] = (list(int_sol[:n_left]), list(int_sol[n_left:]))
+    return results
+
+
+def balance_basis(left_species, right_species):
+    """
+    Every independent way to balance the equation, as a list of (left_coeffs, right_coeffs).
+    Each vector is primitive with its first non-zero coefficient positive; any combination of
+    them also conserves every element. One entry means the balance is unique (up to scale),
+    none means only the trivial solution exists. Uses the multi-modular solver, so networks of
+    hundreds of species are fine.
+    """
+    species = list(left_species) + list(right_species)
+    n_left = len(left_species)
+    matrix = _conservation_matrix(species, n_left)
+    return [(vec[:n_left], vec[n_left:]) for vec in nullspace.integer_basis(matrix, len(species))]
+
+
+def _conservation_matrix(species, n_left):
+    """
+    Element conservation matrix: rows elements, columns species; left positive, right negative.
+    Species objects contribute their composition vectors directly (no re-parsing).
+    """
+    if not any(isinstance(sp, str) for sp in species):
+        vectors = [sp.vector for sp in species]
+        present = sorted({z for v in vectors for z, c in enumerate(v) if c})
+        return [[v[z] if i < n_left else -v[z] for i, v in enumerate(vectors)] for z in present]
+    parsed = [parser.parse_composition(sp).counts if isinstance(sp, str) else sp.counts for sp in species]
     # unique elements
     elements = sorted({el for d in parsed for el in d.keys()})
-    # Build matrix: rows elements, columns species. Left side positive, right side negative.
     matrix = []
     for el in elements:
         row = []
         for i, comp in enumerate(parsed):
             coeff = comp.get(el,0)
             # left species positive, right negative
-            if i >= len(left_species):
+            if i >= n_left:
                 coeff = -coeff
-            row.append(Fraction(coeff))
+            row.append(coeff)
         matrix.append(row)
+    return matrix
+
+
+def _solve_cached(matrix, n, engine, key=None):
+    """Coefficient tuple for a conservation matrix, via the structural template cache."""
+    if key is None:
+        key = _template_key(matrix, n)
+    int_sol = _TEMPLATE_CACHE.get(key)
+    if int_sol is None:
+        solve = _SOLVERS[engine]
+        int_sol = _TEMPLATE_CACHE.put(key, tuple(solve(matrix, n)))
+    return int_sol
+
+
+def _template_key(matrix, n):
+    """
+    Canonical, element-name-free form of the conservation matrix.
+    The coefficient vector depends only on the row space (through its RREF), so rows are
+    divided by their gcd, sign-normalised, de-duplicated and sorted; zero rows are dropped.
+    `A + BX -> AX + B` therefore hits the same entry whatever A, B and X are.
+    """
+    rows = set()
+    for row in matrix:
+        g = reduce(gcd, row, 0)
+        if g == 0:
+            continue
+        lead = next(v for v in row if v != 0)
+        if lead < 0:
+            g = -g
+        rows.add(tuple(v // g for v in row))
+    return n, tuple(sorted(rows))
+
+
+def template_cache_info():
+    """Return hit/miss/eviction stats for the structural template cache."""
+    return _TEMPLATE_CACHE.info()
+
+
+def set_template_cache_size(maxsize):
+    """Set the maximum number of cached templates (None = unbounded, 0 = disabled)."""
+    _TEMPLATE_CACHE.resize(maxsize)
+
+
+def clear_template_cache():
+    """Drop every cached template and reset the stats."""
+    _TEMPLATE_CACHE.clear()
+
+
+def _solve_fraction(matrix, n):
+    """Nullspace vector of an integer matrix via Gauss-Jordan elimination on Fractions."""
+    from fractions import Fraction  # imported on first use: the integer engines don't need it
     # Solve for nullspace vector x (non-zero) such that M x = 0
     # We'll perform Gaussian elimination to RREF and parameterize free variables
     m = len(matrix)   # rows
-    n = len(matrix[0]) if m>0 else 0  # cols
     # convert to augmented matrix copy
-    A = [row[:] for row in matrix]  # m x n Fractions
+    A = [[Fraction(v) for v in row] for row in matrix]  # m x n Fractions
     # Row-reduction to row-echelon form (not full RREF)
     row = 0
     pivot_cols = []
@@ -99,6 +252,150 @@ def balance_equation(left_species, right_species):
     # reduce by gcd
     g = reduce(gcd, [abs(x) for x in int_sol if x!=0], 1)
     int_sol = [x//g for x in int_sol]
-    left_coeffs = int_sol[:len(left_species)]
-    right_coeffs = int_sol[len(left_species):]
-    return left_coeffs, right_coeffs
+    return int_sol
+
+
+def _solve_bareiss(matrix, n):
+    """
+    Nullspace vector of an integer matrix via fraction-free (Bareiss) Gauss-Jordan elimination.
+    Uses the same pivot order as _solve_fraction. After each step every entry is an integer
+    minor of the input, so the division by the previous pivot is exact and rows are updated
+    in place. At the end every pivot row holds the same pivot d, i.e. the RREF is A / d.
+    """
+    m = len(matrix)
+    A = [row[:] for row in matrix]
+    row = 0
+    prev = 1
+    pivot_cols = []
+    for col in range(n):
+        if row >= m:
+            break
+        sel = None
+        for r in range(row, m):
+            if A[r][col] != 0:
+                sel = r; break
+        if sel is None:
+            continue
+        if sel != row:
+            A[row], A[sel] = A[sel], A[row]
+        prow = A[row]
+        pivot = prow[col]
+        for r in range(m):
+            if r == row:
+                continue
+            cur = A[r]
+            factor = cur[col]
+            for c in range(n):
+                cur[c] = (pivot * cur[c] - factor * prow[c]) // prev
+        prev = pivot
+        pivot_cols.append(col)
+        row += 1
+    free_cols = [c for c in range(n) if c not in pivot_cols]
+    if not free_cols:
+        free_cols = [n-1]
+    last_free = free_cols[-1]
+    # RREF entries are A[r][c] / prev: scale the Fraction-path solution by prev
+    sol = [0] * n
+    for r, pc in enumerate(pivot_cols):
+        sol[pc] = -A[r][last_free]
+    sol[last_free] = prev
+    if prev < 0:
+        sol = [-x for x in sol]
+    if all(x <= 0 for x in sol):
+        sol = [-x for x in sol]
+    g = reduce(gcd, sol, 0) or 1
+    return [x // g for x in sol]
+
+
+def _solve_bareiss_stack(matrices, n):
+    """
+    _solve_bareiss for a stack of matrices of one shape, eliminated together: entry (r, c) of
+    every matrix is kept in one list, so each update step is one pass over the whole stack.
+    Row swaps are made per matrix. Where a column has a pivot in some matrices and not in
+    others the stack splits in two and each part carries on with its own pivot columns.
+    Returns one coefficient list per matrix, exactly those of _solve_bareiss.
+    """
+    m = len(matrices[0]) if matrices else 0
+    results = [None] * len(matrices)
+    A = [[[mat[r][c] for mat in matrices] for c in range(n)] for r in range(m)]
+    # (stack, matrix index per lane, previous pivot per lane, row, column, pivot columns)
+    work = [(A, list(range(len(matrices))), [1] * len(matrices), 0, 0, [])]
+    while work:
+        A, lanes, prev, row, col, pivot_cols = work.pop()
+        while col < n and row < m:
+            out = []
+            pivots = A[row][col]
+            for j in ([] if all(pivots) else [j for j, p in enumerate(pivots) if not p]):
+                sel = next((r for r in range(row + 1, m) if A[r][col][j]), None)
+                if sel is None:
+                    out.append(j)
+                    continue
+                for c in range(n):
+                    A[row][c][j], A[sel][c][j] = A[sel][c][j], A[row][c][j]
+            if out:
+                if len(out) < len(lanes):
+                    # no pivot in this column for the `out` lanes: they continue without it
+                    skip = set(out)
+                    keep = [j for j in range(len(lanes)) if j not in skip]
+                    work.append((_take(A, out), [lanes[j] for j in out], [prev[j] for j in out],
+                                 row, col + 1, list(pivot_cols)))
+                    A, lanes, prev = _take(A, keep), [lanes[j] for j in keep], [prev[j] for j in keep]
+                else:
+                    col += 1
+                    continue
+            prow = A[row]
+            pivot = prow[col]
+            used = [any(y) for y in prow]   # conservation matrices are sparse: skip the zero terms
+            for r in range(m):
+                if r == row:
+                    continue
+                cur = A[r]
+                factor = cur[col]
+                eliminate = any(factor)
+                for c in range(n):
+                    if eliminate and used[c]:
+                        cur[c] = [(p * x - f * y) // d for p, x, f, y, d in zip(pivot, cur[c], factor, prow[c], prev)]
+                    elif any(cur[c]):
+                        cur[c] = [p * x // d for p, x, d in zip(pivot, cur[c], prev)]
+            prev = pivot
+            pivot_cols.append(col)
+            row += 1
+            col += 1
+        free_cols = [c for c in range(n) if c not in pivot_cols] or [n - 1]
+        last_free = free_cols[-1]
+        zero = [0] * len(lanes)
+        sols = [zero] * n
+        for r, pc in enumerate(pivot_cols):
+            sols[pc] = [-x for x in A[r][last_free]]
+        sols[last_free] = prev
+        for i, d, sol in zip(lanes, prev, zip(*sols)):
+            if d < 0:
+                sol = [-x for x in sol]
+            if max(sol) <= 0:
+                sol = [-x for x in sol]
+            g = reduce(gcd, sol, 0) or 1
+            results[i] = [x // g for x in sol]
+    return results
+
+
+def _take(A, lanes):
+    """The lanes (matrix positions) of a stack as a new stack."""
+    return [[[col[j] for j in lanes] for col in A_row] for A_row in A]
+
+
+def _solve_modular(matrix, n):
+    """
+    Nullspace vector via the multi-modular solver (backend.core.nullspace). Its RREF basis vector
+    for the last free column is the Fraction-path solution scaled by a positive integer.
+    """
+    _, free, basis = nullspace.rref_nullspace(matrix, n)
+    if not free:
+        return _solve_bareiss(matrix, n)   # trivial nullspace: keep the legacy fallback vector
+    sol = basis[-1]
+    if all(x <= 0 for x in sol):
+        sol = [-x for x in sol]
+    g = reduce(gcd, sol, 0) or 1
+    return [x // g for x in sol]
+
+
+_SOLVERS = {"fraction": _solve_fraction, "bareiss": _solve_bareiss, "modular": _solve_modular}
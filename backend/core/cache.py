@@ -0,0 +1,175 @@
+#--- caching ---
+from collections import OrderedDict
+import time
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used mapping with hit/miss/eviction counters.
+    maxsize=None means unbounded; maxsize=0 disables storage entirely.
+    """
+    __slots__ = ("maxsize", "hits", "misses", "evictions", "_data")
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return cached value for key (marking it recently used) or default."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries if full."""
+        if self.maxsize == 0:
+            return value
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def resize(self, maxsize):
+        """Change the size bound, evicting immediately if the cache shrinks."""
+        self.maxsize = maxsize
+        if maxsize is not None:
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries and reset counters."""
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Return a stats dict: hits, misses, evictions, size, maxsize, hit_ratio."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TTLCache(LRUCache):
+    """
+    LRUCache whose entries also expire `ttl` seconds after they were stored.
+    Expired entries count as misses and are dropped on access.
+    """
+    __slots__ = ("ttl", "clock")
+
+    def __init__(self, maxsize=4096, ttl=300.0, clock=time.monotonic):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.clock = clock
+
+    def get(self, key, default=None):
+        entry = super().get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires < self.clock():
+            del self._data[key]
+            self.hits -= 1
+            self.misses += 1
+            return default
+        return value
+
+    def put(self, key, value):
+        super().put(key, (self.clock() + self.ttl, value))
+        return value
+
+    def __contains__(self, key):
+        entry = self._data.get(key)
+        return entry is not None and entry[0] >= self.clock()
+
+
+class StripedLRUCache:
+    """
+    Thread-safe LRUCache: keys are spread over `stripes` shards, each an LRUCache behind its
+    own lock, so threads working on different keys rarely contend. maxsize is split evenly
+    over the shards (None = unbounded, 0 = disabled), so eviction is LRU per shard.
+    """
+    __slots__ = ("_maxsize", "_shards", "_locks", "_mask")
+
+    def __init__(self, maxsize=4096, stripes=16):
+        if stripes < 1 or stripes & (stripes - 1):
+            raise ValueError(f"stripes must be a power of two, got {stripes}")
+        import threading
+        self._mask = stripes - 1
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+        self._shards = tuple(LRUCache(0) for _ in range(stripes))
+        self.resize(maxsize)
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def get(self, key, default=None):
+        """Return cached value for key (marking it recently used) or default."""
+        i = hash(key) & self._mask
+        with self._locks[i]:
+            return self._shards[i].get(key, default)
+
+    def put(self, key, value):
+        """Store value under key, evicting the shard's least recently used entries if full."""
+        i = hash(key) & self._mask
+        with self._locks[i]:
+            return self._shards[i].put(key, value)
+
+    def resize(self, maxsize):
+        """Change the total size bound, evicting immediately if the cache shrinks."""
+        self._maxsize = maxsize
+        per_shard = maxsize if not maxsize else max(1, -(-maxsize // len(self._shards)))
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.resize(per_shard)
+
+    def clear(self):
+        """Drop all entries and reset counters."""
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
+
+    def info(self):
+        """Return a stats dict: hits, misses, evictions, size, maxsize, hit_ratio (summed over shards)."""
+        hits = sum(s.hits for s in self._shards)
+        misses = sum(s.misses for s in self._shards)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": sum(s.evictions for s in self._shards),
+            "size": len(self),
+            "maxsize": self._maxsize,
+            "hit_ratio": (hits / total) if total else 0.0,
+        }
+
+    def __contains__(self, key):
+        i = hash(key) & self._mask
+        with self._locks[i]:
+            return key in self._shards[i]
+
+    def __len__(self):
+        return sum(len(s) for s in self._shards)
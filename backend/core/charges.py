@@ -28,76 +28,46 @@ COMMON_ANION_CHARGES = {
     "OH": -1, "NO3": -1, "SO4": -2, "CO3": -2, "PO4": -3, "CH3COO": -1
 }
 
-from backend.core import parser
-from math import gcd
-from functools import reduce
+GROUP_CATION_CHARGES = {
+    # periodic group heuristics for predictable elements
+    "H": 1, "Li": 1, "Na": 1, "K": 1, "Rb": 1, "Cs": 1, "Fr": 1,  # group 1: always +1
+    "Be": 2, "Mg": 2, "Ca": 2, "Sr": 2, "Ba": 2, "Ra": 2,         # group 2: always +2
+    "B": 3, "Al": 3, "Ga": 3, "In": 3, "Tl": 1,                   # group 13: mostly +3, Tl is special (+1)
+    "C": 4, "Si": 4, "Ge": 4, "Sn": 2, "Pb": 2,                   # group 14: +4 common, Sn/Pb default to +2 for stability
+    "N": 3, "P": 3, "As": 3, "Sb": 3, "Bi": 3,                    # group 15: common low oxidation state
+    "Zn": 2, "Cd": 2, "Hg": 2,                                    # transition metals reliably +2
+}
+ELEMENT_ANION_CHARGES = {
+    # single elements acting as anions
+    "F": -1, "Cl": -1, "Br": -1, "I": -1,  # halogens -> -1
+    "O": -2, "S": -2,                      # oxygen / sulfur -> -2
+}
+
+from backend.core import tables
 
 #charge inference
-def infer_cation_charge(cation_str: str):
+def infer_cation_charge(cation_str: str, rules=None):
     """
     Infer integer positive charge of a cation using:
       1. Explicit map (COMMON_CATION_CHARGES)
       2. POLYATOMIC map
-      3. Group-based heuristics for predictable elements
-    Returns None if charge cannot be inferred safely.
+      3. Group-based heuristics for predictable elements (GROUP_CATION_CHARGES)
+    All three are merged once into tables.TABLES (dense per-element table + ion map).
+    Returns None if charge cannot be inferred safely (most transition metals fall here).
+    rules: tables.RuleTables snapshot to read instead of tables.TABLES.
     """
+    t = tables.TABLES if rules is None else rules
+    z = t.atomic_number.get(cation_str)
+    if z is not None:
+        return t.cation_charge_by_z[z] or None
+    return t.cation_charge.get(cation_str)
 
-    # 1. direct mapping
-    if cation_str in COMMON_CATION_CHARGES:
-        return COMMON_CATION_CHARGES[cation_str]
-
-    # 2. polyatomic lookup
-    if cation_str in POLYATOMIC:
-        comp, charge, name = POLYATOMIC[cation_str]
-        if charge > 0:
-            return charge
-
-    # 3. periodic group heuristics
-    group1 = {"H","Li","Na","K","Rb","Cs","Fr"} # always +1
-    group2 = {"Be","Mg","Ca","Sr","Ba","Ra"} # always +2
-    group13 = {"B","Al","Ga","In","Tl"} # mostly +3, but Tl can also be +1
-    group14 = {"C","Si","Ge","Sn","Pb"} # +4 common, but Sn/Pb also +2
-    group15 = {"N","P","As","Sb","Bi"} # +3 common, +5 also possible
-    transition_common = {"Zn","Cd","Hg"} # reliably +2
-
-    if cation_str in group1:
-        return 1
-    if cation_str in group2:
-        return 2
-    if cation_str in group13:
-        # fallback: Tl is special (+1), others mostly +3
-        return 1 if cation_str == "Tl" else 3
-    if cation_str in group14:
-        # Sn/Pb flexible, default to +2 for stability
-        return 2 if cation_str in {"Sn","Pb"} else 4
-    if cation_str in group15:
-        # common low oxidation state
-        return 3
-    if cation_str in transition_common:
-        return 2
-
-    # 4. unknown / ambiguous (most transition metals fall here)
-    return None
-
-def infer_anion_charge(anion_str: str):
+def infer_anion_charge(anion_str: str, rules=None):
     """
     Return integer negative charge for anion_str using COMMON_ANION_CHARGES or POLYATOMIC mapping heuristics.
     """
-    if anion_str in COMMON_ANION_CHARGES:
-        return COMMON_ANION_CHARGES[anion_str]
-    if anion_str in POLYATOMIC:
-        comp, charge, name = POLYATOMIC[anion_str]
-        return charge
-    # anion may be a single element (like Cl)
-    if anion_str in parser.ELEMENT_SYMBOLS:
-        # halogens -> -1
-        if anion_str in {"F","Cl","Br","I"}:
-            return -1
-        # oxygen -> -2
-        if anion_str == "O":
-            return -2
-        # sulfur -> -2
-        if anion_str == "S":
-            return -2
-    # can't deduce
-    raise KeyError(f"Unknown anion charge for '{anion_str}' — expand COMMON_ANION_CHARGES or POLYATOMIC")
+    charge = (tables.TABLES if rules is None else rules).anion_charge.get(anion_str)
+    if charge is None:
+        # can't deduce
+        raise KeyError(f"Unknown anion charge for '{anion_str}' — expand COMMON_ANION_CHARGES or POLYATOMIC")
+    return charge
@@ -0,0 +1,48 @@
+#--- thread-safe execution mode ---
+# The hot paths keep their state in module-level LRU caches (plain OrderedDicts, fine for one
+# thread) and in RuleTables snapshots (immutable, fine for any number). Thread-safe mode swaps
+# every shared cache for a StripedLRUCache with the same size bound, so worker threads can
+# share warm caches without corrupting them. It is opt-in: single-threaded code keeps the
+# lock-free caches.
+#
+# Lazily compiled globals (tables.TABLES, solubility.TABLE) are built before switching, so
+# threads never race to compile them; a recompile() later is an atomic rebinding and callers
+# that need one consistent view pass a pinned `rules` snapshot (see predict_many).
+import importlib
+import threading
+from backend.core.cache import StripedLRUCache
+
+# (module, attribute) of every module-level cache touched by prediction / balancing / classifying
+SHARED_CACHES = (
+    ("backend.core.parser", "_PARSE_CACHE"),
+    ("backend.core.parser", "_CANONICAL_CACHE"),
+    ("backend.core.species", "_SPECIES_CACHE"),
+    ("backend.core.balancer", "_TEMPLATE_CACHE"),
+    ("backend.core.solubility", "_IONS"),
+    ("backend.classifier", "_FEATURES"),
+    ("backend.classifier", "_DECISIONS"),
+)
+
+THREAD_SAFE = False
+_LOCK = threading.Lock()
+
+
+def enable_thread_safe_caches(stripes=16):
+    """
+    Switch every cache in SHARED_CACHES to a StripedLRUCache (same maxsize, contents dropped)
+    and compile the lazy rule tables. Idempotent; returns the new caches by (module, attribute).
+    """
+    global THREAD_SAFE
+    with _LOCK:
+        caches = {}
+        for module, attr in SHARED_CACHES:
+            mod = importlib.import_module(module)
+            cache = getattr(mod, attr)
+            if not isinstance(cache, StripedLRUCache):
+                cache = StripedLRUCache(cache.maxsize, stripes)
+                setattr(mod, attr, cache)
+            caches[module, attr] = cache
+        importlib.import_module("backend.core.tables").TABLES
+        importlib.import_module("backend.core.solubility").TABLE
+        THREAD_SAFE = True
+        return caches
@@ -0,0 +1,193 @@
+#--- opt-in instrumentation ---
+# Per-stage timers, call counters, subtype/reason counts and cache ratios for the prediction path.
+#
+#   from backend.core import instrument
+#   with instrument.collect() as stats:
+#       predict_single_replacement("Zn", "CuSO4")
+#   stats.snapshot()["stages"]["balance"]
+#
+# enable() swaps the functions listed in PROBES for timing wrappers (module attributes, so every
+# `module.func(...)` call site sees them); disable() puts the originals back. While disabled
+# nothing is wrapped, so the hot path pays no overhead at all.
+# Stage timings are inclusive: "predict" contains "feasibility", "products", "balance", ...
+
+from collections import Counter
+from contextlib import contextmanager
+import importlib
+import re
+import time
+
+# (module, function, stage, observer applied to the return value or None)
+PROBES = (
+    ("backend.reactions.single_replacement", "predict_single_replacement", "predict", "_observe_prediction"),
+    ("backend.reactions.single_replacement", "_check", "feasibility", "_observe_feasibility"),
+    ("backend.core.parser", "parse_composition", "parse", None),
+    ("backend.core.parser", "split_cation_anion", "split", None),
+    ("backend.core.charges", "infer_cation_charge", "charges", None),
+    ("backend.core.charges", "infer_anion_charge", "charges", None),
+    ("backend.core.utils", "formula_from_ions", "products", None),
+    ("backend.core.balancer", "balance_equation", "balance", None),
+)
+
+ENABLED = False
+
+_timers = {}        # stage -> [calls, total seconds, max seconds]
+_counters = Counter()
+_hooks = []
+_originals = {}     # (module, function) -> original callable
+
+# formulas and element symbols inside failure reasons: "Cu is less reactive than Zn" -> "{} is less reactive than {}"
+_FORMULA_RE = re.compile(r"(?<!\w)(?:[A-Z][a-z]?\d*|\((?:[A-Z][a-z]?\d*)+\)\d*)+(?!\w)")
+
+
+def reason_template(reason: str) -> str:
+    """Failure reason with its formulas blanked out, so counts group by code path, not by input."""
+    return _FORMULA_RE.sub("{}", reason)
+
+
+def _observe_prediction(result):
+    if result.get("possible"):
+        if "warning" in result:
+            _counters["reason:" + reason_template(result["warning"])] += 1
+    else:
+        _counters["reason:" + reason_template(result["reason"])] += 1
+
+
+def _observe_feasibility(result):
+    possible, subtype, _ = result
+    subtype = getattr(subtype, "value", subtype)
+    _counters[f"subtype:{subtype}:{'possible' if possible else 'rejected'}"] += 1
+
+
+def _record(stage, seconds):
+    entry = _timers.get(stage)
+    if entry is None:
+        _timers[stage] = [1, seconds, seconds]
+    else:
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+    for hook in _hooks:
+        hook(stage, seconds)
+
+
+def _wrap(fn, stage, observe):
+    perf_counter = time.perf_counter
+
+    def probe(*args, **kwargs):
+        start = perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            _record(stage, perf_counter() - start)
+        if observe is not None:
+            observe(result)
+        return result
+
+    probe.__name__ = fn.__name__
+    probe.__doc__ = fn.__doc__
+    probe.__wrapped__ = fn
+    return probe
+
+
+def enable():
+    """Install the probes (idempotent)."""
+    global ENABLED
+    if ENABLED:
+        return
+    for module_name, attr, stage, observer in PROBES:
+        module = importlib.import_module(module_name)
+        fn = getattr(module, attr)
+        _originals[module_name, attr] = fn
+        setattr(module, attr, _wrap(fn, stage, globals()[observer] if observer else None))
+    ENABLED = True
+
+
+def disable():
+    """Restore the original functions (idempotent). Collected stats are kept."""
+    global ENABLED
+    for (module_name, attr), fn in _originals.items():
+        setattr(importlib.import_module(module_name), attr, fn)
+    _originals.clear()
+    ENABLED = False
+
+
+def reset():
+    """Zero every timer and counter (cache stats belong to the caches; see their clear_* helpers)."""
+    _timers.clear()
+    _counters.clear()
+
+
+def add_hook(hook):
+    """Register hook(stage, seconds), called after every probed call. Returns the hook."""
+    _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    """Unregister a hook added with add_hook."""
+    _hooks.remove(hook)
+
+
+def snapshot():
+    """
+    Current stats as a plain dict:
+    - stages: {stage: {calls, total_ms, mean_us, max_us}}
+    - subtypes / reasons: {name: count} for feasibility subtypes and failure-reason templates
+    - caches: info() of the parse, species and balancer template caches
+    """
+    from backend.core import balancer, parser, species
+    stages = {
+        stage: {"calls": calls, "total_ms": total * 1e3, "mean_us": total / calls * 1e6, "max_us": peak * 1e6}
+        for stage, (calls, total, peak) in _timers.items()
+    }
+    subtypes, reasons = {}, {}
+    for key, count in _counters.items():
+        kind, _, name = key.partition(":")
+        (subtypes if kind == "subtype" else reasons)[name] = count
+    return {
+        "enabled": ENABLED,
+        "stages": stages,
+        "subtypes": subtypes,
+        "reasons": reasons,
+        "caches": {
+            "parse": parser.parse_cache_info(),
+            "species": species._SPECIES_CACHE.info(),
+            "template": balancer.template_cache_info(),
+        },
+    }
+
+
+class Stats:
+    """Handle yielded by collect(); snapshot() works both inside and after the block."""
+    __slots__ = ("_final",)
+
+    def __init__(self):
+        self._final = None
+
+    def snapshot(self):
+        return self._final if self._final is not None else snapshot()
+
+
+@contextmanager
+def collect(hook=None):
+    """
+    Enable instrumentation for the duration of the block with fresh counters.
+    An optional hook(stage, seconds) receives every timing while the block runs.
+    The previous enabled/disabled state is restored on exit.
+    """
+    was_enabled = ENABLED
+    reset()
+    if hook is not None:
+        add_hook(hook)
+    enable()
+    stats = Stats()
+    try:
+        yield stats
+    finally:
+        stats._final = snapshot()
+        if hook is not None:
+            remove_hook(hook)
+        if not was_enabled:
+            disable()
@@ -0,0 +1,181 @@
+#--- multi-modular exact nullspace ---
+# Integer nullspace of a (sparse) integer matrix for large reaction networks.
+# The matrix is reduced to RREF modulo several 31-bit primes with sparse row elimination;
+# the RREF entries are lifted by CRT and recovered as fractions by rational reconstruction,
+# and the candidate basis is verified exactly against the input before it is returned.
+# Cost grows with the size of the answer, not with the Fraction blow-up of dense elimination.
+from itertools import chain
+from math import gcd, isqrt
+from functools import reduce
+
+
+def _is_prime(n):
+    # deterministic Miller-Rabin for n < 3.4e14
+    if n < 2:
+        return False
+    for p in (2, 3, 5, 7, 11, 13, 17):
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in (2, 3, 5, 7, 11, 13, 17):
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+_PRIMES = []
+
+
+def _primes():
+    """31-bit primes in descending order, generated on demand and remembered."""
+    yield from _PRIMES
+    n = _PRIMES[-1] - 2 if _PRIMES else (1 << 31) - 1
+    while True:
+        if _is_prime(n):
+            _PRIMES.append(n)
+            yield n
+        n -= 2
+
+
+def _rref_mod(rows, n, p):
+    """
+    Reduced row echelon form of sparse rows ({col: value}) modulo p.
+    Returns (pivot columns, pivot rows); each pivot row is normalised to 1 on its pivot.
+    The pivot row for a column is the shortest candidate, which keeps fill-in low; the RREF
+    itself does not depend on that choice.
+    """
+    remaining = []
+    for row in rows:
+        r = {c: v % p for c, v in row.items() if v % p}
+        if r:
+            remaining.append(r)
+    pivots, prows = [], []
+    for col in range(n):
+        if not remaining:
+            break
+        cand = [r for r in remaining if col in r]
+        if not cand:
+            continue
+        prow = min(cand, key=len)
+        remaining = [r for r in remaining if r is not prow]
+        inv = pow(prow[col], -1, p)
+        for c in prow:
+            prow[c] = prow[c] * inv % p
+        for r in chain(remaining, prows):
+            f = r.get(col)
+            if f:
+                for c, v in prow.items():
+                    x = (r.get(c, 0) - f * v) % p
+                    if x:
+                        r[c] = x
+                    else:
+                        del r[c]
+        pivots.append(col)
+        prows.append(prow)
+        remaining = [r for r in remaining if r]
+    return pivots, prows
+
+
+def _rational_reconstruct(a, m):
+    """(num, den) with num/den == a (mod m) and |num|, den <= sqrt(m/2); None if none exists."""
+    bound = isqrt(m // 2)
+    r0, r1 = m, a % m
+    s0, s1 = 0, 1
+    while r1 > bound:
+        q = r0 // r1
+        r0, r1 = r1, r0 - q * r1
+        s0, s1 = s1, s0 - q * s1
+    if s1 == 0 or abs(s1) > bound:
+        return None
+    if s1 < 0:
+        r1, s1 = -r1, -s1
+    if gcd(r1, s1) != 1:
+        return None
+    return r1, s1
+
+
+def _lift(pivots, free, residues, modulus):
+    """Integer basis vectors from CRT residues of the RREF entries; None if reconstruction fails."""
+    basis = []
+    for j, f in enumerate(free):
+        fracs = []
+        for i in range(len(pivots)):
+            rr = _rational_reconstruct(residues[i][j], modulus)
+            if rr is None:
+                return None
+            fracs.append(rr)
+        den = 1
+        for _, d in fracs:
+            den = den * d // gcd(den, d)
+        vec = {f: den}
+        for pc, (num, d) in zip(pivots, fracs):
+            if num:
+                vec[pc] = -num * (den // d)
+        basis.append(vec)
+    return basis
+
+
+def _verify(rows, basis):
+    return all(sum(v * vec.get(c, 0) for c, v in row.items()) == 0 for vec in basis for row in rows)
+
+
+def rref_nullspace(matrix, n):
+    """
+    Exact nullspace of an integer matrix with n columns, in RREF form.
+    Returns (pivot columns, free columns, basis) where basis[j] is the integer vector (list of n)
+    that is non-zero on free column free[j] only among the free columns, i.e. the Fraction RREF
+    basis vector scaled by the lcm of its denominators (no further gcd reduction).
+    """
+    rows = [{c: v for c, v in enumerate(row) if v} for row in matrix]
+    rows = [r for r in rows if r]
+    best = None            # pivot tuple the accumulated residues belong to
+    residues, modulus = None, 1
+    for p in _primes():
+        pivots, prows = _rref_mod(rows, n, p)
+        pivots = tuple(pivots)
+        if best is not None and pivots != best:
+            # the true pivot set has the highest rank and is lexicographically smallest;
+            # a prime that drops rank or shifts a pivot right divides some minor - discard it
+            if len(pivots) < len(best) or (len(pivots) == len(best) and pivots > best):
+                continue
+            best = None
+        pivot_set = set(pivots)
+        free = [c for c in range(n) if c not in pivot_set]
+        entries = [[r.get(f, 0) for f in free] for r in prows]
+        if best is None:
+            best, residues, modulus = pivots, entries, p
+        else:
+            inv = pow(modulus, -1, p)
+            for old, new in zip(residues, entries):
+                for j, b in enumerate(new):
+                    a = old[j]
+                    old[j] = a + modulus * ((b - a) * inv % p)
+            modulus *= p
+        basis = _lift(best, free, residues, modulus)
+        if basis is not None and _verify(rows, basis):
+            return list(best), free, [[vec.get(c, 0) for c in range(n)] for vec in basis]
+
+
+def integer_basis(matrix, n):
+    """
+    Primitive integer basis of the nullspace: one vector per free column, each divided by its
+    gcd and sign-normalised so its first non-zero entry is positive. An empty list means only
+    the trivial solution exists; more than one vector means the solution is not unique.
+    """
+    _, _, basis = rref_nullspace(matrix, n)
+    out = []
+    for vec in basis:
+        g = reduce(gcd, vec, 0) or 1
+        lead = next(v for v in vec if v)
+        out.append([x // g if lead > 0 else -x // g for x in vec])
+    return out
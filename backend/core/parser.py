@@ -1,16 +1,13 @@
 #--- parsing ---
-from backend.core import rules, charges
+from backend.core import tables
+from backend.core.cache import LRUCache
+from backend.core.elements import ELEMENTS
+from types import MappingProxyType
 import re
+import sys
 
-ELEMENT_SYMBOLS = [
- "H","He","Li","Be","B","C","N","O","F","Ne","Na","Mg","Al","Si","P","S","Cl","Ar",
- "K","Ca","Sc","Ti","V","Cr","Mn","Fe","Co","Ni","Cu","Zn","Ga","Ge","As","Se","Br","Kr",
- "Rb","Sr","Y","Zr","Nb","Mo","Tc","Ru","Rh","Pd","Ag","Cd","In","Sn","Sb","Te","I","Xe",
- "Cs","Ba","La","Ce","Pr","Nd","Pm","Sm","Eu","Gd","Tb","Dy","Ho","Er","Tm","Yb","Lu",
- "Hf","Ta","W","Re","Os","Ir","Pt","Au","Hg","Tl","Pb","Bi"
-]
-#longest-first order to match multi-letter symbols correctly
-ELEMENT_SYMBOLS.sort(key=lambda s: -len(s))
+#longest-first order to match multi-letter symbols correctly (periodic order lives in elements.ELEMENTS)
+ELEMENT_SYMBOLS = tuple(sorted(ELEMENTS, key=lambda s: -len(s)))
 
 '''
 def parse_formula(formula: str):
@@ -55,79 +52,229 @@ def parse_formula(formula: str):
         raise ValueError("Unbalanced parentheses in formula: " + formula)
     return stack[0]
 '''
+# One precompiled tokenizer; each match is (symbol, count, open, close, group mult, hydrate sep, hydrate mult).
+# Characters matching none of the alternatives (spaces, stray digits, (aq) noise) are skipped.
+_TOKEN_RE = re.compile(r"([A-Z][a-z]?)(\d*)|([(\[{])|([)\]}])(\d*)|([\u00b7\u2022\u22c5*.])(\d*)")
+_COEFFICIENT_RE = re.compile(r"\s*(\d+)")
+_LEADING = frozenset(" 0123456789")
+_HYDRATE_RE = re.compile(r"[\u00b7\u2022\u22c5*.]")
+_MONATOMIC_RE = re.compile(r"\s*\d*\s*[A-Z][a-z]?")
+
+
+def _split_charge(formula: str):
+    """
+    Strip a trailing charge suffix and return (body, charge).
+    Accepts NH4+, Fe+++, SO4^2-, SO4^-2, SO4 2-, SO4-2 and ion notation with the magnitude
+    glued before the sign: Fe3+, Ca2+, SO42-, Hg22+. A glued digit is the charge on a single
+    element (Fe3+) or after a subscript (SO42- is SO4 2-); otherwise it is the subscript and
+    the charge is 1 (NH4+, NO3-, MnO4-).
+    """
+    last = formula[-1:]
+    end = len(formula)
+    if last == "+" or last == "-":
+        j = end
+        while j and formula[j-1] in "+-":
+            j -= 1
+        sign = 1 if formula[j] == "+" else -1
+        magnitude = end - j
+        k = j
+        while k and "0" <= formula[k-1] <= "9":
+            k -= 1
+        if k < j and k and formula[k-1] in "^ ":
+            magnitude, j = int(formula[k:j]), k - 1
+        elif k < j and magnitude == 1:
+            if j - k >= 2:
+                magnitude, j = int(formula[j-1]), j - 1
+            elif _MONATOMIC_RE.fullmatch(formula, 0, k):
+                magnitude, j = int(formula[k:j]), k
+        elif j and formula[j-1] == "^":
+            j -= 1
+        return formula[:j], sign * magnitude
+    k = end
+    while k and "0" <= formula[k-1] <= "9":
+        k -= 1
+    if k < end and k and formula[k-1] in "+-":
+        sign = 1 if formula[k-1] == "+" else -1
+        j = k - 1
+        if j and formula[j-1] == "^":
+            j -= 1
+        return formula[:j], sign * int(formula[k:])
+    return formula, 0
+
+
+def _scale(parts, start, mult):
+    for k in range(start, len(parts)):
+        sym, cnt = parts[k]
+        parts[k] = (sym, cnt * mult)
+
+
+def scan_formula(formula: str):
+    """
+    Single-pass scanner behind parse_formula.
+    Returns (ordered parts list, element counts dict, leading coefficient, charge).
+    - Parentheses/brackets multiply the group in place (no per-frame list/dict).
+    - Hydrates: the segment after a dot (·, *, .) is multiplied by its leading number.
+    - A leading coefficient (2NaBr) is reported separately; counts are per formula unit.
+    """
+    if "+" in formula or "-" in formula:
+        body, charge = _split_charge(formula)
+    else:
+        body, charge = formula, 0
+    coefficient = 1
+    if body[:1] in _LEADING:
+        m = _COEFFICIENT_RE.match(body)
+        if m:
+            coefficient = int(m.group(1))
+            body = body[m.end():]
+
+    parts = []
+    append = parts.append
+    opens = []          # index into parts where each open group starts
+    seg_start = 0       # first part of the current hydrate segment
+    seg_mult = 1
+    for sym, cnt, open_, close, mult, sep, sep_mult in _TOKEN_RE.findall(body):
+        if sym:
+            append((sym, int(cnt) if cnt else 1))
+        elif open_:
+            opens.append(len(parts))
+        elif close:
+            if not opens:
+                raise ValueError("Unbalanced parentheses in formula: " + formula)
+            start = opens.pop()
+            if mult and mult != "1":
+                _scale(parts, start, int(mult))
+        elif not opens:
+            # hydrate separator: close the previous segment, open a new one
+            if seg_mult != 1:
+                _scale(parts, seg_start, seg_mult)
+            seg_mult = int(sep_mult) if sep_mult else 1
+            seg_start = len(parts)
+    if opens:
+        raise ValueError("Unbalanced parentheses in formula: " + formula)
+    if seg_mult != 1:
+        _scale(parts, seg_start, seg_mult)
+
+    counts = {}
+    for sym, cnt in parts:
+        counts[sym] = counts.get(sym, 0) + cnt
+    return parts, counts, coefficient, charge
+
+
 def parse_formula(formula: str):
     """
     Parse chemical formula into both:
     - ordered list of (element/ion, count)
     - dict of element counts
-    Handles parentheses.
+    Handles parentheses, hydrates, leading coefficients and charge suffixes.
     """
-    tokens = re.findall(r'([A-Z][a-z]?|\(|\)|\d+)', formula)
-    stack = [[[], {}]]  # each stack frame: [list, dict]
-    i = 0
-    while i < len(tokens):
-        tok = tokens[i]
-        if tok == '(':
-            stack.append([[], {}])
-            i += 1
-        elif tok == ')':
-            group_list, group_dict = stack.pop()
-            i += 1
-            mult = 1
-            if i < len(tokens) and tokens[i].isdigit():
-                mult = int(tokens[i]); i += 1
-            # multiply counts and append to parent
-            for sym, cnt in group_list:
-                stack[-1][0].append((sym, cnt * mult))
-            for el, cnt in group_dict.items():
-                stack[-1][1][el] = stack[-1][1].get(el, 0) + cnt * mult
-        elif re.match(r'\d+$', tok):
-            # standalone number (shouldn’t happen if regex is correct)
-            i += 1
-        else:
-            # element or ion symbol
-            el = tok
-            cnt = 1
-            if i+1 < len(tokens) and tokens[i+1].isdigit():
-                cnt = int(tokens[i+1])
-                i += 1
-            stack[-1][0].append((el, cnt))
-            stack[-1][1][el] = stack[-1][1].get(el, 0) + cnt
-            i += 1
-    if len(stack) != 1:
-        raise ValueError("Unbalanced parentheses in formula: " + formula)
-    return stack[0][0], stack[0][1]  # (ordered list, dict)
+    parts, counts, _, _ = scan_formula(formula)
+    return parts, counts  # (ordered list, dict)
+
+
+#--- shared parse cache ---
+
+class Composition:
+    """
+    Immutable parse result shared by every caller of parse_composition.
+    - parts: ordered tuple of (symbol, count) pairs (same order as parse_formula)
+    - counts: read-only mapping {element: total count}
+    Unpacks like parse_formula: `ordered, counts = parse_composition(f)`.
+    """
+    __slots__ = ("parts", "counts", "_hash")
+
+    def __init__(self, parts, counts):
+        self.parts = parts
+        self.counts = MappingProxyType(counts)
+        self._hash = hash(parts)
+
+    def __iter__(self):
+        yield self.parts
+        yield self.counts
+
+    def __eq__(self, other):
+        if not isinstance(other, Composition):
+            return NotImplemented
+        return self.parts == other.parts
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"Composition({self.parts!r})"
+
+
+_PARSE_CACHE = LRUCache(maxsize=4096)
+
+
+def parse_composition(formula: str) -> Composition:
+    """
+    Cached variant of parse_formula returning an interned, immutable Composition.
+    Repeated calls with the same string return the very same object.
+    """
+    comp = _PARSE_CACHE.get(formula)
+    if comp is None:
+        ordered, counts = parse_formula(formula)
+        parts = tuple((sys.intern(sym), cnt) for sym, cnt in ordered)
+        comp = _PARSE_CACHE.put(formula, Composition(parts, {sys.intern(el): cnt for el, cnt in counts.items()}))
+    return comp
+
+
+def parse_cache_info():
+    """Return hit/miss/eviction stats for the shared parse cache."""
+    return _PARSE_CACHE.info()
+
+
+def set_parse_cache_size(maxsize):
+    """Set the maximum number of cached formulas (None = unbounded, 0 = disabled)."""
+    _PARSE_CACHE.resize(maxsize)
+
+
+def clear_parse_cache():
+    """Drop every cached composition and reset the stats."""
+    _PARSE_CACHE.clear()
 
 
 #--- cation/anion detection helpers ---
 
-def detect_polyatomic_in_formula(raw: str):
+def detect_polyatomic_in_formula(raw: str, rules=None):
     """
     Detects if any known polyatomic ion appears in `raw`.
     Returns (found, key, comp_dict, charge, name, position) where position is 'prefix'/'suffix' or None
+    rules: tables.RuleTables snapshot to read (default: tables.TABLES), as for the functions below.
     """
-    for key, (comp, charge, name) in charges.POLYATOMIC.items():
-        if raw.startswith(key):
-            return True, key, comp, charge, name, 'prefix'
-        if raw.endswith(key):
-            return True, key, comp, charge, name, 'suffix'
-        # also check internal occurrences (less common for salts but safe)
-        if key in raw:
-            return True, key, comp, charge, name, 'internal'
-    return False, None, None, None, None, None
+    t = tables.TABLES if rules is None else rules
+    automaton = t.polyatomic_automaton
+    # one automaton pass finds every occurrence; the earliest ion in table order wins and
+    # reports its best position (prefix > suffix > internal)
+    best_kid, best_pos = None, None
+    end = len(raw)
+    for start, kid in automaton.matches(raw):
+        if best_kid is not None and kid > best_kid:
+            continue
+        pos = 0 if start == 0 else (1 if start + len(automaton.keys[kid]) == end else 2)
+        if kid != best_kid or pos < best_pos:
+            best_kid, best_pos = kid, pos
+    if best_kid is None:
+        return False, None, None, None, None, None
+    key = automaton.keys[best_kid]
+    comp, charge, name = t.polyatomic[key]
+    # comp is a read-only view into the shared tables; callers get their own dict
+    return True, key, dict(comp), charge, name, ('prefix', 'suffix', 'internal')[best_pos]
 
 #needs refinement
-def dict_to_formula(counts: dict) -> str:
+def dict_to_formula(counts: dict, rules=None) -> str:
     """
     Convert element-count dict into a conventional chemical formula.
     - Detects polyatomic groups (SO4, NO3, OH, etc.)
     - Handles acids (H first) and salts (metal first)
     - Falls back to Hill system ordering if unknown
+    rules: tables.RuleTables snapshot to read (default: tables.TABLES).
     """
+    t = tables.TABLES if rules is None else rules
     # First, check if the dict exactly matches a known polyatomic
-    for ion, (comp, charge, name) in charges.POLYATOMIC.items():
-        if comp == counts:
-            return ion
+    ion = t.ion_by_composition.get(tables.composition_key(counts))
+    if ion is not None:
+        return ion
 
     parts = []
 
@@ -139,7 +286,8 @@ def dict_to_formula(counts: dict) -> str:
         counts = {el:cnt for el,cnt in counts.items() if el != "H"}
 
     # Next: if a metal is present, put it first
-    metals = [el for el in counts if el in rules.ACTIVITY_SERIES]
+    activity = t.activity
+    metals = [el for el in counts if el in activity]
     if metals:
         for m in metals:
             c = counts[m]
@@ -153,7 +301,7 @@ def dict_to_formula(counts: dict) -> str:
 
     return "".join(parts)
 
-def clean_ion(sym: str) -> str:
+def clean_ion(sym: str, rules=None) -> str:
     """
     Normalize ion string:
     - Remove outer parentheses and trailing multipliers, e.g. (NO3)2 -> NO3
@@ -165,14 +313,29 @@ def clean_ion(sym: str) -> str:
     if m:
         return m.group(1)
     # If matches known polyatomic exactly, keep it
-    if sym in charges.POLYATOMIC:
+    if sym in (tables.TABLES if rules is None else rules).polyatomic:
         return sym
     # Otherwise strip trailing digits (like Cl2 -> Cl)
     return re.sub(r'\d+$', '', sym)
 
-    
-def split_cation_anion(compound_raw: str):
-    ordered, counts = parse_formula(compound_raw)
+
+def strip_hydrate(formula: str) -> str:
+    """Formula without its water of crystallisation: 'CuSO4·5H2O' -> 'CuSO4' (also * and . separators)."""
+    if "." in formula or "*" in formula or not formula.isascii():
+        return _HYDRATE_RE.split(formula, 1)[0]
+    return formula
+
+
+def split_cation_anion(compound_raw, rules=None):
+    """
+    Split a compound into (cation, anion) symbols; anion is "" for a pure element.
+    Accepts a formula string or a species.Species (whose split is computed once and cached).
+    Water of crystallisation is ignored: CuSO4·5H2O splits like CuSO4.
+    """
+    if not isinstance(compound_raw, str):
+        return compound_raw.split(rules)
+    compound_raw = strip_hydrate(compound_raw)
+    ordered, counts = parse_composition(compound_raw)
 
     # pure element case
     if len(ordered) == 1:
@@ -180,36 +343,133 @@ def split_cation_anion(compound_raw: str):
 
     # acid rule: H at start
     if ordered[0][0] == "H" and compound_raw != "H2O":
-        return "H", match_polyatomic_or_fallback(ordered[1:])
+        return "H", match_polyatomic_or_fallback(ordered[1:], rules)
 
     # default: first = cation, rest = anion
     cation = ordered[0][0]
-    anion = match_polyatomic_or_fallback(ordered[1:])
-    return clean_ion(cation), clean_ion(anion)
+    anion = match_polyatomic_or_fallback(ordered[1:], rules)
+    return clean_ion(cation, rules), clean_ion(anion, rules)
 
 
-def match_polyatomic_or_fallback(anion_parts):
+def match_polyatomic_or_fallback(anion_parts, rules=None):
     # build dict from the part
     sub_dict = {}
     for sym, cnt in anion_parts:
         sub_dict[sym] = sub_dict.get(sym, 0) + cnt
 
-    # try match known polyatomics
-    for ion, (comp, charge, _) in charges.POLYATOMIC.items():
-        factor = None
-        valid = True
-        for el, c in comp.items():
-            if el not in sub_dict:
-                valid = False
-                break
-            ratio = sub_dict[el] // c
-            if factor is None:
-                factor = ratio
-            elif factor != ratio:
-                valid = False
-                break
-        if valid and factor and all(sub_dict[e] == comp[e]*factor for e in comp):
+    # try match known polyatomics: sub_dict must be a whole multiple of the ion's composition
+    reduced, g = tables.reduced_composition_key(sub_dict)
+    for ion, multiple in (tables.TABLES if rules is None else rules).ion_by_reduced.get(reduced, ()):
+        if g % multiple == 0:
             return ion  # return canonical symbol like SO4
 
     # fallback: rebuild string
     return "".join(f"{sym}{cnt if cnt > 1 else ''}" for sym, cnt in anion_parts)
+
+
+#--- input canonicalization ---
+# Raw user input comes in many spellings of one species (' Zn ', '2NaBr', 'NaBr(aq)', 'CuSO₄',
+# 'CuN2O6' vs 'Cu(NO3)2'). canonicalize() maps them to one formula key so every cache
+# downstream (parse, split, outcome table, server results) sees a single entry per species.
+
+_SUBSCRIPTS = str.maketrans("₀₁₂₃₄₅₆₇₈₉", "0123456789")
+_STATE_RE = re.compile(r"\((?:aq|s|l|g)\)$", re.IGNORECASE)
+_CANONICAL_CACHE = LRUCache(maxsize=16384)
+
+
+def canonicalize(raw: str, rules=None) -> str:
+    """
+    Canonical formula key for raw input: ' 2 NaBr(aq) ' -> 'NaBr', 'CuSO₄' -> 'CuSO4',
+    'CuN2O6' -> 'Cu(NO3)2'. Strips whitespace, unicode subscripts, a leading coefficient and a
+    trailing state symbol, then regroups polyatomic ions (see _regroup). Input that does not
+    parse comes back stripped but otherwise unchanged, so callers still raise their usual errors.
+    Cached per (rules version, raw input).
+    """
+    t = tables.TABLES if rules is None else rules
+    cache_key = (t.version, raw)
+    key = _CANONICAL_CACHE.get(cache_key)
+    if key is not None:
+        return key
+    body = _STATE_RE.sub("", "".join(raw.split()).translate(_SUBSCRIPTS)).lstrip("0123456789")
+    try:
+        key = _regroup(body, t)
+    except ValueError:
+        key = body
+    return _CANONICAL_CACHE.put(cache_key, key)
+
+
+def canonical_cache_info():
+    """Return hit/miss/eviction stats for the canonicalization cache."""
+    return _CANONICAL_CACHE.info()
+
+
+def clear_canonical_cache():
+    """Drop every cached canonical key and reset the stats."""
+    _CANONICAL_CACHE.clear()
+
+
+def _group(ion, count, is_polyatomic):
+    if count == 1:
+        return ion
+    return f"({ion}){count}" if is_polyatomic else f"{ion}{count}"
+
+
+def _regroup(body, t):
+    """
+    Rewrite a neutral salt as cation + polyatomic anion groups ('CaO2H2' -> 'Ca(OH)2',
+    'Al2S3O12' -> 'Al2(SO4)3'). Only rewrites when the default charges balance and the
+    composition is unchanged, so multivalent or organic formulas are left as written.
+    """
+    comp = parse_composition(body)
+    counts = comp.counts
+    if len(counts) < 2:
+        return body
+
+    # cation: a leading positive polyatomic ion ('NH4Cl', '(NH4)2S'), else the first element
+    head = body[1:] if body.startswith("(") else body
+    found = t.polyatomic_automaton.prefixes(head)
+    cation = t.polyatomic_automaton.keys[found[-1]] if found else None
+    if cation is not None and t.polyatomic[cation][1] > 0:
+        n = 1
+        if body.startswith("("):
+            rest = body[len(cation) + 2:]
+            digits = rest[:len(rest) - len(rest.lstrip("0123456789"))]
+            n = int(digits) if digits else 1
+        c_comp, c_charge, _ = t.polyatomic[cation]
+        cation_poly = True
+    else:
+        cation, n = comp.parts[0]
+        z = t.atomic_number.get(cation)
+        if z is None:
+            return body
+        c_comp, c_charge, cation_poly = {cation: 1}, t.cation_charge_by_z[z], False
+
+    remainder = dict(counts)
+    for sym, cnt in c_comp.items():
+        left = remainder.get(sym, 0) - cnt * n
+        if left < 0:
+            return body
+        if left:
+            remainder[sym] = left
+        else:
+            del remainder[sym]
+    if not remainder:
+        return body
+
+    # anion: a whole multiple of one polyatomic ion, or (after a polyatomic cation) one element
+    reduced, g = tables.reduced_composition_key(remainder)
+    anion = None
+    for ion, multiple in t.ion_by_reduced.get(reduced, ()):
+        if g % multiple == 0 and t.polyatomic[ion][1] < 0:
+            anion, k, a_charge, anion_poly = ion, g // multiple, -t.polyatomic[ion][1], True
+            break
+    if anion is None:
+        if not cation_poly or len(remainder) != 1:
+            return body
+        anion, k = next(iter(remainder.items()))
+        a_charge, anion_poly = -t.anion_charge.get(anion, 0), False
+
+    if not c_charge or a_charge <= 0 or n * c_charge != k * a_charge:
+        return body
+    key = _group(cation, n, cation_poly) + _group(anion, k, anion_poly)
+    return key if parse_composition(key).counts == counts else body
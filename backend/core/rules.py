@@ -24,3 +24,16 @@ HALOGEN_ORDER = [
     # in the most reactive order
     'F', 'Cl', 'Br', 'I', 'At'
 ]
+COLD_WATER_SERIES = [
+    # metals that displace hydrogen from cold water
+    'Li', 'Na', 'K', 'Rb', 'Cs', 'Ca', 'Sr', 'Ba'
+]
+GAS_SERIES = [
+    # gases at room temperature (elements match in any form: Cl, Cl2)
+    'H2', 'N2', 'O2', 'F2', 'Cl2', 'He', 'Ne', 'Ar', 'Kr', 'Xe',
+    'CO2', 'CO', 'NH3', 'CH4', 'SO2', 'H2S', 'NO2'
+]
+LIQUID_SERIES = [
+    # liquids at room temperature
+    'H2O', 'Br2', 'Hg'
+]
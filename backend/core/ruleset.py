@@ -0,0 +1,169 @@
+#--- rule sets ---
+# A RuleSet is one named, immutable set of rule data (activity series, halogen order, cold-water
+# metals, charge maps, polyatomic ions) that can be loaded from JSON or TOML instead of editing
+# rules.py / charges.py in place. It is identified by `version`, the content hash its compiled
+# RuleTables carry (tables.content_version), and compiled at most once per process: RuleSets
+# with the same content share one RuleTables, so switching between them is a dict lookup.
+#
+# Pass `rule_set.compile()` as `rules=` to the prediction functions to use it for one call or
+# batch, or activate() it to make it the process-wide default (tables.TABLES). Rule-dependent
+# caches key on the version, so neither path can serve results computed under other rules.
+#
+# File format (JSON shown; TOML uses the same keys). Every key is optional and is applied over
+# a base rule set (default: the rules.py / charges.py data): lists replace the base list,
+# mappings are merged into the base mapping.
+#
+#   {"name": "lab-a",
+#    "activity_series": ["Li", "K", ...],
+#    "cation_charges": {"Fe": 3},
+#    "polyatomic": {"HCO3": [{"H": 1, "C": 1, "O": 3}, -1, "bicarbonate"]}}
+#
+# TOML polyatomic entries may also be tables: [polyatomic.HCO3] composition = {...}, charge, name.
+import json
+import os
+from backend.core import tables
+from backend.core.elements import ATOMIC_NUMBER
+
+LIST_FIELDS = ("activity_series", "halogen_order", "cold_water_series")
+CHARGE_FIELDS = ("cation_charges", "group_cation_charges", "anion_charges", "element_anion_charges")
+FIELDS = LIST_FIELDS + CHARGE_FIELDS + ("polyatomic",)   # RuleTables argument order
+
+_COMPILED = {}   # version -> RuleTables, shared by every RuleSet with that content
+
+
+class RuleSet:
+    """One immutable, versioned set of rule data; see the module header for the file format."""
+    __slots__ = ("name", "version") + FIELDS
+
+    def __init__(self, name, activity_series, halogen_order, cold_water_series, cation_charges,
+                 group_cation_charges, anion_charges, element_anion_charges, polyatomic):
+        data = {
+            "activity_series": tuple(activity_series),
+            "halogen_order": tuple(halogen_order),
+            "cold_water_series": tuple(cold_water_series),
+            "cation_charges": dict(cation_charges),
+            "group_cation_charges": dict(group_cation_charges),
+            "anion_charges": dict(anion_charges),
+            "element_anion_charges": dict(element_anion_charges),
+            "polyatomic": {ion: _polyatomic_entry(ion, entry) for ion, entry in polyatomic.items()},
+        }
+        _validate(data)
+        object.__setattr__(self, "name", name)
+        for field, value in data.items():
+            object.__setattr__(self, field, value)
+        object.__setattr__(self, "version", tables.content_version(*(data[f] for f in FIELDS)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"RuleSet is immutable; cannot set '{name}' (build a new one with from_dict)")
+
+    def __repr__(self):
+        return f"RuleSet({self.name!r}, version={self.version!r})"
+
+    def __reduce__(self):
+        return RuleSet, (self.name, *(getattr(self, f) for f in FIELDS))
+
+    @classmethod
+    def default(cls):
+        """The rule data currently in rules.py / charges.py."""
+        from backend.core import charges, rules
+        return cls("default", rules.ACTIVITY_SERIES, rules.HALOGEN_ORDER, rules.COLD_WATER_SERIES,
+                   charges.COMMON_CATION_CHARGES, charges.GROUP_CATION_CHARGES,
+                   charges.COMMON_ANION_CHARGES, charges.ELEMENT_ANION_CHARGES, charges.POLYATOMIC)
+
+    @classmethod
+    def from_dict(cls, data, base=None):
+        """RuleSet from parsed file data applied over base (default: RuleSet.default())."""
+        base = cls.default() if base is None else base
+        unknown = set(data) - set(FIELDS) - {"name"}
+        if unknown:
+            raise ValueError(f"Unknown rule set keys: {', '.join(sorted(unknown))}")
+        fields = {}
+        for field in FIELDS:
+            value = getattr(base, field)
+            if field in data:
+                value = list(data[field]) if field in LIST_FIELDS else {**value, **data[field]}
+            fields[field] = value
+        return cls(data.get("name", base.name), **fields)
+
+    @classmethod
+    def load(cls, path, base=None):
+        """RuleSet from a .json or .toml file (name defaults to the file name)."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".json":
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        elif ext == ".toml":
+            try:
+                import tomllib
+            except ImportError:
+                raise RuntimeError("TOML rule sets need Python 3.11+ (tomllib)") from None
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            raise ValueError(f"Unsupported rule set file '{path}' (expected .json or .toml)")
+        data.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+        return cls.from_dict(data, base)
+
+    def to_dict(self):
+        """JSON-ready data; RuleSet.from_dict(rs.to_dict()) has the same version."""
+        out = {"name": self.name}
+        for field in FIELDS:
+            value = getattr(self, field)
+            out[field] = list(value) if field in LIST_FIELDS else dict(value)
+        out["polyatomic"] = {ion: [dict(comp), charge, name] for ion, (comp, charge, name) in self.polyatomic.items()}
+        return out
+
+    def compile(self):
+        """The RuleTables for this rule set, compiled on first use and shared by version."""
+        compiled = _COMPILED.get(self.version)
+        if compiled is None:
+            current = tables.TABLES
+            if current.version == self.version:
+                compiled = current
+            else:
+                compiled = tables.RuleTables(*(getattr(self, f) for f in FIELDS))
+            compiled = _COMPILED.setdefault(self.version, compiled)
+        return compiled
+
+
+def _polyatomic_entry(ion, entry):
+    if isinstance(entry, dict):
+        entry = (entry.get("composition"), entry.get("charge"), entry.get("name", ion))
+    try:
+        comp, charge, name = entry
+    except (TypeError, ValueError):
+        raise ValueError(f"Polyatomic ion '{ion}' must be (composition, charge, name)") from None
+    return dict(comp or {}), charge, str(name)
+
+
+def _validate(data):
+    for field in CHARGE_FIELDS:
+        for sym, charge in data[field].items():
+            if not isinstance(charge, int) or isinstance(charge, bool):
+                raise ValueError(f"{field}: charge of '{sym}' must be an integer, got {charge!r}")
+            if field in ("cation_charges", "group_cation_charges") and not 0 <= charge <= 255:
+                # RuleTables keeps element cation charges in a byte table (0 = unknown)
+                raise ValueError(f"{field}: charge of '{sym}' must be between 0 and 255, got {charge}")
+    for ion, (comp, charge, _) in data["polyatomic"].items():
+        if not comp or not isinstance(charge, int) or not charge:
+            raise ValueError(f"Polyatomic ion '{ion}' needs a composition and a non-zero integer charge")
+        bad = [sym for sym in comp if sym not in ATOMIC_NUMBER]
+        if bad:
+            raise ValueError(f"Polyatomic ion '{ion}' has unknown elements: {', '.join(bad)}")
+    for field in LIST_FIELDS:
+        bad = [sym for sym in data[field] if not isinstance(sym, str) or not sym]
+        if bad:
+            raise ValueError(f"{field} must list element symbols, got {bad!r}")
+    if "H" not in data["activity_series"]:
+        # metals are ranked against hydrogen to decide whether they displace it from acids
+        raise ValueError("activity_series must include 'H'")
+
+
+def activate(rule_set):
+    """
+    Make rule_set the process-wide default (tables.TABLES) and return the RuleTables it replaced.
+    Prefer passing rule_set.compile() as `rules=` where several rule sets serve concurrently.
+    """
+    previous = tables.TABLES
+    tables.TABLES = rule_set.compile()
+    return previous
@@ -0,0 +1,254 @@
+#--- solubility ---
+# Compiles the solubility rules in rules.py (SOLUBLE_SERIES, INSOLUBLE_SERIES and their exception
+# lists) once into a dense cation x anion matrix keyed by canonical ion ids, so "is this salt
+# soluble" / "does this ion pair precipitate" is a formula split plus one index.
+# Precedence: listed exception > soluble cation > soluble anion > insoluble anion > unknown.
+#
+# Exception entries are raw salt strings ('AgCl', 'Pb2SO4', '(NH4)2CO3'); they are split into
+# ions with the same splitter the queries use. Mercury(I) entries (Hg2Cl) land on Hg, the only
+# mercury cation the charge tables know.
+#
+# Ion spellings and charges come from the rule tables, so one SolubilityTable is compiled per
+# rules version (table_for) and the ion-split cache is keyed on (version, formula).
+from backend.core import parser, rules, tables
+from backend.core.cache import LRUCache
+from backend.core.elements import ATOMIC_NUMBER, ELEMENTS
+from backend.core.trie import SymbolAutomaton
+
+INSOLUBLE, SOLUBLE, UNKNOWN = 0, 1, 2
+_VALUES = (False, True, None)
+_IONS = LRUCache(maxsize=4096)   # (rules version, formula) -> (cation, anion)
+_BY_VERSION = {}                 # rules version -> SolubilityTable
+
+
+class SolubilityTable:
+    """Dense solubility matrix: matrix[cation_id * n_anions + anion_id] in {INSOLUBLE, SOLUBLE, UNKNOWN}."""
+    __slots__ = ("rules", "cations", "anions", "cation_id", "anion_id", "matrix", "cation_automaton",
+                 "gases", "liquids")
+
+    def __init__(self, soluble, soluble_exceptions, insoluble, insoluble_exceptions, gases, liquids,
+                 rules=None):
+        t = self.rules = tables.TABLES if rules is None else rules
+        poly_cations = [ion for ion, (_, charge, _) in t.polyatomic.items() if charge > 0]
+        self.cations = tuple(ELEMENTS) + tuple(poly_cations)
+        self.cation_id = {sym: i for i, sym in enumerate(self.cations)}
+        self.cation_automaton = SymbolAutomaton(self.cations)
+
+        soluble_cations = [sym for sym in soluble if self._is_cation(sym)]
+        soluble_anions = [self.canonical_anion(sym) for sym in soluble if not self._is_cation(sym)]
+        insoluble_anions = [self.canonical_anion(sym) for sym in insoluble]
+        anions = list(t.anion_charge)
+        anions += [sym for sym in dict.fromkeys(soluble_anions + insoluble_anions) if sym not in t.anion_charge]
+        self.anions = tuple(anions)
+        self.anion_id = {sym: i for i, sym in enumerate(self.anions)}
+
+        n_c, n_a = len(self.cations), len(self.anions)
+        matrix = bytearray([UNKNOWN]) * (n_c * n_a)
+        # lowest precedence first, so later rules overwrite earlier ones
+        for values, rule in ((insoluble_anions, INSOLUBLE), (soluble_anions, SOLUBLE)):
+            for sym in values:
+                a = self.anion_id[sym]
+                matrix[a::n_a] = bytes([rule]) * n_c
+        for sym in soluble_cations:
+            c = self.cation_id[sym]
+            matrix[c * n_a:(c + 1) * n_a] = bytes([SOLUBLE]) * n_a
+        for entries, value in ((soluble_exceptions, INSOLUBLE), (insoluble_exceptions, SOLUBLE)):
+            for salt in entries:
+                c, a = self.ion_ids(salt)
+                if c is None or a is None:
+                    raise ValueError(f"Cannot split solubility exception '{salt}' into known ions")
+                matrix[c * n_a + a] = value
+        self.matrix = bytes(matrix)
+
+        self.gases = self._phase_index(gases)
+        self.liquids = self._phase_index(liquids)
+
+    def _is_cation(self, sym):
+        """Rule-list entries name either ion; positive polyatomics and non-anion elements are cations."""
+        t = self.rules
+        if sym in t.polyatomic:
+            return t.polyatomic[sym][1] > 0
+        return sym in ATOMIC_NUMBER and sym not in t.anion_charge
+
+    @staticmethod
+    def _phase_index(formulas):
+        """Formulas plus the element symbol of every single-element entry (so Cl matches Cl2)."""
+        index = set(formulas)
+        for f in formulas:
+            counts = parser.parse_composition(f).counts
+            if len(counts) == 1:
+                index.add(next(iter(counts)))
+        return frozenset(index)
+
+    def canonical_anion(self, sym):
+        """Table spelling of an anion: C2H3O2 -> CH3COO (by composition), others unchanged."""
+        if sym in self.rules.anion_charge:
+            return sym
+        return self.rules.ion_by_composition.get(
+            tables.composition_key(parser.parse_composition(sym).counts), sym)
+
+    def ions(self, formula):
+        """
+        (cation, anion) of a salt formula in canonical spelling; anion "" for a bare element.
+        The cation is the longest known cation prefix ('(NH4)2CO3' -> NH4, 'Fe2(SO4)3' -> Fe);
+        the anion is the rest with its count or parentheses removed ('Cl2' -> Cl, '(NO3)2' -> NO3).
+        """
+        key = (self.rules.version, formula)
+        cached = _IONS.get(key)
+        if cached is not None:
+            return cached
+        body = formula
+        if body.startswith("("):
+            close = body.find(")")
+            cation, rest = body[1:close], body[close + 1:]
+        else:
+            found = self.cation_automaton.prefixes(body)
+            if not found:
+                return _IONS.put(key, (None, None))
+            cation = self.cation_automaton.keys[found[-1]]
+            rest = body[len(cation):]
+        rest = rest.lstrip("0123456789")
+        if rest.startswith("(") and ")" in rest:
+            rest = rest[1:rest.rindex(")")]
+        elif rest and self.canonical_anion(rest) not in self.anion_id:
+            rest = rest.rstrip("0123456789")
+        anion = self.canonical_anion(rest) if rest else ""
+        return _IONS.put(key, (cation, anion))
+
+    def ion_ids(self, formula):
+        """(cation id, anion id) for a salt formula; None for an ion the table does not know."""
+        cation, anion = self.ions(formula)
+        return self.cation_id.get(cation), self.anion_id.get(anion)
+
+    def pair(self, cation, anion):
+        """True (soluble), False (insoluble) or None (no rule) for a cation/anion pair."""
+        c, a = self.cation_id.get(cation), self.anion_id.get(self.canonical_anion(anion))
+        if c is None or a is None:
+            return None
+        return _VALUES[self.matrix[c * len(self.anions) + a]]
+
+    def is_soluble(self, formula):
+        """True / False / None (no rule, unknown ion or not a salt) for a salt formula."""
+        c, a = self.ion_ids(formula)
+        if c is None or a is None:
+            return None
+        return _VALUES[self.matrix[c * len(self.anions) + a]]
+
+    def state(self, formula):
+        """Standard state at room temperature: 'g', 'l', 's', 'aq', or None when no rule applies."""
+        if formula in self.gases:
+            return "g"
+        if formula in self.liquids:
+            return "l"
+        counts = parser.parse_composition(formula).counts
+        if len(counts) == 1:
+            sym = next(iter(counts))
+            if sym in self.gases:
+                return "g"
+            if sym in self.liquids:
+                return "l"
+            return "s" if sym in ATOMIC_NUMBER else None
+        cation, _ = self.ions(formula)
+        if cation == "H":
+            return "aq"   # acids are taken as aqueous solutions
+        soluble = self.is_soluble(formula)
+        if soluble is None:
+            return None
+        return "aq" if soluble else "s"
+
+
+def compile_table(rules_tables=None):
+    """Compile the current solubility and phase lists in rules.py against a RuleTables (default: tables.TABLES)."""
+    return SolubilityTable(rules.SOLUBLE_SERIES, rules.SOLUBLE_EXCEPTION_SERIES,
+                           rules.INSOLUBLE_SERIES, rules.INSOLUBLE_EXCEPTION_SERIES,
+                           rules.GAS_SERIES, rules.LIQUID_SERIES, rules_tables)
+
+
+def table_for(rules_tables=None):
+    """The SolubilityTable for a RuleTables (default: tables.TABLES), compiled once per version."""
+    t = tables.TABLES if rules_tables is None else rules_tables
+    table = _BY_VERSION.get(t.version)
+    if table is None:
+        table = _BY_VERSION.setdefault(t.version, compile_table(t))
+    return table
+
+
+def recompile():
+    """Drop every compiled table (after editing rules.py lists at runtime); returns the current one."""
+    _BY_VERSION.clear()
+    _IONS.clear()
+    return table_for()
+
+
+def __getattr__(name):
+    # TABLE follows tables.TABLES: the table of the current rules version, compiled on first access
+    if name == "TABLE":
+        return table_for()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+#--- queries ---
+# Every query takes rules (a tables.RuleTables, default tables.TABLES) and reads that version's
+# table, so results stay consistent with predictions made under the same rules.
+
+def is_soluble(formula, rules=None):
+    """True if the salt is soluble in water, False if not, None if no rule covers it."""
+    return table_for(rules).is_soluble(formula)
+
+
+def soluble_many(formulas, rules=None):
+    """is_soluble for every formula, in input order."""
+    t = table_for(rules)
+    return [t.is_soluble(f) for f in formulas]
+
+
+def precipitates(cation, anion, rules=None):
+    """True if mixing the two ions forms a precipitate, False if not, None if no rule covers it."""
+    soluble = table_for(rules).pair(cation, anion)
+    return None if soluble is None else not soluble
+
+
+def precipitates_many(pairs, rules=None):
+    """precipitates for every (cation, anion) pair, in input order."""
+    t = table_for(rules)
+    out = []
+    for cation, anion in pairs:
+        soluble = t.pair(cation, anion)
+        out.append(None if soluble is None else not soluble)
+    return out
+
+
+def state_of(formula, rules=None):
+    """'g', 'l', 's' or 'aq' for a formula at room temperature; None when no rule applies."""
+    return table_for(rules).state(formula)
+
+
+def with_state(formula, rules=None):
+    """formula with its state suffix, e.g. 'CuSO4(aq)'; unchanged when the state is unknown."""
+    state = table_for(rules).state(formula)
+    return f"{formula}({state})" if state else formula
+
+
+def annotate(result, reactant_raw, compound_raw, rules=None):
+    """
+    Add states to a prediction result dict (in place, returned for chaining):
+        states: {formula: state} for both reactants and every product
+        equation_with_states: balanced_equation with (aq)/(s)/(g)/(l) after each species
+    """
+    if not result.get("possible"):
+        return result
+    t = table_for(rules)
+    species = [reactant_raw, compound_raw] + list(result["products"])
+    result["states"] = {f: t.state(f) for f in species}
+    equation = result.get("balanced_equation")
+    if equation:
+        sides = []
+        for side in equation.split(" -> "):
+            terms = []
+            for term in side.split(" + "):
+                coeff, _, formula = term.rpartition(" ")
+                labelled = with_state(formula, t.rules)
+                terms.append(f"{coeff} {labelled}" if coeff else labelled)
+            sides.append(" + ".join(terms))
+        result["equation_with_states"] = " -> ".join(sides)
+    return result
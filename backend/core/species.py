@@ -0,0 +1,92 @@
+#--- species ---
+# Compact per-species record for large screening sets: the formula string, a composition
+# vector indexed by atomic number (array('H')), and a lazily cached cation/anion split
+# and ion charges (tagged with the rules version they were computed under). The parser,
+# classifier and balancer accept Species wherever they take a formula string.
+from array import array
+from backend.core import charges, parser, tables
+from backend.core.cache import LRUCache
+from backend.core.elements import ATOMIC_NUMBER, ELEMENTS
+
+_EMPTY_VECTOR = array("H", bytes(2 * (len(ELEMENTS) + 1)))
+_NOT_COMPUTED = object()
+
+
+class Species:
+    """
+    One chemical species. `vector[z]` is the count of the element with atomic number z.
+    Use Species.from_formula to share instances for repeated formulas.
+    """
+    __slots__ = ("formula", "vector", "_split", "_charges")
+
+    def __init__(self, formula: str, vector: array):
+        self.formula = formula
+        self.vector = vector
+        self._split = _NOT_COMPUTED     # (rules version, value) once computed
+        self._charges = _NOT_COMPUTED
+
+    @classmethod
+    def from_formula(cls, formula: str):
+        """Parse formula into a (cached, shared) Species. Raises ValueError for unknown elements."""
+        sp = _SPECIES_CACHE.get(formula)
+        if sp is None:
+            vector = array("H", _EMPTY_VECTOR)
+            for sym, cnt in parser.parse_composition(formula).counts.items():
+                z = ATOMIC_NUMBER.get(sym)
+                if z is None:
+                    raise ValueError(f"Unknown element symbol '{sym}' in formula '{formula}'")
+                vector[z] = cnt
+            sp = _SPECIES_CACHE.put(formula, cls(formula, vector))
+        return sp
+
+    def elements(self):
+        """(atomic number, count) pairs for the elements present, in atomic-number order."""
+        return [(z, c) for z, c in enumerate(self.vector) if c]
+
+    @property
+    def counts(self):
+        """Element-count dict, as parse_formula would return."""
+        return {ELEMENTS[z - 1]: c for z, c in enumerate(self.vector) if c}
+
+    @property
+    def is_element(self):
+        return sum(1 for c in self.vector if c) == 1
+
+    def split(self, rules=None):
+        """Cached parser.split_cation_anion(formula), recomputed when the rules version changes."""
+        t = tables.TABLES if rules is None else rules
+        cached = self._split
+        if cached is _NOT_COMPUTED or cached[0] != t.version:
+            cached = self._split = (t.version, parser.split_cation_anion(self.formula, t))
+        return cached[1]
+
+    def charges(self, rules=None):
+        """Cached (cation charge, anion charge); None where it cannot be inferred."""
+        t = tables.TABLES if rules is None else rules
+        cached = self._charges
+        if cached is _NOT_COMPUTED or cached[0] != t.version:
+            cation, anion = self.split(t)
+            c_charge = charges.infer_cation_charge(cation, t)
+            try:
+                a_charge = charges.infer_anion_charge(anion, t) if anion else None
+            except KeyError:
+                a_charge = None
+            cached = self._charges = (t.version, (c_charge, a_charge))
+        return cached[1]
+
+    def __eq__(self, other):
+        if not isinstance(other, Species):
+            return NotImplemented
+        return self.formula == other.formula
+
+    def __hash__(self):
+        return hash(self.formula)
+
+    def __repr__(self):
+        return f"Species({self.formula!r})"
+
+    def __str__(self):
+        return self.formula
+
+
+_SPECIES_CACHE = LRUCache(maxsize=65536)
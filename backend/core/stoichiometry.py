@@ -0,0 +1,104 @@
+#--- stoichiometry ---
+# Molar masses, reaction mass tables and limiting reagents over batches of formulas/equations.
+# Formulas become rows of a composition matrix (Species vectors, indexed by atomic number), so a
+# whole batch of molar masses is one matrix-vector product with WEIGHT_BY_Z; coefficients come
+# from balancer.balance_equations_batch.
+from array import array
+from operator import mul
+from backend.core import balancer
+from backend.core.elements import ATOMIC_WEIGHTS
+from backend.core.species import Species
+
+# WEIGHT_BY_Z[z] = standard atomic weight of element z; index 0 unused, like Species.vector
+WEIGHT_BY_Z = array("d", (0.0,) + ATOMIC_WEIGHTS)
+
+
+def composition_matrix(formulas):
+    """One composition row (element counts by atomic number) per formula string or Species."""
+    return [f.vector if isinstance(f, Species) else Species.from_formula(f).vector for f in formulas]
+
+
+def matvec(matrix, vector=WEIGHT_BY_Z):
+    """matrix @ vector for a list of equal-length rows."""
+    return [sum(map(mul, row, vector)) for row in matrix]
+
+
+def molar_masses(formulas):
+    """Molar mass (g/mol) of every formula, in input order. Raises ValueError for unknown elements."""
+    return matvec(composition_matrix(formulas))
+
+
+def molar_mass(formula):
+    """Molar mass (g/mol) of a single formula string or Species."""
+    return molar_masses([formula])[0]
+
+
+def _masses_by_formula(equations):
+    formulas = list(dict.fromkeys(f for left, right in equations for f in (*left, *right)))
+    return dict(zip(formulas, molar_masses(formulas)))
+
+
+def _balanced(equations, engine):
+    coeffs = balancer.balance_equations_batch(equations, engine=engine)
+    for c in coeffs:
+        if isinstance(c, Exception):
+            raise c
+    return coeffs
+
+
+def mass_tables(equations, engine="bareiss"):
+    """
+    Balance every (left_species, right_species) equation and tabulate its masses per mole of reaction.
+    Returns one dict per equation: {"left": rows, "right": rows}, where each row is
+    (formula, coefficient, molar mass g/mol, coefficient * molar mass g).
+    Molar masses of all distinct formulas in the batch are computed in one product.
+    Raises the balancing error of the first equation that cannot be balanced.
+    """
+    coeffs = _balanced(equations, engine)
+    mm = _masses_by_formula(equations)
+    tables = []
+    for (left, right), (lc, rc) in zip(equations, coeffs):
+        tables.append({
+            "left": [(str(f), c, mm[f], c * mm[f]) for f, c in zip(left, lc)],
+            "right": [(str(f), c, mm[f], c * mm[f]) for f, c in zip(right, rc)],
+        })
+    return tables
+
+
+def limiting_reagents(equations, amounts, engine="bareiss"):
+    """
+    Limiting reagent and yields for every equation given the grams of each reactant.
+    amounts[i] lists one mass per left species of equations[i]; None marks a reactant in excess.
+    Returns one dict per equation:
+        limiting: formula of the limiting reactant
+        extent: moles of reaction that run to completion
+        left: [(formula, grams consumed, grams left over (None if in excess))]
+        right: [(formula, grams formed)]
+    Raises ValueError if the lengths disagree, an equation cannot be balanced or every reactant
+    of an equation is in excess.
+    """
+    if len(amounts) != len(equations):
+        raise ValueError(f"Got {len(amounts)} amount lists for {len(equations)} equations")
+    coeffs = _balanced(equations, engine)
+    mm = _masses_by_formula(equations)
+    results = []
+    for (left, right), (lc, rc), grams in zip(equations, coeffs, amounts):
+        if len(grams) != len(left):
+            raise ValueError(f"Got {len(grams)} amounts for {len(left)} reactants in {left} -> {right}")
+        limiting, extent = None, None
+        for f, c, g in zip(left, lc, grams):
+            if g is None or c <= 0:
+                continue
+            x = g / mm[f] / c
+            if extent is None or x < extent:
+                limiting, extent = f, x
+        if limiting is None:
+            raise ValueError(f"No limiting reagent in {left} -> {right}: every reactant is in excess")
+        results.append({
+            "limiting": str(limiting),
+            "extent": extent,
+            "left": [(str(f), extent * c * mm[f], None if g is None else g - extent * c * mm[f])
+                     for f, c, g in zip(left, lc, grams)],
+            "right": [(str(f), extent * c * mm[f]) for f, c in zip(right, rc)],
+        })
+    return results
@@ -0,0 +1,284 @@
+#--- compiled rule tables ---
+# rules.py and charges.py hold the editable source lists; this module compiles them once
+# into constant-time lookups (rank dicts, frozensets, a dense charge table by atomic number)
+# that the parser, charge inference and reaction checks read on the hot path.
+#
+# TABLES is built lazily on first access. The compiled form is cached as a versioned binary
+# snapshot (marshal of plain containers) next to the bytecode cache, so later processes load
+# it with a single read instead of importing rules/charges and recompiling. The snapshot is
+# keyed on a checksum of the source modules and rebuilt automatically when they change.
+#
+# First access therefore writes a file into the package's __pycache__ (like bytecode does),
+# unless bytecode writing is off (python -B, PYTHONDONTWRITEBYTECODE), in which case every
+# process compiles. Point $CHEMPY_TABLES_SNAPSHOT at a writable path for read-only or shared
+# installs; a write that fails is skipped and leaves no partial file behind.
+#
+# Every RuleTables carries `version`, a hash of the rule data it was compiled from; caches whose
+# entries depend on the rules include it in their keys, so recompiled or swapped tables (see
+# ruleset.RuleSet) never see entries computed under other rules.
+#
+#   python -m backend.core.tables --build [path]    (pre-build, e.g. in a container image)
+from functools import reduce
+from types import MappingProxyType
+from math import gcd
+import marshal
+import os
+import sys
+import zlib
+from backend.core.elements import ATOMIC_NUMBER, ELEMENTS
+from backend.core.trie import SymbolAutomaton
+
+SNAPSHOT_MAGIC = b"CHEMPYRT"
+SNAPSHOT_FORMAT = 3
+SNAPSHOT_SOURCES = ("rules.py", "charges.py", "elements.py", "tables.py", "trie.py")
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class RuleTables:
+    """
+    Immutable snapshot of the rules/charges data compiled into indexed lookup tables.
+    Mappings are read-only views, sets are frozensets and the charge table is bytes, so one
+    instance can be shared by any number of threads; edits to rules/charges need recompile().
+    """
+    __slots__ = (
+        "version", "activity", "activity_rank", "halogens", "halogen_rank", "cold_water",
+        "atomic_number", "cation_charge_by_z", "cation_charge", "anion_charge",
+        "polyatomic", "polyatomic_automaton", "element_automaton",
+        "ion_by_composition", "ion_by_reduced",
+    )
+
+    def __init__(self, activity_series, halogen_order, cold_water_series,
+                 cation_charges, group_cation_charges, anion_charges,
+                 element_anion_charges, polyatomic):
+        self.version = content_version(activity_series, halogen_order, cold_water_series,
+                                       cation_charges, group_cation_charges, anion_charges,
+                                       element_anion_charges, polyatomic)
+        self.activity = frozenset(activity_series)
+        self.activity_rank = {sym: i for i, sym in enumerate(activity_series)}
+        self.halogens = frozenset(halogen_order)
+        self.halogen_rank = {sym: i for i, sym in enumerate(halogen_order)}
+        self.cold_water = frozenset(cold_water_series)
+        self.atomic_number = dict(ATOMIC_NUMBER)
+
+        # cation charges, in precedence order: explicit map > polyatomic > group heuristics
+        cation = dict(group_cation_charges)
+        cation.update({ion: charge for ion, (_, charge, _) in polyatomic.items() if charge > 0})
+        cation.update(cation_charges)
+        by_z = bytearray(len(ELEMENTS) + 1)  # 0 = cannot be inferred
+        for sym, charge in cation.items():
+            z = ATOMIC_NUMBER.get(sym)
+            if z is not None:
+                by_z[z] = charge
+        self.cation_charge_by_z = bytes(by_z)
+        self.cation_charge = {sym: c for sym, c in cation.items() if sym not in ATOMIC_NUMBER}
+
+        # anion charges, in precedence order: explicit map > polyatomic > single-element heuristics
+        anion = {sym: c for sym, c in element_anion_charges.items() if sym in ATOMIC_NUMBER}
+        anion.update({ion: charge for ion, (_, charge, _) in polyatomic.items()})
+        anion.update(anion_charges)
+        self.anion_charge = anion
+
+        # ion / element symbol automata; key ids follow table order
+        self.polyatomic = {ion: (dict(comp), charge, name) for ion, (comp, charge, name) in polyatomic.items()}
+        self.polyatomic_automaton = SymbolAutomaton(polyatomic)
+        self.element_automaton = SymbolAutomaton(ELEMENTS)
+
+        # composition indexes: exact composition -> ion, reduced composition -> ((ion, multiple), ...)
+        by_comp, by_reduced = {}, {}
+        for ion, (comp, _, _) in polyatomic.items():
+            by_comp.setdefault(composition_key(comp), ion)
+            reduced, g = reduced_composition_key(comp)
+            if g:
+                by_reduced[reduced] = by_reduced.get(reduced, ()) + ((ion, g),)
+        self.ion_by_composition = by_comp
+        self.ion_by_reduced = by_reduced
+        self._freeze()
+
+    def _freeze(self):
+        # wrap every mapping in a read-only view; from here on __setattr__ refuses changes
+        for name in ("activity_rank", "halogen_rank", "atomic_number", "cation_charge", "anion_charge",
+                     "ion_by_composition", "ion_by_reduced"):
+            object.__setattr__(self, name, MappingProxyType(getattr(self, name)))
+        object.__setattr__(self, "polyatomic", MappingProxyType(
+            {ion: (MappingProxyType(comp), charge, name) for ion, (comp, charge, name) in self.polyatomic.items()}))
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "polyatomic") and isinstance(self.polyatomic, MappingProxyType):
+            raise AttributeError(f"RuleTables is frozen; cannot set '{name}' (use tables.recompile())")
+        object.__setattr__(self, name, value)
+
+    def to_state(self):
+        """Plain-container state (marshal-friendly) of every table."""
+        state = {name: getattr(self, name) for name in self.__slots__ if name != "atomic_number"}
+        for name, value in state.items():
+            if isinstance(value, MappingProxyType):
+                state[name] = dict(value)
+        state["polyatomic"] = {ion: (dict(comp), charge, name)
+                               for ion, (comp, charge, name) in self.polyatomic.items()}
+        state["polyatomic_automaton"] = self.polyatomic_automaton.to_state()
+        state["element_automaton"] = self.element_automaton.to_state()
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild tables from to_state() output without recompiling them."""
+        self = cls.__new__(cls)
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "atomic_number", dict(ATOMIC_NUMBER))
+        object.__setattr__(self, "polyatomic_automaton", SymbolAutomaton.from_state(state["polyatomic_automaton"]))
+        object.__setattr__(self, "element_automaton", SymbolAutomaton.from_state(state["element_automaton"]))
+        self._freeze()
+        return self
+
+    def __reduce__(self):
+        # read-only views do not pickle; ship the plain state (e.g. to process-pool workers)
+        return RuleTables.from_state, (self.to_state(),)
+
+
+def content_version(activity_series, halogen_order, cold_water_series, cation_charges,
+                    group_cation_charges, anion_charges, element_anion_charges, polyatomic):
+    """
+    Version of a set of rule data: 16 hex digits hashed from its contents. Series order and
+    polyatomic order matter (rank, match precedence) and are hashed as given; charge maps and
+    compositions are hashed sorted, so their key order does not change the version.
+    Same data, same version, in any process.
+    """
+    import hashlib
+    data = (
+        tuple(activity_series), tuple(halogen_order), tuple(cold_water_series),
+        sorted(cation_charges.items()), sorted(group_cation_charges.items()),
+        sorted(anion_charges.items()), sorted(element_anion_charges.items()),
+        [(ion, sorted(comp.items()), charge, name) for ion, (comp, charge, name) in polyatomic.items()],
+    )
+    return hashlib.blake2b(repr(data).encode(), digest_size=8).hexdigest()
+
+
+def composition_key(counts):
+    """Hashable, order-independent key for an element-count mapping."""
+    return tuple(sorted(counts.items()))
+
+
+def reduced_composition_key(counts):
+    """(key of counts divided by their gcd, gcd); e.g. {N:2, O:6} -> ((('N',1),('O',3)), 2)."""
+    g = reduce(gcd, counts.values(), 0)
+    if not g:
+        return (), 0
+    return tuple(sorted((el, c // g) for el, c in counts.items())), g
+
+
+def compile_tables():
+    """Compile the current contents of rules.py / charges.py into a RuleTables snapshot."""
+    from backend.core import charges, rules
+    return RuleTables(
+        rules.ACTIVITY_SERIES, rules.HALOGEN_ORDER, rules.COLD_WATER_SERIES,
+        charges.COMMON_CATION_CHARGES, charges.GROUP_CATION_CHARGES,
+        charges.COMMON_ANION_CHARGES, charges.ELEMENT_ANION_CHARGES, charges.POLYATOMIC,
+    )
+
+
+#--- binary snapshot ---
+
+def source_checksum():
+    """CRC32 over the modules the tables are compiled from (stale-snapshot detection)."""
+    crc = 0
+    for name in SNAPSHOT_SOURCES:
+        with open(os.path.join(_HERE, name), "rb") as f:
+            crc = zlib.crc32(f.read(), crc)
+    return crc
+
+
+def default_snapshot_path():
+    """$CHEMPY_TABLES_SNAPSHOT, else __pycache__/tables.<cache tag>.snapshot next to this module."""
+    return os.environ.get("CHEMPY_TABLES_SNAPSHOT") or os.path.join(
+        _HERE, "__pycache__", f"tables.{sys.implementation.cache_tag}.snapshot")
+
+
+def _header(checksum):
+    return (SNAPSHOT_MAGIC + SNAPSHOT_FORMAT.to_bytes(2, "little")
+            + marshal.version.to_bytes(2, "little") + checksum.to_bytes(4, "little"))
+
+
+def save_snapshot(tables, path=None, checksum=None):
+    """Write tables to a versioned binary snapshot; returns the path written."""
+    path = path or default_snapshot_path()
+    checksum = source_checksum() if checksum is None else checksum
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_header(checksum) + marshal.dumps(tables.to_state()))
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def load_snapshot(path=None, checksum=None):
+    """Load tables from a snapshot with one read; None if missing, foreign or stale."""
+    path = path or default_snapshot_path()
+    checksum = source_checksum() if checksum is None else checksum
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    header = _header(checksum)
+    if not data.startswith(header):
+        return None
+    try:
+        return RuleTables.from_state(marshal.loads(data[len(header):]))
+    except (ValueError, EOFError, TypeError, KeyError):
+        return None
+
+
+def load_tables():
+    """
+    Snapshot if fresh, otherwise compile and best-effort refresh the snapshot (skipped when
+    sys.dont_write_bytecode is set).
+    """
+    try:
+        checksum = source_checksum()
+    except OSError:
+        return compile_tables()
+    tables = load_snapshot(checksum=checksum)
+    if tables is None:
+        tables = compile_tables()
+        if sys.dont_write_bytecode:
+            return tables
+        try:
+            save_snapshot(tables, checksum=checksum)
+        except OSError:
+            pass  # read-only install: keep compiling per process
+    return tables
+
+
+def recompile():
+    """Recompile TABLES from the current (possibly runtime-edited) rules/charges data."""
+    global TABLES
+    TABLES = compile_tables()
+    return TABLES
+
+
+def __getattr__(name):
+    # TABLES is created on first access, then lives as a plain module global
+    if name == "TABLES":
+        global TABLES
+        TABLES = load_tables()
+        return TABLES
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m backend.core.tables", description="Build the rule-table snapshot.")
+    ap.add_argument("--build", nargs="?", const="", metavar="PATH", help="write snapshot (default location if PATH omitted)")
+    args = ap.parse_args()
+    if args.build is not None:
+        print(save_snapshot(compile_tables(), args.build or None))
+    else:
+        ap.print_help()
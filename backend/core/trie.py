@@ -0,0 +1,112 @@
+#--- symbol automaton ---
+# Aho-Corasick automaton (forward trie + failure links) plus a reverse trie over a fixed
+# list of symbols (polyatomic ions, element symbols). Lookups cost O(len(text) + matches)
+# no matter how many symbols are loaded. State is kept in plain lists/dicts/tuples.
+from collections import deque
+
+
+class SymbolAutomaton:
+    """
+    Multi-pattern matcher over `keys`. Match results are key ids, i.e. positions in `keys`,
+    so callers can keep the original table order as a priority.
+    """
+    __slots__ = ("keys", "_goto", "_fail", "_out", "_rgoto", "_rkey")
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        goto, out = [{}], [()]
+        rgoto, rkey = [{}], [-1]
+        for kid, key in enumerate(self.keys):
+            node = 0
+            for ch in key:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = goto[node][ch] = len(goto)
+                    goto.append({})
+                    out.append(())
+                node = nxt
+            out[node] += (kid,)
+            node = 0
+            for ch in reversed(key):
+                nxt = rgoto[node].get(ch)
+                if nxt is None:
+                    nxt = rgoto[node][ch] = len(rgoto)
+                    rgoto.append({})
+                    rkey.append(-1)
+                node = nxt
+            if rkey[node] == -1:
+                rkey[node] = kid
+        # failure links, breadth first; outputs inherit those of their failure state
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+        self._goto, self._fail, self._out = goto, fail, out
+        self._rgoto, self._rkey = rgoto, rkey
+
+    def to_state(self):
+        """Plain-container state (lists, dicts, tuples) suitable for marshal."""
+        return (self.keys, self._goto, self._fail, self._out, self._rgoto, self._rkey)
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an automaton from to_state() output without recompiling it."""
+        self = cls.__new__(cls)
+        self.keys, self._goto, self._fail, self._out, self._rgoto, self._rkey = state
+        return self
+
+    def matches(self, text):
+        """Yield (start, key_id) for every occurrence of every key in text, in one pass."""
+        goto, fail, out, keys = self._goto, self._fail, self._out, self.keys
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for kid in out[node]:
+                yield i - len(keys[kid]) + 1, kid
+
+    def prefixes(self, text):
+        """Key ids of keys that text starts with, shortest first."""
+        goto, out, keys = self._goto, self._out, self.keys
+        found = []
+        node = 0
+        for depth, ch in enumerate(text, start=1):
+            node = goto[node].get(ch)
+            if node is None:
+                break
+            found.extend(kid for kid in out[node] if len(keys[kid]) == depth)
+        return found
+
+    def suffixes(self, text):
+        """Key ids of keys that text ends with, shortest first."""
+        rgoto, rkey = self._rgoto, self._rkey
+        found = []
+        node = 0
+        for ch in reversed(text):
+            node = rgoto[node].get(ch)
+            if node is None:
+                break
+            if rkey[node] != -1:
+                found.append(rkey[node])
+        return found
+
+    def longest_suffix(self, text):
+        """The longest key that text ends with, or None."""
+        rgoto, rkey = self._rgoto, self._rkey
+        best = -1
+        node = 0
+        for ch in reversed(text):
+            node = rgoto[node].get(ch)
+            if node is None:
+                break
+            if rkey[node] != -1:
+                best = rkey[node]
+        return self.keys[best] if best != -1 else None
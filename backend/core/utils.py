@@ -1,12 +1,12 @@
 #--- helper ---
-from backend.core import charges
+from backend.core import tables
 from math import gcd
 
 def gcd_list(nums):
     return reduce(gcd, [abs(int(n)) for n in nums if n != 0], 0) or 1
 
 #composition
-def formula_from_ions(cation: str, c_charge: int, anion: str, a_charge: int):
+def formula_from_ions(cation: str, c_charge: int, anion: str, a_charge: int, rules=None):
     """
     Build neutral formula string for cation+anion using cross-over method.
     Handles polyatomic anions (wraps in parentheses when count>1).
@@ -25,8 +25,9 @@ def formula_from_ions(cation: str, c_charge: int, anion: str, a_charge: int):
         return f"({sym}){count}" if is_poly else f"{sym}{count}"
         
     # decide whether anion symbol corresponds to a polyatomic (presence in POLYATOMIC keys)
-    is_cation_poly = cation in charges.POLYATOMIC
-    is_anion_poly = anion in charges.POLYATOMIC
+    polyatomic = (tables.TABLES if rules is None else rules).polyatomic
+    is_cation_poly = cation in polyatomic
+    is_anion_poly = anion in polyatomic
 
     c_part = fmt_part(cation, sub_c, is_cation_poly)
     a_part = fmt_part(anion, sub_a, is_anion_poly)
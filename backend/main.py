@@ -1,6 +1,5 @@
+from backend.core import parser
 from backend.reactions import single_replacement as SR
-from backend.core import parser, charges, utils
-import re
 
 tests = [
     # --- Metal displaces metal ---
@@ -40,24 +39,24 @@ tests = [
 
 
 def normalize_compound_input(raw: str):
-    """Strip spaces and numeric coefficients in front of formulas for this predictor (we handle 1 stoichiometric unit)."""
-    r = raw.replace(" ", "")
-    # remove leading coefficient if like '2NaBr' -> 'NaBr' (we predict per formula unit now)
-    m = re.match(r'^(\d+)([A-Za-z\(\)0-9]+)$', r)
-    if m:
-        return m.group(2)
-    return r
-
-for a, b in tests:
-    #b_norm = normalize_compound_input(b)
-    out = SR.predict_single_replacement(a, b) #b_norm
-    print("====")
-    print(f"Reactants: {a} + {b}")
-    if not out["possible"]:
-        print("No reaction:", out.get("reason"))
-    else:
-        print("Predicted products:", out["products"])
-        print("Subtype:", out.get("subtype"))
-        print("Balanced:", out.get("balanced_equation"))
-        if "warning" in out:
-            print("Warning:", out["warning"])
+    """Canonical formula for this predictor (we handle 1 stoichiometric unit); see parser.canonicalize."""
+    return parser.canonicalize(raw)
+
+def main():
+    for a, b in tests:
+        #b_norm = normalize_compound_input(b)
+        out = SR.predict_single_replacement(a, b) #b_norm
+        print("====")
+        print(f"Reactants: {a} + {b}")
+        if not out["possible"]:
+            print("No reaction:", out.get("reason"))
+        else:
+            print("Predicted products:", out["products"])
+            print("Subtype:", out.get("subtype"))
+            print("Balanced:", out.get("balanced_equation"))
+            if "warning" in out:
+                print("Warning:", out["warning"])
+
+
+if __name__ == "__main__":
+    main()
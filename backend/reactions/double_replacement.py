@@ -0,0 +1,152 @@
+# --- Double Replacement Logic ---
+# Predicts products for double-replacement (metathesis) reactions AB + CD -> AD + CB:
+#   - precipitation: at least one product is insoluble
+#   - neutralization: an acid and a hydroxide form water
+#
+# Flow:
+#   1. Split both salts into canonical ions (solubility table splitter).
+#   2. Build the exchanged products (charge inference + formula builder).
+#   3. Decide with the solubility matrix whether anything leaves solution.
+#   4. Balance equation with the shared balancer.
+#
+# All-pairs screening (precipitating_pairs) splits each salt once and walks the cation x anion
+# solubility matrix of the ions actually present, so the work grows with the number of distinct
+# ions and precipitating hits, not with N^2 full predictions.
+#
+# Notes:
+#   - Gas-forming exchanges (carbonate/sulfide + acid) are not modelled separately.
+
+from backend.core import balancer, charges, solubility, utils
+from backend.reactions.result import PredictionResult
+
+
+def _ions(compound, rules=None):
+    cation, anion = solubility.table_for(rules).ions(compound)
+    if not cation or not anion:
+        raise ValueError(f"'{compound}' is not a salt, acid or base")
+    return cation, anion
+
+
+def _salt(cation, anion, rules=None):
+    """Neutral formula for an ion pair; water for H + OH. Raises KeyError for an unknown charge."""
+    if cation == "H" and anion == "OH":
+        return "H2O"
+    c_charge = charges.infer_cation_charge(cation, rules)
+    if c_charge is None:
+        raise KeyError(f"Unknown cation charge for '{cation}' — expand COMMON_CATION_CHARGES or POLYATOMIC")
+    return utils.formula_from_ions(cation, c_charge, anion, charges.infer_anion_charge(anion, rules), rules)
+
+
+def can_perform_double_replacement(compound_a: str, compound_b: str, rules=None):
+    """
+    Decide if a double-replacement reaction is possible.
+    Returns (possible: bool, subtype: str, details/reason).
+    Subtypes: neutralization | precipitation
+    rules: tables.RuleTables snapshot to decide with (default: tables.TABLES).
+    """
+    a_raw = compound_a.replace(" ", "")
+    b_raw = compound_b.replace(" ", "")
+    try:
+        cation_a, anion_a = _ions(a_raw, rules)
+        cation_b, anion_b = _ions(b_raw, rules)
+    except ValueError as e:
+        return False, None, str(e)
+    if cation_a == cation_b or anion_a == anion_b:
+        return False, None, f"{a_raw} and {b_raw} share an ion; nothing is exchanged."
+
+    try:
+        products = [_salt(cation_a, anion_b, rules), _salt(cation_b, anion_a, rules)]
+    except KeyError as e:
+        return False, None, str(e)
+    details = {"exchanged": [[cation_a, anion_b], [cation_b, anion_a]], "products": products}
+
+    precipitates = [p for p in products if solubility.is_soluble(p, rules) is False]
+    if precipitates:
+        details["precipitates"] = precipitates
+    if "H2O" in products:
+        return True, "neutralization", details
+    if precipitates:
+        return True, "precipitation", details
+    if any(solubility.is_soluble(p, rules) is None for p in products):
+        return False, "precipitation", f"No solubility rule covers {' or '.join(products)}."
+    return False, "precipitation", "All products are soluble; the ions stay in solution."
+
+
+def predict_double_replacement(compound_a: str, compound_b: str, states=False, rules=None):
+    """
+    Predict products for a double-replacement reaction (if possible).
+    Returns a PredictionResult (like predict_single_replacement), a dict with keys:
+        possible: bool
+        reason: str (if not possible)
+        products: [list of str]
+        balanced_equation: str
+        subtype: str
+        details: {"exchanged": [[cation, anion], [cation, anion]], "products",
+                  "precipitates" (when any product is insoluble)}
+    states=True returns a plain dict that also has `states` and `equation_with_states`
+    (see solubility.annotate).
+    rules pins every lookup to one tables.RuleTables snapshot (default: tables.TABLES).
+    """
+    if states:
+        return solubility.annotate(dict(predict_double_replacement(compound_a, compound_b, rules=rules)),
+                                   compound_a, compound_b, rules)
+    possible, subtype, details = can_perform_double_replacement(compound_a, compound_b, rules)
+    if not possible:
+        return PredictionResult.impossible(compound_a, compound_b, details, subtype)
+
+    products = details["products"]
+    try:
+        left_coeffs, right_coeffs = balancer.balance_equation([compound_a, compound_b], list(products))
+    except Exception as e:
+        return PredictionResult(compound_a, compound_b, True, subtype, products,
+                                warning=("Balancing failed: {}", e))
+    return PredictionResult(compound_a, compound_b, True, subtype, products,
+                            (*left_coeffs, *right_coeffs), details)
+
+
+def precipitating_pairs(salts, rules=None):
+    """
+    Every pair of salts that forms a precipitate when mixed.
+    Returns [(i, j, [precipitate formulas])] with i < j indexing `salts`, sorted by (i, j).
+    Each salt is split into ions once; the solubility matrix is then scanned only for
+    cation/anion combinations that occur, and salts are paired through per-ion indexes.
+    Salts the table cannot split, and precipitates whose formula cannot be built, are skipped.
+    """
+    t = solubility.table_for(rules)
+    ids = [t.ion_ids(s.replace(" ", "")) for s in salts]
+    by_cation, by_anion = {}, {}
+    for i, (c, a) in enumerate(ids):
+        if c is not None and a is not None:
+            by_cation.setdefault(c, []).append(i)
+            by_anion.setdefault(a, []).append(i)
+
+    n_a, matrix = len(t.anions), t.matrix
+    hits = {}
+    for c, with_cation in by_cation.items():
+        row = c * n_a
+        for a, with_anion in by_anion.items():
+            if matrix[row + a] != solubility.INSOLUBLE:
+                continue
+            try:
+                formula = _salt(t.cations[c], t.anions[a], rules)
+            except KeyError:
+                continue
+            for i in with_cation:
+                if ids[i][1] == a:
+                    continue   # salt i already is this precipitate
+                for j in with_anion:
+                    if ids[j][0] == c:
+                        continue
+                    key = (i, j) if i < j else (j, i)
+                    found = hits.get(key)
+                    if found is None:
+                        hits[key] = [formula]
+                    elif formula not in found:
+                        found.append(formula)
+    return [(i, j, hits[i, j]) for i, j in sorted(hits)]
+
+
+def screen(salts, states=False, rules=None):
+    """Full predictions, keyed by (i, j), for just the precipitating pairs of `salts`."""
+    return {(i, j): predict_double_replacement(salts[i], salts[j], states=states, rules=rules)
+            for i, j, _ in precipitating_pairs(salts, rules)}
@@ -0,0 +1,298 @@
+#--- precomputed single-replacement outcome table ---
+# The served reaction space is finite: every activity-series metal and halogen crossed with every
+# salt/acid buildable from the charge tables. `--build` runs each pair through
+# predict_single_replacement once and writes the results to a compact binary file that readers
+# open with mmap: lookups unpack records straight out of the mapping, and every worker process
+# shares the same page-cache pages. Anything not in the table (or a stale table) is predicted live,
+# and so is every query under rules whose version differs from the one the table was built with.
+#
+#   python -m backend.reactions.outcomes --build [PATH]
+#
+# File layout (little endian):
+#   header   MAGIC, format u16, source checksum u32, rules version 8 bytes, n_strings u32,
+#            n_records u32, n_slots u32
+#   strings  n_strings+1 u32 offsets into the UTF-8 blob that follows them (interned pool)
+#   records  n_records fixed-size RECORD structs, all string fields as pool ids (NONE = absent)
+#   index    n_slots u32 record numbers, open addressing on crc32("reactant\0compound")
+
+from backend.core import charges, rules, tables, utils
+from backend.reactions import single_replacement as SR
+from backend.reactions.result import PredictionResult
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b"CHEMPYSR"
+FORMAT = 2
+NONE = 0xFFFFFFFF
+SOURCES = ("single_replacement.py", "result.py", "outcomes.py", "../core/parser.py", "../core/balancer.py",
+           "../core/utils.py", "../core/species.py")
+
+HEADER = struct.Struct("<8sH2xI8sIII")
+# reactant, compound, flags, subtype, reason, product x2, detail keys, detail values x3, coefficients x4
+RECORD = struct.Struct("<IIB3xIIIIIIII4B")
+POSSIBLE, WARNING = 1, 2
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+#--- key space ---
+# The pairs the table covers; benchmarks/corpus.py builds its corpus from the same functions.
+
+def cations():
+    """(symbol, charge) for every cation with a known charge, in table order."""
+    out = list(charges.COMMON_CATION_CHARGES.items())
+    out += [(ion, c) for ion, (_, c, _) in charges.POLYATOMIC.items()
+            if c > 0 and ion not in charges.COMMON_CATION_CHARGES]
+    return out
+
+
+def anions():
+    """(symbol, charge) for every anion with a known charge, in table order."""
+    out = list(charges.COMMON_ANION_CHARGES.items())
+    out += [(ion, c) for ion, (_, c, _) in charges.POLYATOMIC.items()
+            if c < 0 and ion not in charges.COMMON_ANION_CHARGES]
+    return out
+
+
+def displacers():
+    """Activity-series metals (hydrogen as H2) and diatomic halogens."""
+    metals = ["H2" if sym == "H" else sym for sym in rules.ACTIVITY_SERIES]
+    return metals + [sym + "2" for sym in rules.HALOGEN_ORDER]
+
+
+def reactants():
+    """displacers() plus the halogens as atoms."""
+    return displacers() + list(rules.HALOGEN_ORDER)
+
+
+def compounds():
+    """Every distinct neutral cation x anion formula (acids via the H cation), plus water."""
+    out = [utils.formula_from_ions(c, cc, a, ac) for c, cc in cations() for a, ac in anions()]
+    out.append("H2O")
+    return list(dict.fromkeys(out))
+
+
+def source_checksum():
+    """CRC32 of the rule tables' sources plus every module that shapes a prediction."""
+    crc = tables.source_checksum()
+    for name in SOURCES:
+        with open(os.path.join(_HERE, name), "rb") as f:
+            crc = zlib.crc32(f.read(), crc)
+    return crc
+
+
+def default_path():
+    """$CHEMPY_OUTCOMES, else __pycache__/outcomes.<cache tag>.bin next to this module."""
+    return os.environ.get("CHEMPY_OUTCOMES") or os.path.join(
+        _HERE, "__pycache__", f"outcomes.{sys.implementation.cache_tag}.bin")
+
+
+def _key_hash(reactant, compound):
+    return zlib.crc32(f"{reactant}\0{compound}".encode())
+
+
+#--- build ---
+
+def build(path=None, pairs=None, rules=None):
+    """
+    Predict every pair (default: reactants() x compounds()) under rules (a RuleTables, default
+    tables.TABLES) and write the outcome table.
+    Results that do not fit a record (coefficients > 255, more than two products or three
+    details) are left out and stay on the live path. Returns (path, records written).
+    """
+    path = path or default_path()
+    rules = tables.TABLES if rules is None else rules
+    if pairs is None:
+        pairs = [(r, c) for r in reactants() for c in compounds()]
+    pool, strings = {}, []
+
+    def sid(s):
+        if s is None:
+            return NONE
+        i = pool.get(s)
+        if i is None:
+            i = pool[s] = len(strings)
+            strings.append(s)
+        return i
+
+    records, hashes = [], []
+    for reactant, compound in dict.fromkeys(pairs):
+        rec = _encode(reactant, compound, SR.predict_single_replacement(reactant, compound, rules=rules), sid)
+        if rec is not None:
+            records.append(rec)
+            hashes.append(_key_hash(reactant, compound))
+
+    n_slots = 1
+    while n_slots < 2 * len(records):
+        n_slots *= 2
+    index = [NONE] * n_slots
+    for i, h in enumerate(hashes):
+        slot = h & (n_slots - 1)
+        while index[slot] != NONE:
+            slot = (slot + 1) & (n_slots - 1)
+        index[slot] = i
+
+    blobs = [s.encode() for s in strings]
+    offsets, pos = [], 0
+    for b in blobs:
+        offsets.append(pos)
+        pos += len(b)
+    offsets.append(pos)
+    body = b"".join(blobs)
+    body += b"\0" * (-len(body) % 4)   # keep records and index 4-byte aligned
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT, source_checksum(), bytes.fromhex(rules.version),
+                            len(strings), len(records), n_slots))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(body)
+        for rec in records:
+            f.write(RECORD.pack(*rec))
+        f.write(struct.pack(f"<{n_slots}I", *index))
+    os.replace(tmp, path)
+    return path, len(records)
+
+
+def _encode(reactant, compound, result, sid):
+    """RECORD field tuple for a PredictionResult, or None if it does not fit the layout."""
+    products = result.products
+    details = result.details or {}
+    if len(products) > 2 or len(details) > 3:
+        return None
+    coeffs = result.coefficients or (0, 0, 0, 0)
+    if len(coeffs) != 4 or not all(0 <= c < 256 for c in coeffs):
+        return None
+    flags = 0
+    reason = result.reason
+    if result.possible:
+        flags |= POSSIBLE
+        if result.warning is not None:
+            flags |= WARNING
+            reason = result.warning
+    products = list(products) + [None] * (2 - len(products))
+    values = list(details.values()) + [None] * (3 - len(details))
+    keys = ",".join(details) if details else None
+    if any(v is not None and not isinstance(v, str) for v in values):
+        return None
+    subtype = result.subtype.value if result.subtype is not None else None
+    return (sid(reactant), sid(compound), flags, sid(subtype), sid(reason),
+            sid(products[0]), sid(products[1]), sid(keys), sid(values[0]), sid(values[1]), sid(values[2]),
+            *coeffs)
+
+
+#--- lookup ---
+
+class OutcomeTable:
+    """Read-only, memory-mapped view of a built outcome table."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        magic, fmt, self.checksum, version, n_strings, n_records, n_slots = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            self.close()
+            raise ValueError(f"{path} is not an outcome table (format {FORMAT})")
+        self._offsets = HEADER.size
+        self._blob = self._offsets + 4 * (n_strings + 1)
+        blob_len = struct.unpack_from("<I", self._buf, self._offsets + 4 * n_strings)[0]
+        self._records = self._blob + blob_len + (-blob_len % 4)
+        self._index = self._records + RECORD.size * n_records
+        self._mask = n_slots - 1
+        self._strings = [None] * n_strings   # decoded lazily, per process
+        self.n_records = n_records
+        self.version = version.hex()         # rules version the outcomes were predicted under
+
+    def __len__(self):
+        return self.n_records
+
+    def close(self):
+        self._buf.release()
+        self._mm.close()
+
+    def string(self, i):
+        """Pool string by id (None for NONE)."""
+        if i == NONE:
+            return None
+        s = self._strings[i]
+        if s is None:
+            start, end = struct.unpack_from("<II", self._buf, self._offsets + 4 * i)
+            s = self._strings[i] = str(self._buf[self._blob + start:self._blob + end], "utf-8")
+        return s
+
+    def get(self, reactant, compound):
+        """The PredictionResult for a pair, or None if the table does not cover it."""
+        buf, index, mask = self._buf, self._index, self._mask
+        slot = _key_hash(reactant, compound) & mask
+        while True:
+            i = struct.unpack_from("<I", buf, index + 4 * slot)[0]
+            if i == NONE:
+                return None
+            rec = RECORD.unpack_from(buf, self._records + RECORD.size * i)
+            if self.string(rec[0]) == reactant and self.string(rec[1]) == compound:
+                return self._decode(reactant, compound, rec)
+            slot = (slot + 1) & mask
+
+    def _decode(self, reactant, compound, rec):
+        s = self.string
+        _, _, flags, subtype, reason, p0, p1, keys, d0, d1, d2, c0, c1, c2, c3 = rec
+        if not flags & POSSIBLE:
+            return PredictionResult.impossible(reactant, compound, s(reason), s(subtype))
+        products = [s(p) for p in (p0, p1) if p != NONE]
+        if flags & WARNING:
+            return PredictionResult(reactant, compound, True, s(subtype), products, warning=s(reason))
+        details = dict(zip(s(keys).split(","), (s(d0), s(d1), s(d2)))) if keys != NONE else None
+        return PredictionResult(reactant, compound, True, s(subtype), products, (c0, c1, c2, c3), details)
+
+
+_TABLE = None
+_TABLE_LOADED = False
+
+
+def load(path=None):
+    """Open the outcome table at path (default_path()); None if missing, foreign or stale."""
+    try:
+        table = OutcomeTable(path or default_path())
+    except (OSError, ValueError, struct.error):
+        return None
+    try:
+        fresh = table.checksum == source_checksum()
+    except OSError:
+        fresh = False
+    if not fresh:
+        table.close()
+        return None
+    return table
+
+
+def predict(reactant_raw: str, compound_raw: str, rules=None):
+    """
+    predict_single_replacement, answered from the outcome table when it covers the pair and was
+    built under the same rules version as `rules` (default: tables.TABLES).
+    """
+    global _TABLE, _TABLE_LOADED
+    if not _TABLE_LOADED:
+        _TABLE, _TABLE_LOADED = load(), True
+    t = tables.TABLES if rules is None else rules
+    if _TABLE is not None and _TABLE.version == t.version:
+        result = _TABLE.get(reactant_raw, compound_raw)
+        if result is not None:
+            return result
+    return SR.predict_single_replacement(reactant_raw, compound_raw, rules=rules)
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m backend.reactions.outcomes",
+                                 description="Build the precomputed single-replacement outcome table.")
+    ap.add_argument("--build", nargs="?", const="", metavar="PATH", help="write table (default location if PATH omitted)")
+    args = ap.parse_args()
+    if args.build is not None:
+        written, count = build(args.build or None)
+        print(f"{written}: {count} outcomes")
+    else:
+        ap.print_help()
@@ -0,0 +1,300 @@
+#--- prediction results ---
+# PredictionResult is the compact form of a prediction: the subtype as an enum, product formulas
+# and the integer coefficient vector, with the balanced equation and reason text only formatted
+# when someone reads them. Both engines (single and double replacement) return it. It is a dict
+# with exactly the keys the old result dicts had: key reads (result["possible"], .get, dict(result))
+# are answered from the attributes without building anything, and the first whole-dict operation
+# (items(), ==, json.dumps, result[k] = v, ...) fills the dict once, after which it behaves as the
+# plain dict it is. The attributes themselves are read-only. pack() gives a compact binary record.
+#
+# The dict always holds at least "possible": json's C encoder writes an empty dict as {} without
+# asking for its items.
+#
+# Reasons are stored as a plain string or as a (template, *args) tuple rendered on access; details
+# as a dict or as a tuple of values whose keys follow from the subtype (DETAIL_KEYS).
+#
+# Packed record (little endian): flags u8, subtype code u8, then product, coefficient and detail
+# counts u8, coefficients u16 each, then u16-length-prefixed UTF-8 strings: reactant, compound,
+# products, reason / warning (if any), then detail keys and values in pairs. Coefficients outside
+# 0..65535 set WIDE and are stored as decimal strings after the details instead; non-string
+# detail values (double replacement's ion lists) set JSON_DETAILS and are stored as JSON, so
+# they must be JSON data (lists, not tuples) to come back unchanged.
+
+from enum import Enum
+
+
+class Subtype(str, Enum):
+    """Reaction subtypes; members compare equal to their string value."""
+    HALOGEN = "halogen"
+    METAL = "metal"
+    METAL_DISPLACES_METAL = "metal_displaces_metal"
+    METAL_DISPLACES_HYDROGEN = "metal_displaces_hydrogen"
+    METAL_DISPLACES_WATER = "metal_displaces_water"
+    NEUTRALIZATION = "neutralization"
+    PRECIPITATION = "precipitation"
+
+
+_CODE = {s: i for i, s in enumerate(Subtype, start=1)}   # 0 = no subtype
+
+# detail keys of a possible reaction, by subtype
+DETAIL_KEYS = {
+    Subtype.HALOGEN: ("incoming", "replaced_anion"),
+    Subtype.METAL_DISPLACES_HYDROGEN: ("incoming", "acid"),
+    Subtype.METAL_DISPLACES_WATER: ("incoming", "target"),
+    Subtype.METAL_DISPLACES_METAL: ("incoming", "replaced_cation", "anion"),
+}
+_BY_CODE = (None,) + tuple(Subtype)
+
+POSSIBLE, WARNING, BALANCED, WIDE, JSON_DETAILS = 1, 2, 4, 8, 16
+_HEAD = "<BBBBB"   # struct formats; struct and json are imported on first pack/unpack/to_json
+_HEAD_SIZE = 5
+_LEN = "<H"
+
+# mapping keys per result shape, in the order the result dicts always had them
+_KEYS_IMPOSSIBLE = ("possible", "reason")
+_KEYS_WARNING = ("possible", "products", "balanced_equation", "warning")
+_KEYS_BALANCED = ("possible", "products", "balanced_equation", "subtype", "details")
+
+
+def render(reason):
+    """Text of a reason given as a string or a (template, *args) tuple."""
+    if reason is None or isinstance(reason, str):
+        return reason
+    return reason[0].format(*reason[1:])
+
+
+def _fmt_side(species, coeffs):
+    return " + ".join(f"{c} {sp}" if c != 1 else sp for c, sp in zip(coeffs, species))
+
+
+def _filling(method):
+    # dict method that needs the full contents: fill the dict first, then defer to dict
+    def wrapper(self, *args, **kwargs):
+        if not self._full:
+            self._fill()
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class PredictionResult(dict):
+    """
+    One prediction. Attributes: reactant, compound, possible, subtype (Subtype or None),
+    products (tuple), coefficients (left + right, tuple of int or None); details, reason,
+    warning and balanced_equation are built on access. Attributes are read-only; the dict
+    view can be edited like any result dict (edits do not change the attributes or pack()).
+    """
+    __slots__ = ("reactant", "compound", "possible", "subtype", "products", "coefficients",
+                 "_details", "_reason", "_warning", "_full")
+
+    def __init__(self, reactant, compound, possible, subtype=None, products=None,
+                 coefficients=None, details=None, reason=None, warning=None):
+        init = object.__setattr__
+        init(self, "reactant", reactant)
+        init(self, "compound", compound)
+        init(self, "possible", possible)
+        init(self, "subtype", subtype if subtype is None or subtype.__class__ is Subtype else Subtype(subtype))
+        init(self, "products", tuple(products) if products is not None else ())
+        init(self, "coefficients", coefficients)
+        init(self, "_details", details)
+        init(self, "_reason", reason)
+        init(self, "_warning", warning)
+        init(self, "_full", False)
+        dict.__setitem__(self, "possible", possible)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"PredictionResult is immutable; cannot set '{name}' (set items instead)")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"PredictionResult is immutable; cannot delete '{name}'")
+
+    @classmethod
+    def impossible(cls, reactant, compound, reason, subtype=None):
+        """A 'no reaction' result; reason is a string or a (template, *args) tuple."""
+        return cls(reactant, compound, False, subtype, reason=reason)
+
+    @property
+    def details(self):
+        details = self._details
+        if details is None or details.__class__ is dict:
+            return details
+        return dict(zip(DETAIL_KEYS[self.subtype], details))
+
+    @property
+    def reason(self):
+        return render(self._reason)
+
+    @property
+    def warning(self):
+        return render(self._warning)
+
+    @property
+    def balanced_equation(self):
+        coeffs = self.coefficients
+        if coeffs is None:
+            return None
+        left = (self.reactant, self.compound)
+        return _fmt_side(left, coeffs[:2]) + " -> " + _fmt_side(self.products, coeffs[2:])
+
+    #--- dict view ---
+
+    def _shape(self):
+        if not self.possible:
+            return _KEYS_IMPOSSIBLE
+        return _KEYS_WARNING if self._warning is not None else _KEYS_BALANCED
+
+    def _value(self, key):
+        if key == "subtype":
+            return None if self.subtype is None else self.subtype.value
+        if key == "products":
+            return list(self.products)
+        return getattr(self, key)
+
+    def _fill(self):
+        for key in self._shape():
+            dict.__setitem__(self, key, self._value(key))
+        object.__setattr__(self, "_full", True)
+
+    def keys(self):
+        return dict.keys(self) if self._full else self._shape()
+
+    def __getitem__(self, key):
+        if self._full:
+            return dict.__getitem__(self, key)
+        if key in self._shape():
+            return self._value(key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if self._full:
+            return dict.get(self, key, default)
+        return self._value(key) if key in self._shape() else default
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) if self._full else key in self._shape()
+
+    def __iter__(self):
+        return dict.__iter__(self) if self._full else iter(self._shape())
+
+    def __len__(self):
+        return dict.__len__(self) if self._full else len(self._shape())
+
+    items = _filling(dict.items)
+    values = _filling(dict.values)
+    __eq__ = _filling(dict.__eq__)
+    __ne__ = _filling(dict.__ne__)
+    __or__ = _filling(dict.__or__)
+    __ror__ = _filling(dict.__ror__)
+    __ior__ = _filling(dict.__ior__)
+    __reversed__ = _filling(dict.__reversed__)
+    __setitem__ = _filling(dict.__setitem__)
+    __delitem__ = _filling(dict.__delitem__)
+    setdefault = _filling(dict.setdefault)
+    update = _filling(dict.update)
+    pop = _filling(dict.pop)
+    popitem = _filling(dict.popitem)
+    clear = _filling(dict.clear)
+    __hash__ = None
+
+    def copy(self):
+        return self.to_dict()
+
+    def __repr__(self):
+        return f"PredictionResult({self.to_dict()!r})"
+
+    def _args(self):
+        return (self.reactant, self.compound, self.possible, self.subtype, self.products,
+                self.coefficients, self._details, self._reason, self._warning)
+
+    def fresh(self):
+        """A new result for the same prediction, without any item edits made to this one."""
+        return PredictionResult(*self._args())
+
+    def __reduce__(self):
+        return PredictionResult, self._args(), dict(dict.items(self)) if self._full else None
+
+    def __setstate__(self, items):
+        # the edited items of a filled result (see __reduce__)
+        dict.clear(self)
+        dict.update(self, items)
+        object.__setattr__(self, "_full", True)
+
+    #--- serialization ---
+
+    def to_dict(self):
+        """A fresh plain dict with the same items."""
+        return {key: self[key] for key in self.keys()}
+
+    def to_json(self):
+        import json
+        return json.dumps(self)
+
+    def pack(self):
+        """Packed binary record (see the module header); inverse of unpack()."""
+        import struct
+        flags = POSSIBLE if self.possible else 0
+        coeffs = self.coefficients or ()
+        text = self.reason if not self.possible else self.warning
+        if text is not None:
+            flags |= WARNING if self.possible else 0
+        if coeffs:
+            flags |= BALANCED
+        wide = any(not 0 <= c <= 0xFFFF for c in coeffs)
+        details = self.details or {}
+        encode = str
+        if any(not isinstance(v, str) for v in details.values()):
+            import json
+            flags |= JSON_DETAILS
+            encode = json.dumps
+        strings = [self.reactant, self.compound, *self.products]
+        if text is not None:
+            strings.append(text)
+        for k, v in details.items():
+            strings += (k, encode(v))
+        if wide:
+            flags |= WIDE
+            strings += map(str, coeffs)
+        parts = [struct.pack(_HEAD, flags, _CODE.get(self.subtype, 0), len(self.products), len(coeffs), len(details)),
+                 b"" if wide else struct.pack(f"<{len(coeffs)}H", *coeffs)]
+        for s in strings:
+            b = s.encode()
+            parts += (struct.pack(_LEN, len(b)), b)
+        return b"".join(parts)
+
+    @classmethod
+    def unpack(cls, buf, offset=0):
+        """(PredictionResult, offset just past the record) from a pack() record in buf."""
+        import struct
+        flags, code, n_products, n_coeffs, n_details = struct.unpack_from(_HEAD, buf, offset)
+        offset += _HEAD_SIZE
+        wide = flags & WIDE
+        coeffs = struct.unpack_from(f"<{n_coeffs}H", buf, offset) if flags & BALANCED and not wide else None
+        if not wide:
+            offset += 2 * n_coeffs
+
+        def take():
+            nonlocal offset
+            (n,) = struct.unpack_from(_LEN, buf, offset)
+            offset += 2
+            s = str(buf[offset:offset + n], "utf-8")
+            offset += n
+            return s
+
+        reactant, compound = take(), take()
+        products = [take() for _ in range(n_products)]
+        possible = bool(flags & POSSIBLE)
+        text = take() if not possible or flags & WARNING else None
+        details = None
+        if n_details:
+            details = {}
+            for _ in range(n_details):
+                k = take()
+                details[k] = take()
+            if flags & JSON_DETAILS:
+                import json
+                details = {k: json.loads(v) for k, v in details.items()}
+        if wide:
+            coeffs = tuple(int(take()) for _ in range(n_coeffs))
+        result = cls(reactant, compound, possible, _BY_CODE[code], products, coeffs, details,
+                     reason=None if possible else text, warning=text if possible else None)
+        return result, offset
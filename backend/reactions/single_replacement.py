@@ -15,163 +15,271 @@
 #   - Transition metals with multiple oxidation states not fully handled.
 #   - Oxidizing-acid exceptions as HNO3 are out of scope.
 
-from backend.core import balancer, charges, parser, rules, utils
+from backend.core import balancer, charges, parser, tables, utils
+from backend.reactions.result import DETAIL_KEYS, PredictionResult, Subtype, render
+from itertools import islice
 import re
 
 
-def is_halogen(symbol: str):
-    """Return True if the symbol is a halogen in HALOGEN_ORDER."""
-    return symbol in rules.HALOGEN_ORDER
+def is_halogen(symbol: str, rules=None):
+    """Return True if the symbol is a halogen in HALOGEN_ORDER (of rules, default tables.TABLES)."""
+    return symbol in (tables.TABLES if rules is None else rules).halogens
 
 
-def is_in_activity_series(symbol: str):
-    """Return True if the symbol is present in the metal activity series."""
-    return symbol in rules.ACTIVITY_SERIES
+def is_in_activity_series(symbol: str, rules=None):
+    """Return True if the symbol is present in the metal activity series (of rules, default tables.TABLES)."""
+    return symbol in (tables.TABLES if rules is None else rules).activity
 
 
-def can_perform_single_replacement(element_raw: str, compound_raw: str):
+def _cation_charge(symbol: str, rules=None):
+    """infer_cation_charge, raising KeyError (like infer_anion_charge) when it cannot be inferred."""
+    charge = charges.infer_cation_charge(symbol, rules)
+    if charge is None:
+        raise KeyError(f"Unknown cation charge for '{symbol}' — expand COMMON_CATION_CHARGES or POLYATOMIC")
+    return charge
+
+
+def can_perform_single_replacement(element_raw: str, compound_raw: str, rules=None):
     """
     Decide if single-replacement reaction is possible.
     Returns (possible: bool, subtype: str, details/reason).
     Subtypes: halogen | metal_displaces_metal | metal_displaces_hydrogen | metal_displaces_water
+    rules: tables.RuleTables snapshot to decide with (default: tables.TABLES).
     """
+    possible, subtype, details = _check(element_raw, compound_raw, rules)
+    if possible:
+        return True, subtype.value, dict(zip(DETAIL_KEYS[subtype], details))
+    return False, subtype and subtype.value, render(details)
+
+
+def _check(element_raw, compound_raw, rules):
+    # can_perform_single_replacement with a Subtype, details as a tuple of DETAIL_KEYS values
+    # and an unrendered (template, *args) reason
+    t = tables.TABLES if rules is None else rules
     a_raw = element_raw.replace(" ", "")
     b_raw = compound_raw.replace(" ", "")
 
     # Verify first reactant is a single element
-    _, el_counts = parser.parse_formula(a_raw)
+    _, el_counts = parser.parse_composition(a_raw)
     if len(el_counts) != 1:
         return False, None, "Reactant is not a single element"
     el_symbol = next(iter(el_counts.keys()))
 
     # --- Halogen displacement case ---
-    if is_halogen(el_symbol):
-        cation, anion = parser.split_cation_anion(b_raw)
+    if el_symbol in t.halogens:
+        cation, anion = parser.split_cation_anion(b_raw, t)
         if anion == "":
-            return False, "halogen", f"Compound '{b_raw}' has no anion to displace."
+            return False, Subtype.HALOGEN, ("Compound '{}' has no anion to displace.", b_raw)
 
         # Detect halogen anion in compound
-        found, key, _, _, _, pos = parser.detect_polyatomic_in_formula(b_raw)
+        found, key, _, _, _, pos = parser.detect_polyatomic_in_formula(b_raw, t)
         if found and pos == 'suffix':
             a_detect = key
         else:
-            a_detect = next((sym for sym in parser.ELEMENT_SYMBOLS if b_raw.endswith(sym)), None)
+            a_detect = t.element_automaton.longest_suffix(b_raw)
 
         if a_detect is None:
-            return False, "halogen", f"Could not identify halide anion in {b_raw}."
+            return False, Subtype.HALOGEN, ("Could not identify halide anion in {}.", b_raw)
 
-        if el_symbol not in rules.HALOGEN_ORDER or a_detect not in rules.HALOGEN_ORDER:
-            return False, "halogen", f"{el_symbol} or {a_detect} not recognized as halogen."
+        halogen_rank = t.halogen_rank
+        if el_symbol not in halogen_rank or a_detect not in halogen_rank:
+            return False, Subtype.HALOGEN, ("{} or {} not recognized as halogen.", el_symbol, a_detect)
 
-        if rules.HALOGEN_ORDER.index(el_symbol) <= rules.HALOGEN_ORDER.index(a_detect):
-            return True, "halogen", {"incoming": el_symbol, "replaced_anion": a_detect}
-        return False, "halogen", f"{el_symbol} is less reactive than {a_detect}; no reaction."
+        if halogen_rank[el_symbol] <= halogen_rank[a_detect]:
+            return True, Subtype.HALOGEN, (el_symbol, a_detect)
+        return False, Subtype.HALOGEN, ("{} is less reactive than {}; no reaction.", el_symbol, a_detect)
 
     # --- Metal/Hydrogen/Water displacement cases ---
     if el_symbol == "H":
         return False, None, "Free hydrogen atoms not considered replacers."
 
-    if not is_in_activity_series(el_symbol):
-        return False, "metal", f"{el_symbol} not in activity series."
+    activity_rank = t.activity_rank
+    if el_symbol not in activity_rank:
+        return False, Subtype.METAL, ("{} not in activity series.", el_symbol)
 
     # Acid case
     if b_raw.startswith("H") and b_raw != "H2O":
-        if rules.ACTIVITY_SERIES.index(el_symbol) <= rules.ACTIVITY_SERIES.index("H"):
-            return True, "metal_displaces_hydrogen", {"incoming": el_symbol, "acid": b_raw}
-        return False, "metal_displaces_hydrogen", f"{el_symbol} is below hydrogen in activity series."
+        if "H" not in activity_rank:
+            return False, Subtype.METAL_DISPLACES_HYDROGEN, "Hydrogen is not in the activity series."
+        if activity_rank[el_symbol] <= activity_rank["H"]:
+            return True, Subtype.METAL_DISPLACES_HYDROGEN, (el_symbol, b_raw)
+        return False, Subtype.METAL_DISPLACES_HYDROGEN, ("{} is below hydrogen in activity series.", el_symbol)
 
     # Water case
     if b_raw == "H2O":
-        reactive_with_cold_water = {"Li","Na","K","Rb","Cs","Ca","Sr","Ba"}
-        if el_symbol in reactive_with_cold_water:
-            return True, "metal_displaces_water", {"incoming": el_symbol, "target": b_raw}
-        return False, "metal_displaces_water", f"{el_symbol} does not react with cold water."
+        if el_symbol in t.cold_water:
+            return True, Subtype.METAL_DISPLACES_WATER, (el_symbol, b_raw)
+        return False, Subtype.METAL_DISPLACES_WATER, ("{} does not react with cold water.", el_symbol)
 
     # Salt case
-    cation, anion = parser.split_cation_anion(b_raw)
+    cation, anion = parser.split_cation_anion(b_raw, t)
     if anion == "":
-        return False, "metal", f"{b_raw} is not an ionic salt or acid."
-    if cation not in rules.ACTIVITY_SERIES:
-        return False, "metal", f"Cation '{cation}' in '{b_raw}' not found in activity series."
+        return False, Subtype.METAL, ("{} is not an ionic salt or acid.", b_raw)
+    if cation not in activity_rank:
+        return False, Subtype.METAL, ("Cation '{}' in '{}' not found in activity series.", cation, b_raw)
 
-    if rules.ACTIVITY_SERIES.index(el_symbol) <= rules.ACTIVITY_SERIES.index(cation):
-        return True, "metal_displaces_metal", {"incoming": el_symbol, "replaced_cation": cation, "anion": anion}
-    return False, "metal_displaces_metal", f"{el_symbol} is less reactive than {cation}; no reaction."
+    if activity_rank[el_symbol] <= activity_rank[cation]:
+        return True, Subtype.METAL_DISPLACES_METAL, (el_symbol, cation, anion)
+    return False, Subtype.METAL_DISPLACES_METAL, ("{} is less reactive than {}; no reaction.", el_symbol, cation)
 
 
-def predict_single_replacement(reactant_raw: str, compound_raw: str):
+def predict_single_replacement(reactant_raw: str, compound_raw: str, states=False, rules=None):
     """
     Predict products for a single-replacement reaction (if possible).
-    Returns dict with keys:
+    Returns a PredictionResult, a dict with keys:
         possible: bool
         reason: str (if not possible)
         products: [list of str]
         balanced_equation: str
         subtype: str
+    The subtype enum, coefficient vector and products are attributes; the equation and reason
+    text are only formatted when read (see result.PredictionResult).
+    states=True returns a plain dict that also has `states` and `equation_with_states`
+    (see solubility.annotate).
+    rules pins every lookup to one tables.RuleTables snapshot (default: tables.TABLES).
     """
-    possible, subtype, details = can_perform_single_replacement(reactant_raw, compound_raw)
+    if states:
+        from backend.core import solubility
+        return solubility.annotate(dict(predict_single_replacement(reactant_raw, compound_raw, rules=rules)),
+                                   reactant_raw, compound_raw, rules)
+    possible, subtype, details = _check(reactant_raw, compound_raw, rules)
     if not possible:
-        return {"possible": False, "reason": details}
+        return PredictionResult.impossible(reactant_raw, compound_raw, details, subtype)
 
-    _, el_counts = parser.parse_formula(reactant_raw)
+    _, el_counts = parser.parse_composition(reactant_raw)
     el_symbol = next(iter(el_counts.keys()))
-    left_species = [reactant_raw, compound_raw]
-    products, right_list = [], []
 
     # --- Build products ---
-    if subtype == "halogen":
-        cation, _ = parser.split_cation_anion(compound_raw)
-        incoming = details["incoming"]
-        try:
-            cation_charge = charges.infer_cation_charge(cation)
-        except KeyError as e:
-            return {"possible": False, "reason": str(e)}
-        new_salt = utils.formula_from_ions(cation, cation_charge, incoming, -1)
-        displaced = details["replaced_anion"] + "2"
-        products, right_list = [new_salt, displaced], [new_salt, displaced]
-
-    elif subtype == "metal_displaces_hydrogen":
-        cation = el_symbol
-        anion = re.sub(r"^H\d*", "", compound_raw)  # remove leading H/Hn
-        try:
-            c_charge = charges.infer_cation_charge(cation)
-            a_charge = charges.infer_anion_charge(anion)
-        except KeyError as e:
-            return {"possible": False, "reason": str(e)}
-        salt = utils.formula_from_ions(cation, c_charge, anion, a_charge)
-        products, right_list = [salt, "H2"], [salt, "H2"]
-
-    elif subtype == "metal_displaces_water":
-        cation = el_symbol
-        try:
-            c_charge = charges.infer_cation_charge(cation)
-        except KeyError as e:
-            return {"possible": False, "reason": str(e)}
-        hydroxide = utils.formula_from_ions(cation, c_charge, "OH", -1)
-        products, right_list = [hydroxide, "H2"], [hydroxide, "H2"]
-
-    elif subtype == "metal_displaces_metal":
-        incoming, replaced, anion = details["incoming"], details["replaced_cation"], details["anion"]
-        try:
-            c_charge = charges.infer_cation_charge(incoming)
-            a_charge = charges.infer_anion_charge(anion)
-            salt = utils.formula_from_ions(incoming, c_charge, anion, a_charge)
-        except KeyError as e:
-            return {"possible": False, "reason": str(e)}
-        products, right_list = [salt, replaced], [salt, replaced]
-
-    else:
-        return {"possible": False, "reason": f"Unhandled subtype {subtype}"}
+    try:
+        if subtype is Subtype.HALOGEN:
+            cation, _ = parser.split_cation_anion(compound_raw, rules)
+            incoming, replaced = details
+            new_salt = utils.formula_from_ions(cation, _cation_charge(cation, rules), incoming, -1, rules)
+            products = (new_salt, replaced + "2")
+
+        elif subtype is Subtype.METAL_DISPLACES_HYDROGEN:
+            anion = re.sub(r"^H\d*", "", compound_raw)  # remove leading H/Hn
+            c_charge = _cation_charge(el_symbol, rules)
+            a_charge = charges.infer_anion_charge(anion, rules)
+            products = (utils.formula_from_ions(el_symbol, c_charge, anion, a_charge, rules), "H2")
+
+        elif subtype is Subtype.METAL_DISPLACES_WATER:
+            c_charge = _cation_charge(el_symbol, rules)
+            products = (utils.formula_from_ions(el_symbol, c_charge, "OH", -1, rules), "H2")
+
+        elif subtype is Subtype.METAL_DISPLACES_METAL:
+            incoming, replaced, anion = details
+            c_charge = _cation_charge(incoming, rules)
+            a_charge = charges.infer_anion_charge(anion, rules)
+            products = (utils.formula_from_ions(incoming, c_charge, anion, a_charge, rules), replaced)
+
+        else:
+            return PredictionResult.impossible(reactant_raw, compound_raw, ("Unhandled subtype {}", subtype.value))
+    except KeyError as e:
+        return PredictionResult.impossible(reactant_raw, compound_raw, str(e), subtype)
+    if parser.strip_hydrate(compound_raw) != compound_raw:
+        products += ("H2O",)   # water of crystallisation is released
 
     # --- Balance ---
     try:
-        left_coeffs, right_coeffs = balancer.balance_equation(left_species, right_list)
-        def fmt_side(species, coeffs):
-            return " + ".join(f"{c} {s}" if c != 1 else s for c, s in zip(coeffs, species))
-        balanced = fmt_side(left_species, left_coeffs) + " -> " + fmt_side(right_list, right_coeffs)
+        left_coeffs, right_coeffs = balancer.balance_equation([reactant_raw, compound_raw], list(products))
     except Exception as e:
-        return {"possible": True, "products": products, "balanced_equation": None,
-                "warning": f"Balancing failed: {e}"}
+        return PredictionResult(reactant_raw, compound_raw, True, subtype, products,
+                                warning=("Balancing failed: {}", e))
+    return PredictionResult(reactant_raw, compound_raw, True, subtype, products,
+                            (*left_coeffs, *right_coeffs), details)
+
+def iter_predictions(pairs, chunk_size=1024, rules=None):
+    """
+    Lazily predict an iterable of (reactant_raw, compound_raw) pairs, yielding one
+    PredictionResult per pair in input order. Input is consumed chunk_size pairs at a time, so
+    memory stays bounded by the chunk whatever the corpus size. Within a chunk each distinct
+    pair is predicted once; its duplicates get fresh() copies, so editing one result's items
+    leaves the others alone.
+    """
+    it = iter(pairs)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        keys = [tuple(pair) for pair in chunk]   # lists too, as JSON input gives
+        results = {}
+        for key in keys:
+            if key not in results:
+                results[key] = predict_single_replacement(*key, rules=rules)
+        first = set()
+        for key in keys:
+            if key in first:
+                yield results[key].fresh()
+            else:
+                first.add(key)
+                yield results[key]
+
 
-    return {"possible": True, "products": products, "balanced_equation": balanced,
-            "subtype": subtype, "details": details}
+#--- executors ---
+# Thread pools share this process's caches, so they need the thread-safe cache mode, which the
+# caller switches on explicitly (concurrency.enable_thread_safe_caches()). Process pools made
+# by process_pool() receive their RuleTables once, in the worker initializer; predict_many then
+# sends only the rules version with each chunk.
+
+_POOL_RULES = None   # weak map: process_pool() executor -> rules version its workers hold
+_WORKER_RULES = {}   # in pool workers: rules version -> RuleTables
+
+
+def _init_worker(rules):
+    _WORKER_RULES[rules.version] = rules
+
+
+def process_pool(max_workers=None, rules=None):
+    """
+    ProcessPoolExecutor for predict_many whose workers receive rules (default: the current
+    tables.TABLES) once at start-up instead of with every chunk.
+    """
+    global _POOL_RULES
+    from concurrent.futures import ProcessPoolExecutor
+    import weakref
+    rules = tables.TABLES if rules is None else rules
+    pool = ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(rules,))
+    if _POOL_RULES is None:
+        _POOL_RULES = weakref.WeakKeyDictionary()
+    _POOL_RULES[pool] = rules.version
+    return pool
+
+
+def _predict_chunk(chunk, rules):
+    if isinstance(rules, str):   # a version sent to process_pool() workers
+        rules = _WORKER_RULES[rules]
+    return list(iter_predictions(chunk, len(chunk), rules))
+
+
+def predict_many(pairs, executor=None, chunk_size=256, rules=None):
+    """
+    Predict a sequence of (reactant_raw, compound_raw) pairs, optionally spread over a
+    concurrent.futures executor in chunks of chunk_size; returns a list in input order.
+    Every chunk reads the same RuleTables snapshot (rules, default the current tables.TABLES),
+    so a recompile() while the batch runs cannot mix old and new rules.
+    - Thread pools: call concurrency.enable_thread_safe_caches() first; RuntimeError otherwise.
+    - Process pools: workers keep their own caches. Pools from process_pool() already hold the
+      snapshot and get only its version; any other process pool gets the pickled snapshot
+      with each chunk.
+    """
+    if executor is None:
+        return list(iter_predictions(pairs, chunk_size, rules))
+    from concurrent.futures import ThreadPoolExecutor
+    if isinstance(executor, ThreadPoolExecutor):
+        from backend.core import concurrency
+        if not concurrency.THREAD_SAFE:
+            raise RuntimeError("predict_many on a thread pool needs concurrency.enable_thread_safe_caches() first")
+    if rules is None:
+        rules = tables.TABLES
+    payload = rules
+    if _POOL_RULES is not None and _POOL_RULES.get(executor) == rules.version:
+        payload = rules.version
+    it = iter(pairs)
+    futures = []
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            break
+        futures.append(executor.submit(_predict_chunk, chunk, payload))
+    return [result for future in futures for result in future.result()]
@@ -0,0 +1,106 @@
+#--- balancer benchmark ---
+# Times the balancing engines on randomly generated equations and checks that every
+# engine returns exactly the coefficients of the reference Fraction path.
+#
+#   python -m benchmarks.bench_balancer [--equations N] [--seed S]
+
+import argparse
+import random
+import time
+
+from backend.core import balancer, parser
+from tests.fixtures import random_equations
+
+
+def check_engines(equations, engines):
+    """Raise AssertionError on the first equation where an engine disagrees with 'fraction'."""
+    for left, right in equations:
+        expected = balancer.balance_equation(left, right, engine="fraction")
+        for engine in engines:
+            got = balancer.balance_equation(left, right, engine=engine)
+            assert got == expected, (engine, left, right, got, expected)
+
+
+def time_engine(equations, engine):
+    start = time.perf_counter()
+    for left, right in equations:
+        balancer.balance_equation(left, right, engine=engine)
+    return time.perf_counter() - start
+
+
+def coursework_equations(count, seed=0):
+    """Small single-replacement style equations (A + BX -> AX + B) with heavy repetition."""
+    rng = random.Random(seed)
+    metals = ["Zn", "Fe", "Mg", "Ni", "Pb", "Cu", "Ca", "Al", "Na", "K"]
+    anions = ["SO4", "Cl2", "(NO3)2", "CO3", "Br2", "O"]
+    eqs = []
+    for _ in range(count):
+        a, b = rng.sample(metals, 2)
+        x = rng.choice(anions)
+        eqs.append(([a, b + x], [a + x, b]))
+    return eqs
+
+
+def time_batch(equations, engine="bareiss"):
+    """(scalar seconds, batch seconds) over the same equations, each from cold caches."""
+    parser.clear_parse_cache(); balancer.clear_template_cache()
+    start = time.perf_counter()
+    scalar = [balancer.balance_equation(l, r, engine=engine) for l, r in equations]
+    scalar_secs = time.perf_counter() - start
+    parser.clear_parse_cache(); balancer.clear_template_cache()
+    start = time.perf_counter()
+    batch = balancer.balance_equations_batch(equations, engine=engine)
+    batch_secs = time.perf_counter() - start
+    assert batch == scalar
+    return scalar_secs, batch_secs
+
+
+def time_stack(equations):
+    """(scalar seconds, stacked seconds) eliminating the distinct templates of the equations."""
+    by_shape = {}
+    for left, right in equations:
+        n = len(left) + len(right)
+        _, rows = balancer._template_key(balancer._conservation_matrix(left + right, len(left)), n)
+        by_shape.setdefault((n, len(rows)), {})[rows] = None
+    start = time.perf_counter()
+    scalar = [[balancer._solve_bareiss([list(row) for row in rows], n) for rows in group]
+              for (n, _), group in by_shape.items()]
+    scalar_secs = time.perf_counter() - start
+    start = time.perf_counter()
+    stacked = [balancer._solve_bareiss_stack(list(group), n) for (n, _), group in by_shape.items()]
+    stacked_secs = time.perf_counter() - start
+    assert stacked == scalar
+    return sum(map(len, by_shape.values())), scalar_secs, stacked_secs
+
+
+def main():
+    ap = argparse.ArgumentParser(description="balance_equation engine benchmark")
+    ap.add_argument("--equations", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    eqs = random_equations(args.equations, args.seed)
+    engines = [e for e in balancer.ENGINES if e != "fraction"]
+    # engines are compared and timed with the template cache disabled
+    balancer.set_template_cache_size(0)
+    check_engines(eqs, engines)
+    print(f"{len(eqs)} random equations: all engines agree with 'fraction'")
+    for engine in balancer.ENGINES:
+        secs = time_engine(eqs, engine)
+        print(f"{engine:>10}: {secs / len(eqs) * 1e6:8.1f} us/equation")
+    balancer.set_template_cache_size(None)
+    time_engine(eqs, "bareiss")
+    secs = time_engine(eqs, "bareiss")
+    print(f"{'cached':>10}: {secs / len(eqs) * 1e6:8.1f} us/equation (warm template cache)")
+    for name, corpus in (("random", eqs), ("coursework", coursework_equations(args.equations * 10, args.seed))):
+        scalar_secs, batch_secs = time_batch(corpus)
+        print(f"batch vs scalar ({name}, {len(corpus)} eqs): "
+              f"{scalar_secs / len(corpus) * 1e6:.1f} -> {batch_secs / len(corpus) * 1e6:.1f} us/equation "
+              f"({scalar_secs / batch_secs:.1f}x)")
+    templates, scalar_secs, stacked_secs = time_stack(random_equations(args.equations * 10, args.seed, 6))
+    print(f"stacked vs scalar elimination ({templates} distinct templates): "
+          f"{scalar_secs / templates * 1e6:.1f} -> {stacked_secs / templates * 1e6:.1f} us/template "
+          f"({scalar_secs / stacked_secs:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#--- input canonicalization benchmark ---
+# Builds a request stream of the corpus reaction pairs in noisy spellings (padding, coefficients,
+# state symbols, unicode subscripts, flattened ion groups) and reports how much duplicate work
+# parser.canonicalize removes: distinct raw vs canonical pairs, canonicalize throughput, and the
+# time to predict the stream deduplicated by raw input vs by canonical key.
+#
+#   python -m benchmarks.bench_canonical [--requests N] [--seed S]
+
+import argparse
+import random
+import time
+
+from backend.core import parser
+from backend.reactions import single_replacement as SR
+from benchmarks import corpus
+
+_SUBSCRIPT = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
+
+
+def _flatten(formula):
+    """Element counts in order of first appearance, no groups: 'Cu(NO3)2' -> 'CuN2O6'."""
+    counts = {}
+    for sym, cnt in parser.parse_composition(formula).parts:
+        counts[sym] = counts.get(sym, 0) + cnt
+    return "".join(f"{sym}{cnt if cnt > 1 else ''}" for sym, cnt in counts.items())
+
+
+VARIANTS = {
+    "plain": lambda f: f,
+    "padded": lambda f: f" {f}  ",
+    "coefficient": lambda f: f"2{f}",
+    "state": lambda f: f"{f}(aq)",
+    "subscripts": lambda f: f.translate(_SUBSCRIPT),
+    "flattened": _flatten,
+}
+
+
+def request_stream(n, seed=0):
+    """n (reactant, compound) requests: random corpus pairs, each side in a random spelling."""
+    rng = random.Random(seed)
+    pairs = corpus.reaction_pairs()
+    spell = list(VARIANTS.values())
+    stream = []
+    for _ in range(n):
+        a, b = rng.choice(pairs)
+        stream.append((rng.choice(spell)(a), rng.choice(spell)(b)))
+    return stream
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description="input canonicalization benchmark")
+    ap.add_argument("--requests", type=int, default=200000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    stream = request_stream(args.requests, args.seed)
+
+    raw_keys = set(stream)
+    inputs = list(dict.fromkeys(f for pair in stream for f in pair))
+    parser.clear_canonical_cache()
+    parser.clear_parse_cache()
+    _, cold = _timed(lambda: [parser.canonicalize(f) for f in inputs])
+    keys, warm = _timed(lambda: [(parser.canonicalize(a), parser.canonicalize(b)) for a, b in stream])
+    canonical_keys = set(keys)
+    print(f"{len(stream)} requests: {len(raw_keys)} distinct raw pairs -> {len(canonical_keys)} canonical "
+          f"({1 - len(canonical_keys) / len(raw_keys):.1%} of the distinct work removed)")
+    print(f"canonicalize: {len(inputs) / cold:,.0f} distinct inputs/s cold, "
+          f"{2 * len(stream) / warm:,.0f} inputs/s cached")
+
+    for name, spell in VARIANTS.items():
+        formulas = corpus.salts()
+        same = sum(parser.canonicalize(spell(f)) == f for f in formulas)
+        print(f"  {name:12s} {same}/{len(formulas)} salts map back to the corpus spelling")
+
+    parser.clear_parse_cache()
+    _, by_raw = _timed(lambda: {pair: SR.predict_single_replacement(*pair) for pair in raw_keys})
+    parser.clear_parse_cache()
+    _, by_key = _timed(lambda: {pair: SR.predict_single_replacement(*pair) for pair in canonical_keys})
+    print(f"predict distinct pairs: raw {by_raw * 1e3:.0f} ms, canonical {by_key * 1e3:.0f} ms "
+          f"(+ {warm * 1e3:.0f} ms canonicalizing the stream) -> {by_raw / (by_key + warm):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
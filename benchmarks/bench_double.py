@@ -0,0 +1,46 @@
+#--- double-replacement screening benchmark ---
+# All-pairs precipitation screening over N salts: precipitating_pairs (split once, ion-indexed
+# matrix scan) against predicting every pair, and checks both find the same pairs.
+#
+#   python -m benchmarks.bench_double [--salts N] [--check]
+
+import argparse
+import time
+from itertools import combinations
+
+from backend.reactions import double_replacement as DR
+from benchmarks import corpus
+
+
+def naive_pairs(salts):
+    """(i, j) of every pair whose full prediction reports a precipitate."""
+    out = []
+    for i, j in combinations(range(len(salts)), 2):
+        result = DR.predict_double_replacement(salts[i], salts[j])
+        if result.get("details", {}).get("precipitates"):
+            out.append((i, j))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="double-replacement all-pairs screening benchmark")
+    ap.add_argument("--salts", type=int, default=300)
+    ap.add_argument("--check", action="store_true", help="also run the O(N^2) full predictions and compare")
+    args = ap.parse_args()
+    salts = [s for s in corpus.salts() if s != "H2O"][:args.salts]
+
+    start = time.perf_counter()
+    hits = DR.precipitating_pairs(salts)
+    fast = time.perf_counter() - start
+    pairs = len(salts) * (len(salts) - 1) // 2
+    print(f"{len(salts)} salts, {pairs} pairs: precipitating_pairs {fast * 1e3:.1f} ms, {len(hits)} precipitating")
+    if args.check:
+        start = time.perf_counter()
+        expected = naive_pairs(salts)
+        slow = time.perf_counter() - start
+        assert [(i, j) for i, j, _ in hits] == expected
+        print(f"full predictions {slow * 1e3:.1f} ms ({slow / fast:.0f}x), same pairs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#--- import-time regression check ---
+# Measures `python -X importtime -c "import <module>"` (cumulative microseconds, best of N
+# fresh interpreters) for the library entry points and compares against import_baseline.json.
+#
+#   python -m benchmarks.bench_import            # check, exit 1 on regression
+#   python -m benchmarks.bench_import --update   # record a new baseline
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODULES = [
+    "backend",
+    "backend.core.balancer",
+    "backend.core.parser",
+    "backend.reactions.single_replacement",
+    "backend.main",
+]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_baseline.json")
+
+
+def import_time_us(module, runs=7):
+    """Best-of-`runs` cumulative import time of `module` in a fresh interpreter."""
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=ROOT, capture_output=True, text=True, check=True)
+        for line in proc.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                us = int(parts[1])
+                best = us if best is None else min(best, us)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="import-time regression check")
+    ap.add_argument("--update", action="store_true", help="rewrite the baseline with this run")
+    ap.add_argument("--threshold", type=float, default=1.5, help="allowed ratio over baseline")
+    ap.add_argument("--slack-us", type=int, default=2000, help="absolute allowance for timer noise")
+    args = ap.parse_args()
+
+    current = {m: import_time_us(m) for m in MODULES}
+    if args.update:
+        with open(BASELINE, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {BASELINE}")
+        return 0
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+    failed = False
+    for m, us in current.items():
+        base = baseline.get(m)
+        limit = base * args.threshold + args.slack_us if base is not None else None
+        status = "new" if limit is None else ("ok" if us <= limit else "REGRESSION")
+        failed |= status == "REGRESSION"
+        print(f"{m:<40} {us:>8} us  (baseline {base}, {status})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#--- large-network balancing benchmark ---
+# Random reaction networks of 50-200 species over many elements: times the Fraction engine
+# against the multi-modular one, checks they agree, and reports the nullspace dimension.
+#
+#   python -m benchmarks.bench_nullspace [--species 50 100 200] [--elements 40] [--seed S]
+
+import argparse
+import random
+import time
+
+from backend.core import balancer
+from backend.core.elements import ELEMENTS
+
+
+def random_network(n_species, n_elements, rng, max_elements=4, max_count=9):
+    """n_species random formulas over the first n_elements elements, split in half left/right."""
+    pool = ELEMENTS[:n_elements]
+    species = []
+    while len(species) < n_species:
+        els = rng.sample(pool, rng.randint(2, max_elements))
+        f = "".join(el + (str(c) if c > 1 else "") for el, c in ((el, rng.randint(1, max_count)) for el in els))
+        if f not in species:
+            species.append(f)
+    k = n_species // 2
+    return species[:k], species[k:]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description="multi-modular vs Fraction balancing on large networks")
+    ap.add_argument("--species", type=int, nargs="+", default=[50, 100, 200])
+    ap.add_argument("--elements", type=int, default=40, help="distinct elements in the network")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    rng = random.Random(args.seed)
+    balancer.set_template_cache_size(0)
+    for n in args.species:
+        left, right = random_network(n, min(args.elements, n - 1), rng)
+        modular, t_mod = timed(balancer.balance_equation, left, right, engine="modular")
+        basis, t_basis = timed(balancer.balance_basis, left, right)
+        fraction, t_frac = timed(balancer.balance_equation, left, right, engine="fraction")
+        assert fraction == modular, n
+        print(f"{n:4d} species: fraction {t_frac:8.3f}s   modular {t_mod:8.3f}s   "
+              f"basis {t_basis:8.3f}s ({len(basis)} independent solutions)   {t_frac / t_mod:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#--- prediction result footprint benchmark ---
+# Predicts the corpus reaction pairs and compares the compact PredictionResult with the eager
+# result dict it replaces (to_dict()): time per prediction when only `possible` is read, memory
+# held per result, and the size of the packed binary record.
+#
+#   python -m benchmarks.bench_results [--copies N]
+
+import argparse
+import time
+import tracemalloc
+
+from backend.reactions import single_replacement as SR
+from benchmarks import corpus
+
+
+def _held(build):
+    """Bytes still allocated after build() returns, and its return value."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, value
+
+
+def main():
+    ap = argparse.ArgumentParser(description="prediction result footprint benchmark")
+    ap.add_argument("--copies", type=int, default=10, help="predict the corpus this many times")
+    args = ap.parse_args()
+    pairs = corpus.reaction_pairs() * args.copies
+    SR.predict_single_replacement("Zn", "CuSO4")   # warm imports and tables
+
+    for name, predict in (("PredictionResult", SR.predict_single_replacement),
+                          ("eager dict", lambda a, b: SR.predict_single_replacement(a, b).to_dict())):
+        start = time.perf_counter()
+        possible = sum(predict(a, b)["possible"] for a, b in pairs)
+        elapsed = time.perf_counter() - start
+        held, results = _held(lambda: [predict(a, b) for a, b in pairs])
+        print(f"{name:18s} {elapsed / len(pairs) * 1e6:6.2f} us/prediction  "
+              f"{held / len(results):6.0f} B/result held  ({possible} possible)")
+        del results
+
+    results = [SR.predict_single_replacement(a, b) for a, b in corpus.reaction_pairs()]
+    packed = [r.pack() for r in results]
+    print(f"packed record      {sum(map(len, packed)) / len(packed):6.1f} B/result")
+
+
+if __name__ == "__main__":
+    main()
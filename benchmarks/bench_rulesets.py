@@ -0,0 +1,65 @@
+#--- rule set switching benchmark ---
+# Compiles a few rule sets (default plus variants with a reordered activity series and changed
+# charges) and measures what switching between them costs: compile time on first use, the
+# lookup on later compile() calls, and corpus prediction throughput when the requests alternate
+# rule sets vs all use one (every rule-dependent cache is keyed on the rules version).
+#
+#   python -m benchmarks.bench_rulesets [--copies N]
+
+import argparse
+import time
+
+from backend.core import parser
+from backend.core.ruleset import RuleSet
+from backend.reactions import single_replacement as SR
+from benchmarks import corpus
+
+
+def variants():
+    """The default rule set and two edited copies of it."""
+    base = RuleSet.default()
+    swapped = list(base.activity_series)
+    i, j = swapped.index("Cu"), swapped.index("Ag")
+    swapped[i], swapped[j] = swapped[j], swapped[i]
+    return [
+        base,
+        RuleSet.from_dict({"name": "cu-below-ag", "activity_series": swapped}, base),
+        RuleSet.from_dict({"name": "iron-iii", "cation_charges": {"Fe": 3}}, base),
+    ]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description="rule set switching benchmark")
+    ap.add_argument("--copies", type=int, default=5, help="predict the corpus this many times")
+    args = ap.parse_args()
+    rule_sets = variants()
+    pairs = corpus.reaction_pairs() * args.copies
+
+    for rs in rule_sets:
+        tables, first = _timed(rs.compile)
+        _, again = _timed(rs.compile)
+        print(f"{rs.name:12s} {rs.version}  compile {first * 1e3:6.2f} ms, then {again * 1e6:5.2f} us")
+
+    compiled = [rs.compile() for rs in rule_sets]
+    for tables in compiled:
+        SR.predict_single_replacement("Zn", "CuSO4", rules=tables)
+    parser.clear_parse_cache()
+    _, single = _timed(lambda: [SR.predict_single_replacement(a, b, rules=compiled[0]) for a, b in pairs])
+    _, mixed = _timed(lambda: [SR.predict_single_replacement(a, b, rules=compiled[k % len(compiled)])
+                               for k, (a, b) in enumerate(pairs)])
+    print(f"{len(pairs)} predictions: one rule set {single / len(pairs) * 1e6:.2f} us each, "
+          f"alternating {len(compiled)} rule sets {mixed / len(pairs) * 1e6:.2f} us each")
+
+    differ = sum(len({SR.predict_single_replacement(a, b, rules=t)["possible"] for t in compiled}) > 1
+                 for a, b in corpus.reaction_pairs())
+    print(f"{differ}/{len(corpus.reaction_pairs())} corpus pairs change outcome across the rule sets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#--- thread scaling benchmark ---
+# predict_many over the corpus reaction pairs with 1..N worker threads (thread-safe caches, one
+# pinned RuleTables snapshot), reporting throughput per thread count and checking that every
+# run returns the same results as the serial path. Caches are cleared before each run so the
+# threads do real parsing/balancing work rather than only cache hits.
+#
+# Speedup needs a free-threaded interpreter (python3.13t+) and more than one core; on a GIL
+# build the numbers show the cost of the locks and executor instead.
+#
+#   python -m benchmarks.bench_threads [--threads N] [--repeat K]
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.core import balancer, concurrency, parser
+from backend.reactions import single_replacement as SR
+from benchmarks import corpus
+
+
+def _cold():
+    parser.clear_parse_cache()
+    balancer.clear_template_cache()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="predict_many thread scaling benchmark")
+    ap.add_argument("--threads", type=int, default=max(4, os.cpu_count() or 1))
+    ap.add_argument("--repeat", type=int, default=3, help="best of K runs per thread count")
+    args = ap.parse_args()
+
+    pairs = corpus.reaction_pairs()
+    concurrency.enable_thread_safe_caches()
+    expected = SR.predict_many(pairs)
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{len(pairs)} pairs, {os.cpu_count()} cpu(s), GIL {'enabled' if gil else 'disabled'}")
+
+    base = None
+    for n in range(1, args.threads + 1):
+        best = None
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            for _ in range(args.repeat):
+                _cold()
+                start = time.perf_counter()
+                results = SR.predict_many(pairs, executor=pool)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        assert results == expected, f"{n} threads returned different results"
+        base = base or best
+        print(f"{n:3d} thread(s): {len(pairs) / best:10.0f} pairs/s  {base / best:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+#--- deterministic benchmark corpus ---
+# Every single-replacement displacer (activity-series metals, diatomic halogens) crossed with
+# every neutral salt/acid buildable from the charge tables, plus water. The key space itself
+# lives in backend.reactions.outcomes, so the corpus and the outcome table cannot drift apart.
+
+from backend.reactions.outcomes import anions, cations, displacers
+from backend.reactions.outcomes import compounds as salts
+
+__all__ = ["anions", "cations", "displacers", "reaction_pairs", "salts"]
+
+
+def reaction_pairs():
+    """displacers() x salts(), in a fixed order."""
+    compounds = salts()
+    return [(d, s) for d in displacers() for s in compounds]
@@ -0,0 +1,162 @@
+#--- benchmark suite with regression gates ---
+# Runs each core entry point over the generated corpus (benchmarks/corpus.py) and compares
+# throughput and peak traced memory against benchmarks/baseline.json.
+#
+#   python -m benchmarks.suite                 # check, exit 1 on regression
+#   python -m benchmarks.suite --update        # record a new baseline
+#   python -m benchmarks.suite --only parse_formula balance_equation
+#
+# Every timed pass starts from cold parse/template caches, so results measure the code and not
+# state left over from a previous pass.
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from backend.core import balancer, charges, parser, utils
+from backend.reactions import single_replacement as SR
+from benchmarks import corpus
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _cases():
+    """name -> (callable running one pass, number of operations per pass)."""
+    salts = corpus.salts()
+    cations = corpus.cations()
+    anions = corpus.anions()
+    pairs = corpus.reaction_pairs()
+    equations = []
+    for a, b in pairs:
+        out = SR.predict_single_replacement(a, b)
+        if out["possible"] and out.get("balanced_equation"):
+            equations.append(([a, b], out["products"]))
+
+    def parse_pass():
+        for f in salts:
+            parser.parse_formula(f)
+
+    def split_pass():
+        for f in salts:
+            parser.split_cation_anion(f)
+
+    def charge_pass():
+        for c, _ in cations:
+            charges.infer_cation_charge(c)
+        for a, _ in anions:
+            charges.infer_anion_charge(a)
+
+    def ions_pass():
+        for c, cc in cations:
+            for a, ac in anions:
+                utils.formula_from_ions(c, cc, a, ac)
+
+    def balance_pass():
+        for left, right in equations:
+            balancer.balance_equation(left, right)
+
+    def predict_pass():
+        for a, b in pairs:
+            SR.predict_single_replacement(a, b)
+
+    return {
+        "parse_formula": (parse_pass, len(salts)),
+        "split_cation_anion": (split_pass, len(salts)),
+        "infer_charges": (charge_pass, len(cations) + len(anions)),
+        "formula_from_ions": (ions_pass, len(cations) * len(anions)),
+        "balance_equation": (balance_pass, len(equations)),
+        "predict_single_replacement": (predict_pass, len(pairs)),
+    }
+
+
+def _cold():
+    parser.clear_parse_cache()
+    balancer.clear_template_cache()
+
+
+def measure(fn, ops, repeat=5, min_sample=0.1):
+    """
+    {'ops_per_sec': best of `repeat` samples, 'peak_kib': traced peak of one cold pass}.
+    Each sample runs enough cold passes to last at least `min_sample` seconds.
+    """
+    def sample(passes):
+        start = time.perf_counter()
+        for _ in range(passes):
+            _cold()
+            fn()
+        return time.perf_counter() - start
+
+    passes = 1
+    while sample(passes) < min_sample:
+        passes *= 2
+    best = min(sample(passes) for _ in range(repeat)) / passes
+    _cold()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ops": ops, "ops_per_sec": round(ops / best, 1), "peak_kib": round(peak / 1024, 1)}
+
+
+def compare(results, baseline, speed_tolerance, memory_tolerance):
+    """Return a list of human-readable regression messages (empty when everything passes)."""
+    failures = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if res["ops_per_sec"] < base["ops_per_sec"] * (1 - speed_tolerance):
+            failures.append(f"{name}: throughput {res['ops_per_sec']:.0f} ops/s < "
+                            f"baseline {base['ops_per_sec']:.0f} ops/s - {speed_tolerance:.0%}")
+        if res["peak_kib"] > base["peak_kib"] * (1 + memory_tolerance):
+            failures.append(f"{name}: peak memory {res['peak_kib']} KiB > "
+                            f"baseline {base['peak_kib']} KiB + {memory_tolerance:.0%}")
+    return failures
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="ChemPY benchmark suite")
+    ap.add_argument("--update", action="store_true", help="rewrite the baseline with this run")
+    ap.add_argument("--only", nargs="+", help="run only these benchmarks")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--speed-tolerance", type=float, default=0.50, help="allowed throughput drop (fraction); shared CI boxes are noisy")
+    ap.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak-memory growth (fraction)")
+    ap.add_argument("--baseline", default=BASELINE)
+    args = ap.parse_args(argv)
+
+    cases = _cases()
+    names = args.only or list(cases)
+    results = {}
+    for name in names:
+        fn, ops = cases[name]
+        results[name] = measure(fn, ops, args.repeat)
+        r = results[name]
+        print(f"{name:<28} {r['ops']:>6} ops  {r['ops_per_sec']:>12,.0f} ops/s  {r['peak_kib']:>8} KiB peak")
+
+    if args.update:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("no baseline recorded yet; run with --update")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failures = compare(results, baseline, args.speed_tolerance, args.memory_tolerance)
+    for msg in failures:
+        print("REGRESSION", msg)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+#--- shared test data ---
+# Deterministic random equations for the balancer tests (also replayed by
+# benchmarks/bench_balancer, which times the engines on the same kind of input).
+
+import random
+
+ELEMENTS = ["H", "C", "N", "O", "Na", "Cl", "S", "Fe", "Cu", "Zn", "K", "P", "Ca", "Mg", "Al"]
+
+
+def random_formula(rng, max_elements=3, max_count=6):
+    els = rng.sample(ELEMENTS, rng.randint(1, max_elements))
+    return "".join(el + (str(c) if c > 1 else "") for el, c in ((el, rng.randint(1, max_count)) for el in els))
+
+
+def random_equations(count, seed=0, max_species=8):
+    """Deterministic list of (left, right) species lists, 2..max_species species in total."""
+    rng = random.Random(seed)
+    eqs = []
+    for _ in range(count):
+        n = rng.randint(2, max_species)
+        k = rng.randint(1, n - 1)
+        species = [random_formula(rng) for _ in range(n)]
+        eqs.append((species[:k], species[k:]))
+    return eqs
@@ -0,0 +1,99 @@
+#--- balancing engine differential test ---
+# The Fraction, Bareiss and modular engines must return identical coefficients on every
+# equation, including degenerate ones (no non-trivial balance, several independent balances,
+# a species on both sides). The template cache is disabled so each engine really solves.
+#
+#   python -m unittest tests.test_balancer_engines     (or python -m pytest tests)
+
+import unittest
+
+from backend.core import balancer
+from tests.fixtures import random_equations
+
+CORPUS = [
+    (["Zn", "CuSO4"], ["ZnSO4", "Cu"]),
+    (["Zn", "HCl"], ["ZnCl2", "H2"]),
+    (["Zn", "H3PO4"], ["Zn3(PO4)2", "H2"]),
+    (["Al", "Cu(NO3)2"], ["Al(NO3)3", "Cu"]),
+    (["K", "H2O"], ["KOH", "H2"]),
+    (["Cl2", "NaBr"], ["NaCl", "Br2"]),
+    (["C3H8", "O2"], ["CO2", "H2O"]),
+    (["Fe2(SO4)3", "KOH"], ["K2SO4", "Fe(OH)3"]),
+    (["KMnO4", "HCl"], ["KCl", "MnCl2", "H2O", "Cl2"]),
+    (["K4Fe(CN)6", "KMnO4", "H2SO4"], ["KHSO4", "Fe2(SO4)3", "MnSO4", "HNO3", "CO2", "H2O"]),
+    (["Ca3(PO4)2", "SiO2", "C"], ["CaSiO3", "P4", "CO"]),
+    (["CuSO4·5H2O"], ["CuSO4", "H2O"]),
+]
+
+DEGENERATE = [
+    (["Zn"], ["Cu"]),                               # only the trivial balance on the left
+    (["Na", "NaCl"], ["NaCl", "Na"]),               # same species on both sides
+    (["H2", "O2"], ["H2O", "H2O2"]),                # two independent balances
+    (["C", "O2"], ["CO", "CO2"]),
+    (["NaCl"], ["NaCl"]),
+    ([], ["H2"]),                                   # empty side
+    (["Xx"], ["Xx"]),                               # unknown symbol
+]
+
+
+class EngineAgreementTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cache_size = balancer._TEMPLATE_CACHE.maxsize
+        balancer.set_template_cache_size(0)
+
+    def tearDown(self):
+        balancer.set_template_cache_size(self._cache_size)
+
+    def assertEnginesAgree(self, equations):
+        for left, right in equations:
+            expected = balancer.balance_equation(left, right, engine="fraction")
+            for engine in balancer.ENGINES:
+                with self.subTest(engine=engine, left=left, right=right):
+                    self.assertEqual(balancer.balance_equation(left, right, engine=engine), expected)
+
+    def test_fixed_corpus(self):
+        self.assertEnginesAgree(CORPUS)
+
+    def test_known_coefficients(self):
+        for engine in balancer.ENGINES:
+            self.assertEqual(balancer.balance_equation(["C3H8", "O2"], ["CO2", "H2O"], engine=engine),
+                             ([1, 5], [3, 4]))
+            self.assertEqual(balancer.balance_equation(["Zn", "H3PO4"], ["Zn3(PO4)2", "H2"], engine=engine),
+                             ([3, 2], [1, 3]))
+
+    def test_random_equations(self):
+        self.assertEnginesAgree(random_equations(300, seed=1))
+
+    def test_degenerate_equations(self):
+        self.assertEnginesAgree(DEGENERATE)
+
+    def test_degenerate_errors_match(self):
+        for left, right in [(["H2", "O2"], ["H2O", "H2O2"]), (["Fe2(SO4"], ["Fe"])]:
+            for engine in balancer.ENGINES:
+                with self.subTest(engine=engine, left=left):
+                    with self.assertRaises(ValueError):
+                        balancer.balance_equation(left, right, engine=engine, unique=True)
+
+    def test_batch_matches_scalar_and_isolates_errors(self):
+        equations = CORPUS + DEGENERATE + [(["Fe2(SO4"], ["Fe"])] + CORPUS
+        results = balancer.balance_equations_batch(equations)
+        self.assertIsInstance(results[len(CORPUS) + len(DEGENERATE)], ValueError)
+        for (left, right), got in zip(equations, results):
+            if not isinstance(got, Exception):
+                self.assertEqual(got, balancer.balance_equation(left, right, engine="bareiss"))
+
+    def test_stacked_elimination(self):
+        # every template below is solved by _solve_bareiss_stack (the template cache is off)
+        equations = random_equations(500, seed=2) + random_equations(500, seed=3, max_species=5) + DEGENERATE[:-1]
+        for (left, right), got in zip(equations, balancer.balance_equations_batch(equations)):
+            with self.subTest(left=left, right=right):
+                self.assertEqual(got, balancer.balance_equation(left, right, engine="bareiss"))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            balancer.balance_equation(["Zn"], ["Zn"], engine="numpy")
+
+
+if __name__ == "__main__":
+    unittest.main()
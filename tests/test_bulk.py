@@ -0,0 +1,46 @@
+#--- bulk input reader test ---
+# read_pairs must skip and report malformed CSV / JSONL rows instead of aborting the run.
+#
+#   python -m unittest tests.test_bulk     (or python -m pytest tests)
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+from backend import bulk
+
+
+class ReadPairsTest(unittest.TestCase):
+
+    def read(self, text, suffix):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        err = io.StringIO()
+        with redirect_stderr(err):
+            pairs = list(bulk.read_pairs(path))
+        return pairs, err.getvalue().splitlines()
+
+    def test_csv(self):
+        pairs, errors = self.read("reactant,compound\nZn, CuSO4\nFe\n\nCu,AgNO3,extra\n", ".csv")
+        self.assertEqual(pairs, [("Zn", "CuSO4"), ("Cu", "AgNO3")])
+        self.assertEqual(len(errors), 1)
+        self.assertIn(":3:", errors[0])
+
+    def test_jsonl(self):
+        text = '{"reactant": "Zn", "compound": "CuSO4"}\n["Fe"]\n{bad\n{"reactant": "Zn"}\n[1, 2]\n5\n["Cu", "AgNO3"]\n'
+        pairs, errors = self.read(text, ".jsonl")
+        self.assertEqual(pairs, [("Zn", "CuSO4"), ("Cu", "AgNO3")])
+        self.assertEqual([e.split(":")[1] for e in errors], ["2", "3", "4", "5", "6"])
+
+    def test_run_survives_bad_rows(self):
+        pairs, _ = self.read("Zn,CuSO4\nFe\nCu,AgNO3\n", ".csv")
+        records = list(bulk.run(pairs, workers=1))
+        self.assertEqual([r["possible"] for r in records], [True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
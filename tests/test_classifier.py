@@ -0,0 +1,56 @@
+#--- batch classifier agreement test ---
+# classify_batch must name the same single-replacement subtype as can_perform_single_replacement
+# for every reactant x compound pair of the outcome key space, under the default rules and
+# under an explicitly passed rule set.
+#
+#   python -m unittest tests.test_classifier     (or python -m pytest tests)
+
+import unittest
+
+from backend import classifier
+from backend.core.ruleset import RuleSet
+from backend.reactions import outcomes
+from backend.reactions import single_replacement as SR
+
+
+def _pairs():
+    return [(a, b) for a in outcomes.reactants() for b in outcomes.compounds()]
+
+
+class ClassifierAgreementTest(unittest.TestCase):
+
+    def assertAgrees(self, pairs, rules=None):
+        decisions = classifier.classify_batch(pairs, rules=rules)
+        for (a, b), (kind, subtype) in zip(pairs, decisions):
+            with self.subTest(element=a, compound=b):
+                self.assertEqual(kind, classifier.SINGLE_REPLACEMENT)
+                self.assertEqual(subtype, SR.can_perform_single_replacement(a, b, rules=rules)[1])
+
+    def test_single_replacement_subtypes(self):
+        self.assertAgrees(_pairs())
+
+    def test_unranked_cation(self):
+        # Rb is not in the activity series, so the engine reports "metal", not a displacement
+        self.assertEqual(SR.can_perform_single_replacement("Li", "RbF")[1], "metal")
+        self.assertEqual(classifier.classify_batch([("Li", "RbF")]), [("single_replacement", "metal")])
+
+    def test_rules_argument(self):
+        base = RuleSet.default()
+        rules = RuleSet.from_dict({"name": "no-li", "activity_series": [
+            sym for sym in base.activity_series if sym != "Li"]}).compile()
+        self.assertEqual(classifier.classify_batch([("Li", "CuSO4")], rules=rules), [("single_replacement", "metal")])
+        self.assertEqual(classifier.classify_batch([("Li", "CuSO4")]), [("single_replacement", "metal_displaces_metal")])
+        self.assertAgrees(_pairs()[::7], rules=rules)
+
+    def test_predict_batch_rules(self):
+        base = RuleSet.default()
+        rules = RuleSet.from_dict({"name": "no-li", "activity_series": [
+            sym for sym in base.activity_series if sym != "Li"]}).compile()
+        result, = classifier.predict_batch([("Li", "CuSO4")], rules=rules)
+        self.assertFalse(result["possible"])
+        self.assertEqual(result["type"], classifier.SINGLE_REPLACEMENT)
+        self.assertTrue(classifier.predict_batch([("Li", "CuSO4")])[0]["possible"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#--- multi-modular nullspace test ---
+# rref_nullspace / integer_basis (CRT over several primes plus rational reconstruction) must
+# return the exact nullspace of the Fraction RREF, including systems whose entries need more
+# than one prime and systems with several independent solutions.
+#
+#   python -m unittest tests.test_nullspace     (or python -m pytest tests)
+
+import random
+import unittest
+from fractions import Fraction
+from functools import reduce
+from math import gcd, lcm
+
+from backend.core import balancer, nullspace
+
+
+def fraction_basis(matrix, n):
+    """Reference: RREF over Fractions, one basis vector per free column scaled to integers."""
+    A = [[Fraction(v) for v in row] for row in matrix]
+    pivots, row = [], 0
+    for col in range(n):
+        sel = next((r for r in range(row, len(A)) if A[r][col]), None)
+        if sel is None:
+            continue
+        A[row], A[sel] = A[sel], A[row]
+        A[row] = [v / A[row][col] for v in A[row]]
+        for r in range(len(A)):
+            if r != row and A[r][col]:
+                A[r] = [a - A[r][col] * b for a, b in zip(A[r], A[row])]
+        pivots.append(col)
+        row += 1
+    free = [c for c in range(n) if c not in pivots]
+    basis = []
+    for f in free:
+        vec = [Fraction(0)] * n
+        vec[f] = Fraction(1)
+        for r, pc in enumerate(pivots):
+            vec[pc] = -A[r][f]
+        scale = reduce(lcm, (v.denominator for v in vec), 1)
+        basis.append([int(v * scale) for v in vec])
+    return pivots, free, basis
+
+
+def random_matrix(rng, rows, cols, bound):
+    return [[rng.choice((0, 0, rng.randint(-bound, bound))) for _ in range(cols)] for _ in range(rows)]
+
+
+class NullspaceTest(unittest.TestCase):
+
+    def assertMatchesFractions(self, matrix, n):
+        self.assertEqual(nullspace.rref_nullspace(matrix, n), fraction_basis(matrix, n))
+
+    def test_random_small(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            rows, cols = rng.randint(1, 6), rng.randint(1, 8)
+            matrix = random_matrix(rng, rows, cols, 9)
+            with self.subTest(matrix=matrix):
+                self.assertMatchesFractions(matrix, cols)
+
+    def test_large_entries_need_several_primes(self):
+        # entries far beyond one 31-bit prime: the result has to be lifted by CRT
+        rng = random.Random(11)
+        for _ in range(20):
+            matrix = random_matrix(rng, 5, 7, 10 ** 30)
+            with self.subTest(matrix=matrix):
+                self.assertMatchesFractions(matrix, 7)
+
+    def test_network(self):
+        # 60 species, 40 conservation rows: sparse and rank-deficient
+        rng = random.Random(3)
+        matrix = random_matrix(rng, 40, 60, 6)
+        basis = nullspace.integer_basis(matrix, 60)
+        self.assertEqual(len(basis), len(fraction_basis(matrix, 60)[1]))
+        for vec in basis:
+            self.assertEqual(reduce(gcd, vec, 0), 1)
+            self.assertGreater(next(v for v in vec if v), 0)
+            for row in matrix:
+                self.assertEqual(sum(a * b for a, b in zip(row, vec)), 0)
+
+    def test_trivial_and_multiple_solutions(self):
+        self.assertEqual(nullspace.integer_basis([[1, 0], [0, 1]], 2), [])
+        self.assertEqual(len(balancer.balance_basis(["H2", "O2"], ["H2O", "H2O2"])), 2)
+        self.assertEqual(balancer.balance_basis(["C3H8", "O2"], ["CO2", "H2O"]), [([1, 5], [3, 4])])
+
+    def test_no_rows(self):
+        self.assertEqual(nullspace.rref_nullspace([], 3), ([], [0, 1, 2], [[1, 0, 0], [0, 1, 0], [0, 0, 1]]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+#--- outcome table test ---
+# A freshly built outcome table must answer every pair it covers exactly like the live
+# predictor, and its key space must be free of duplicates.
+#
+#   python -m unittest tests.test_outcomes     (or python -m pytest tests)
+
+import os
+import tempfile
+import unittest
+
+from backend.core import tables
+from backend.core.ruleset import RuleSet
+from backend.reactions import outcomes
+from backend.reactions import single_replacement as SR
+
+
+class OutcomeTableTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        fd, cls.path = tempfile.mkstemp(suffix=".bin")
+        os.close(fd)
+        cls.pairs = [(r, c) for r in outcomes.reactants() for c in outcomes.compounds()]
+        _, cls.written = outcomes.build(cls.path, cls.pairs)
+        cls.table = outcomes.OutcomeTable(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.table.close()
+        os.remove(cls.path)
+
+    def test_key_space(self):
+        for name in ("cations", "anions", "displacers", "reactants", "compounds"):
+            keys = getattr(outcomes, name)()
+            self.assertEqual(len(keys), len(set(keys)), name)
+        self.assertEqual(len(self.pairs), len(set(self.pairs)))
+
+    def test_header(self):
+        self.assertEqual(len(self.table), self.written)
+        self.assertEqual(self.table.version, tables.TABLES.version)
+        self.assertEqual(self.table.checksum, outcomes.source_checksum())
+
+    def test_matches_live_predictions(self):
+        covered = 0
+        for pair in self.pairs:
+            result = self.table.get(*pair)
+            if result is None:
+                continue
+            covered += 1
+            with self.subTest(pair=pair):
+                self.assertEqual(result.to_dict(), SR.predict_single_replacement(*pair).to_dict())
+        self.assertEqual(covered, self.written)
+        self.assertGreater(covered, 0.9 * len(self.pairs))
+
+    def test_uncovered_pair(self):
+        self.assertIsNone(self.table.get("Zn", "NotAFormula"))
+
+    def test_other_rules_go_live(self):
+        rules = RuleSet.from_dict({"name": "iron-iii", "cation_charges": {"Fe": 3}}).compile()
+        self.assertEqual(outcomes.predict("Zn", "FeCl3", rules).to_dict(),
+                         SR.predict_single_replacement("Zn", "FeCl3", rules=rules).to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#--- parser test ---
+# Charge suffixes (_split_charge) and canonical formula keys (canonicalize), which every cache
+# key and the outcome table depend on.
+#
+#   python -m unittest tests.test_parser     (or python -m pytest tests)
+
+import unittest
+
+from backend.core import parser
+from backend.reactions import outcomes
+
+CHARGES = {
+    "Fe": ("Fe", 0),
+    "H2O": ("H2O", 0),
+    # sign runs and explicit magnitudes
+    "NH4+": ("NH4", 1),
+    "Fe+++": ("Fe", 3),
+    "SO4^2-": ("SO4", -2),
+    "SO4^-2": ("SO4", -2),
+    "SO4 2-": ("SO4", -2),
+    "SO4-2": ("SO4", -2),
+    # magnitude glued before the sign
+    "Fe3+": ("Fe", 3),
+    "Ca2+": ("Ca", 2),
+    "O2-": ("O", -2),
+    "SO42-": ("SO4", -2),
+    "CO32-": ("CO3", -2),
+    "PO43-": ("PO4", -3),
+    "Hg22+": ("Hg2", 2),
+    # a lone glued digit after a polyatomic body is its subscript
+    "NO3-": ("NO3", -1),
+    "MnO4-": ("MnO4", -1),
+    "Cl-": ("Cl", -1),
+}
+
+CANONICAL = {
+    " 2 NaBr(aq) ": "NaBr",
+    "3H2O(l)": "H2O",
+    "CuSO₄": "CuSO4",
+    "CuN2O6": "Cu(NO3)2",
+    "Fe2(SO4)3": "Fe2(SO4)3",
+    "(NH4)2SO4": "(NH4)2SO4",
+    "Zn": "Zn",
+    "Xx9": "Xx9",   # does not parse: stripped, otherwise unchanged
+}
+
+
+class SplitChargeTest(unittest.TestCase):
+
+    def test_suffixes(self):
+        for formula, expected in CHARGES.items():
+            with self.subTest(formula=formula):
+                self.assertEqual(parser._split_charge(formula), expected)
+
+
+class CanonicalizeTest(unittest.TestCase):
+
+    def test_spellings(self):
+        for raw, expected in CANONICAL.items():
+            with self.subTest(raw=raw):
+                self.assertEqual(parser.canonicalize(raw), expected)
+
+    def test_outcome_keys_are_canonical(self):
+        # the outcome table is keyed by these spellings; canonicalize must leave them alone
+        for formula in outcomes.compounds() + outcomes.reactants():
+            with self.subTest(formula=formula):
+                self.assertEqual(parser.canonicalize(formula), formula)
+
+    def test_composition_is_kept(self):
+        for raw in ("CuN2O6", "FeS3O12", "N2H8SO4", "CaC2O4"):
+            with self.subTest(raw=raw):
+                self.assertEqual(parser.parse_composition(parser.canonicalize(raw)).counts,
+                                 parser.parse_composition(raw).counts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#--- prediction result test ---
+# PredictionResult must behave as the result dict it replaced (json.dumps, item assignment,
+# equality), keep its attributes read-only, and survive pack()/unpack() unchanged for every
+# prediction in the outcome key space and for double-replacement results.
+#
+#   python -m unittest tests.test_result     (or python -m pytest tests)
+
+import json
+import pickle
+import unittest
+
+from backend.reactions import double_replacement as DR
+from backend.reactions import outcomes
+from backend.reactions import single_replacement as SR
+from backend.reactions.result import PredictionResult, Subtype
+
+
+def _assert_same(test, a, b):
+    test.assertEqual(b.to_dict(), a.to_dict())
+    for attr in ("reactant", "compound", "possible", "subtype", "products", "coefficients"):
+        test.assertEqual(getattr(b, attr), getattr(a, attr), attr)
+
+
+class PackRoundTripTest(unittest.TestCase):
+
+    def test_outcome_corpus(self):
+        pairs = [(a, b) for a in outcomes.reactants() for b in outcomes.compounds()]
+        results = list(SR.iter_predictions(pairs))
+        buf = b"".join(r.pack() for r in results)
+        offset = 0
+        for (a, b), result in zip(pairs, results):
+            with self.subTest(element=a, compound=b):
+                unpacked, offset = PredictionResult.unpack(buf, offset)
+                _assert_same(self, result, unpacked)
+        self.assertEqual(offset, len(buf))
+
+    def test_double_replacement(self):
+        salts = outcomes.compounds()[::6]
+        for a in salts:
+            for b in salts:
+                result = DR.predict_double_replacement(a, b)
+                with self.subTest(a=a, b=b):
+                    _assert_same(self, result, PredictionResult.unpack(result.pack())[0])
+
+    def test_exchanged_is_json_data(self):
+        result = DR.predict_double_replacement("AgNO3", "NaCl")
+        self.assertEqual(result["details"]["exchanged"], [["Ag", "Cl"], ["Na", "NO3"]])
+        self.assertEqual(PredictionResult.unpack(result.pack())[0]["details"], result["details"])
+
+    def test_wide_coefficients(self):
+        result = PredictionResult("A", "B", True, Subtype.HALOGEN, ["C"], (70000, -1, 3), ("x", "y"))
+        _assert_same(self, result, PredictionResult.unpack(result.pack())[0])
+
+
+class DictCompatibilityTest(unittest.TestCase):
+
+    def test_json_and_equality(self):
+        result = SR.predict_single_replacement("Zn", "CuSO4")
+        self.assertIsInstance(result, dict)
+        self.assertEqual(json.loads(json.dumps(result)), result.to_dict())
+        self.assertEqual(result, result.to_dict())
+        self.assertEqual(json.dumps(SR.predict_single_replacement("Cu", "ZnSO4")),
+                         json.dumps(SR.predict_single_replacement("Cu", "ZnSO4").to_dict()))
+
+    def test_item_assignment(self):
+        result = SR.predict_single_replacement("Zn", "HCl")
+        result["type"] = "single_replacement"
+        del result["details"]
+        self.assertEqual(json.loads(json.dumps(result))["type"], "single_replacement")
+        self.assertNotIn("details", result)
+        self.assertEqual(result.subtype, Subtype.METAL_DISPLACES_HYDROGEN)
+        self.assertIn("details", result.fresh())
+        copy = pickle.loads(pickle.dumps(result))
+        self.assertEqual(copy, result)
+
+    def test_attributes_are_read_only(self):
+        result = SR.predict_single_replacement("Zn", "CuSO4")
+        with self.assertRaises(AttributeError):
+            result.possible = False
+        with self.assertRaises(AttributeError):
+            del result.products
+        self.assertTrue(result["possible"])
+
+    def test_duplicates_are_independent(self):
+        first, second = SR.iter_predictions([("Zn", "CuSO4"), ("Zn", "CuSO4")])
+        first["possible"] = False
+        self.assertTrue(second["possible"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#--- rule set validation and versioning test ---
+# RuleSet.from_dict must reject data the engine cannot use with a ValueError, and the rules
+# version must depend on the rule content only (not on the key order of the charge maps).
+#
+#   python -m unittest tests.test_ruleset     (or python -m pytest tests)
+
+import unittest
+
+from backend.core import tables
+from backend.core.ruleset import FIELDS, RuleSet
+from backend.reactions import single_replacement as SR
+
+
+class RuleSetValidationTest(unittest.TestCase):
+
+    def assertRejected(self, data):
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict(data)
+
+    def test_default_is_valid(self):
+        self.assertEqual(RuleSet.default().compile().version, tables.TABLES.version)
+
+    def test_unknown_key(self):
+        self.assertRejected({"activity_serie": ["K", "H"]})
+
+    def test_non_integer_charge(self):
+        self.assertRejected({"cation_charges": {"Fe": "3"}})
+        self.assertRejected({"anion_charges": {"Cl": 1.0}})
+        self.assertRejected({"anion_charges": {"Cl": True}})
+
+    def test_cation_charge_range(self):
+        self.assertRejected({"cation_charges": {"Fe": 256}})
+        self.assertRejected({"group_cation_charges": {"Na": -1}})
+
+    def test_polyatomic_entries(self):
+        self.assertRejected({"polyatomic": {"XO4": [{"Xx": 1, "O": 4}, -2, "bogusate"]}})
+        self.assertRejected({"polyatomic": {"SO4": [{"S": 1, "O": 4}, 0, "sulfate"]}})
+        self.assertRejected({"polyatomic": {"SO4": [{}, -2, "sulfate"]}})
+        self.assertRejected({"polyatomic": {"SO4": "sulfate"}})
+
+    def test_list_entries(self):
+        self.assertRejected({"activity_series": ["K", "", "H"]})
+        self.assertRejected({"halogen_order": ["F", 17]})
+
+    def test_activity_series_needs_hydrogen(self):
+        with self.assertRaisesRegex(ValueError, "'H'"):
+            RuleSet.from_dict({"activity_series": ["K", "Na", "Zn", "Cu"]})
+
+    def test_acid_without_hydrogen_rank(self):
+        # RuleTables built directly skip validation; the acid branch must still not raise
+        base = RuleSet.default()
+        series = [sym for sym in base.activity_series if sym != "H"]
+        rules = tables.RuleTables(*(series if f == "activity_series" else getattr(base, f) for f in FIELDS))
+        result = SR.predict_single_replacement("Zn", "HCl", rules=rules)
+        self.assertFalse(result["possible"])
+        self.assertIn("Hydrogen", result["reason"])
+
+
+class RuleSetVersionTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        rs = RuleSet.from_dict({"name": "iron-iii", "cation_charges": {"Fe": 3}})
+        self.assertEqual(RuleSet.from_dict(rs.to_dict()).version, rs.version)
+
+    def test_name_does_not_change_version(self):
+        self.assertEqual(RuleSet.from_dict({"name": "other"}).version, RuleSet.default().version)
+
+    def test_content_changes_version(self):
+        base = RuleSet.default()
+        self.assertNotEqual(RuleSet.from_dict({"cation_charges": {"Fe": 3}}).version, base.version)
+        swapped = list(base.activity_series)
+        i, j = swapped.index("Cu"), swapped.index("Ag")
+        swapped[i], swapped[j] = swapped[j], swapped[i]
+        self.assertNotEqual(RuleSet.from_dict({"activity_series": swapped}).version, base.version)
+
+    def test_key_order_does_not_change_version(self):
+        data = RuleSet.default().to_dict()
+        for field in ("cation_charges", "group_cation_charges", "anion_charges", "element_anion_charges"):
+            data[field] = dict(reversed(list(data[field].items())))
+        data["polyatomic"] = {ion: [dict(reversed(list(comp.items()))), charge, name]
+                              for ion, (comp, charge, name) in data["polyatomic"].items()}
+        self.assertEqual(RuleSet(**data).version, RuleSet.default().version)
+
+    def test_compile_is_shared_by_version(self):
+        a = RuleSet.from_dict({"name": "a", "cation_charges": {"Fe": 3}})
+        b = RuleSet.from_dict({"name": "b", "cation_charges": {"Fe": 3}})
+        self.assertIs(a.compile(), b.compile())
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            RuleSet.default().name = "x"
+
+
+if __name__ == "__main__":
+    unittest.main()
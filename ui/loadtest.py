@@ -0,0 +1,84 @@
+#--- load generator for ui.server ---
+#   python -m ui.loadtest --port 8765 --connections 32 --requests 20000
+# Replays the demo reactant pairs over keep-alive connections and reports client-side
+# latency percentiles and throughput, followed by the server's own /metrics.
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+PAIRS = [
+    ("Zn", "CuSO4"), ("Fe", "CuSO4"), ("Ag", "CuSO4"), ("Mg", "FeCl2"), ("Pb", "ZnSO4"),
+    ("Ca", "Cu(OH)2"), ("Zn", "HCl"), ("Mg", "H2SO4"), ("Zn", "H3PO4"), ("Cu", "HCl"),
+    ("K", "H2O"), ("Ca", "H2O"), ("Fe", "H2O"), ("Cl2", "NaBr"), ("Br2", "KI"),
+    ("I2", "NaCl"), ("Al", "Cu(NO3)2"), ("Ni", "Pb(NO3)2"),
+]
+
+
+async def request(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def worker(host, port, count, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            a, b = rng.choice(PAIRS)
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, "/predict", {"reactant": a, "compound": b})
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(f"HTTP {status} for {a} + {b}")
+    finally:
+        writer.close()
+
+
+async def run(host, port, connections, requests, seed=0):
+    latencies = []
+    per_conn = max(1, requests // connections)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, per_conn, latencies, random.Random(seed + i))
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+    lat = sorted(latencies)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /metrics HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    return {
+        "requests": len(lat),
+        "throughput_rps": len(lat) / elapsed,
+        "p50_ms": lat[len(lat) // 2] * 1000,
+        "p99_ms": lat[min(len(lat) - 1, int(0.99 * len(lat)))] * 1000,
+        "server": json.loads(raw.split(b"\r\n\r\n", 1)[1]),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m ui.loadtest", description="Load test a running ui.server.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--connections", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=20000)
+    args = ap.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args.host, args.port, args.connections, args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
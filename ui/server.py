@@ -0,0 +1,230 @@
+#--- local prediction service ---
+# Minimal asyncio HTTP/JSON front-end over predict_single_replacement and balance_equation.
+#
+#   python -m ui.server --port 8765 --workers 4 [--rules lab-a.json ...]
+#
+# Routes:
+#   POST /predict  {"reactant": "Zn", "compound": "CuSO4"}     (or GET /predict?reactant=..&compound=..)
+#                  optional "rules": name of a rule set loaded with --rules (default: built-in rules)
+#   POST /balance  {"left": ["Zn", "HCl"], "right": ["ZnCl2", "H2"]}
+#   GET  /metrics  latency percentiles, throughput, cache and coalescing counters
+#   GET  /health
+#
+# Reactant spellings are canonicalized first (' 2 NaBr(aq)' -> 'NaBr'), so equivalent requests
+# share one cache key. Identical in-flight requests share one computation, finished results live
+# in a TTL+LRU cache, and the CPU-bound work runs in a bounded process pool so the event loop
+# never blocks. Cache keys include the rules version, so rule sets never share results.
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from backend.core import balancer, parser, tables
+from backend.core.cache import TTLCache
+from backend.reactions import outcomes
+
+MAX_BODY = 1 << 20
+
+
+_RULES = {}   # rule-set name -> RuleTables, compiled once per worker process by _init_worker
+
+
+def _init_worker(rule_sets):
+    for rule_set in rule_sets:
+        _RULES[rule_set.name] = rule_set.compile()
+
+
+def _predict(reactant, compound, rules_name=None):
+    return outcomes.predict(reactant, compound, _RULES.get(rules_name)).to_dict()
+
+
+def _balance(left, right):
+    left_coeffs, right_coeffs = balancer.balance_equation(list(left), list(right), engine="bareiss")
+    return {"left": left_coeffs, "right": right_coeffs}
+
+
+def _retrieve(task):
+    # a computation whose every waiter went away still finishes; don't log its error as unhandled
+    if not task.cancelled():
+        task.exception()
+
+
+class Metrics:
+    """Rolling latency window plus monotonically increasing counters."""
+
+    def __init__(self, window=10000):
+        self.started = time.monotonic()
+        self.latencies = deque(maxlen=window)   # seconds, most recent requests
+        self.counters = {"requests": 0, "errors": 0, "cache_hits": 0, "coalesced": 0, "computed": 0}
+
+    def observe(self, seconds):
+        self.latencies.append(seconds)
+        self.counters["requests"] += 1
+
+    def snapshot(self):
+        lat = sorted(self.latencies)
+
+        def pct(p):
+            return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else 0.0
+
+        uptime = time.monotonic() - self.started
+        return dict(self.counters,
+                    uptime_s=uptime,
+                    throughput_rps=self.counters["requests"] / uptime if uptime else 0.0,
+                    p50_ms=pct(0.50), p99_ms=pct(0.99), window=len(lat))
+
+
+class PredictionServer:
+    def __init__(self, workers=None, cache_size=65536, ttl=600.0, rule_sets=()):
+        self.rules = {rule_set.name: rule_set.compile() for rule_set in rule_sets}
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(tuple(rule_sets),))
+        self.cache = TTLCache(maxsize=cache_size, ttl=ttl)
+        self.inflight = {}   # key -> asyncio.Future shared by concurrent identical requests
+        self.metrics = Metrics()
+
+    async def compute(self, key, fn, *args):
+        """
+        Cached, coalesced execution of fn(*args) in the worker pool. The computation runs as its
+        own task that every identical request awaits through a shield, so a client that goes
+        away cancels only its own wait; the others still get the result, and it is cached.
+        """
+        result = self.cache.get(key)
+        if result is not None:
+            self.metrics.counters["cache_hits"] += 1
+            return result
+        task = self.inflight.get(key)
+        if task is not None:
+            self.metrics.counters["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self._run(key, fn, *args))
+            task.add_done_callback(_retrieve)
+            self.inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _run(self, key, fn, *args):
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+            self.metrics.counters["computed"] += 1
+            self.cache.put(key, result)
+            return result
+        finally:
+            del self.inflight[key]
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"status": "ok"}
+        if url.path == "/metrics":
+            snap = self.metrics.snapshot()
+            snap["cache"] = self.cache.info()
+            snap["inflight"] = len(self.inflight)
+            snap["rules"] = {name: t.version for name, t in self.rules.items()}
+            return 200, snap
+        if method == "GET":
+            payload = {k: v[0] for k, v in parse_qs(url.query).items()}
+        else:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                return 400, {"error": "request body must be a JSON object"}
+        if url.path == "/predict":
+            name = payload.get("rules")
+            if name is not None and name not in self.rules:
+                return 400, {"error": f"unknown rule set '{name}'"}
+            t = self.rules[name] if name is not None else tables.TABLES
+            a, b = parser.canonicalize(payload["reactant"], t), parser.canonicalize(payload["compound"], t)
+            return 200, await self.compute(("predict", t.version, a, b), _predict, a, b, name)
+        if url.path == "/balance":
+            left, right = tuple(payload["left"]), tuple(payload["right"])
+            return 200, await self.compute(("balance", left, right), _balance, left, right)
+        return 404, {"error": f"no route for {url.path}"}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    # the stream can't be framed any further: answer and drop the connection
+                    self.metrics.counters["errors"] += 1
+                    await self.respond(writer, 400, {"error": "malformed request"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {"error": "request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                start = time.perf_counter()
+                try:
+                    status, payload = await self.route(method, target, body)
+                except (KeyError, ValueError, TypeError) as e:
+                    self.metrics.counters["errors"] += 1
+                    status, payload = 400, {"error": f"{type(e).__name__}: {e}"}
+                except Exception as e:
+                    self.metrics.counters["errors"] += 1
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                self.metrics.observe(time.perf_counter() - start)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large"}.get(status, "Error")
+        head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode() + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m ui.server", description="Local ChemPY prediction service.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--cache-size", type=int, default=65536)
+    ap.add_argument("--ttl", type=float, default=600.0, help="result cache TTL in seconds")
+    ap.add_argument("--rules", action="append", default=[], metavar="PATH",
+                    help="JSON/TOML rule set selectable per request by its name (repeatable)")
+    args = ap.parse_args(argv)
+    from backend.core.ruleset import RuleSet
+    app = PredictionServer(args.workers, args.cache_size, args.ttl, [RuleSet.load(p) for p in args.rules])
+    print(f"serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(app.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        app.close()
+
+
+if __name__ == "__main__":
+    main()